@@ -1,15 +1,18 @@
-from flask import Flask
+from flask import Flask, request, abort
 from .extensions import mongo, login_manager, mail, principal, limiter
 from config import config
-from datetime import datetime
-from werkzeug.security import generate_password_hash
 
 def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
-    # Inicijalizacija ekstenzija
-    mongo.init_app(app)
+    # Inicijalizacija ekstenzija (listener bilježi Mongo naredbe po zahtjevu; pool, timeouti i
+    # kompresija iz konfiguracije)
+    from .instrumentation import command_listener
+    from .metrics import pool_listener
+    from . import replicas
+    mongo.init_app(app, event_listeners=[command_listener, pool_listener], **replicas.client_options(app.config))
+    replicas.init_app(app)
     login_manager.init_app(app)
     mail.init_app(app)
     principal.init_app(app)
@@ -20,13 +23,41 @@ def create_app(config_name='default'):
     login_manager.login_message = 'Molimo prijavite se za pristup ovoj stranici.'
     login_manager.login_message_category = 'warning'
     
-    # Korisnički loader callback
+    # Server-Timing i log sporih zahtjeva
+    from . import instrumentation
+    instrumentation.init_app(app)
+    
+    # Prometheus metrike (/metrics)
+    from . import metrics
+    metrics.init_app(app)
+    
+    # Hashiranje lozinki (algoritam, cijena, process pool)
+    from . import passwords
+    passwords.configure(app)
+    
+    # Jinja: cache fragmenata ({% cache %}) i filter za datume
+    from .fragment_cache import FragmentCacheExtension, fragment_cache
+    from .main.utils import format_date
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.add_template_filter(format_date)
+    fragment_cache.configure(app)
+    
+    # Statičke datoteke s hashom u imenu, unaprijed komprimirane (gzip/brotli), immutable cache
+    from . import assets
+    assets.init_app(app)
+    
+    # Korisnički loader callback (s LRU+TTL cacheom)
     from .models import User
+    from . import user_cache
+    user_cache.configure(app)
+    
     @login_manager.user_loader
     def load_user(user_id):
+        # Ako je baza poznato nedostupna, ne čekaj timeout - tretiraj kao anonimnog
+        if app.config.get('DB_CIRCUIT_BREAKER') and monitor.is_down:
+            return None
         try:
-            from bson import ObjectId
-            user_data = mongo.db.users.find_one({'_id': ObjectId(user_id)})
+            user_data = user_cache.get_user_data(user_id)
             if user_data:
                 return User(user_data)
             return None
@@ -40,66 +71,44 @@ def create_app(config_name='default'):
     from .reviews import reviews_bp
     from .admin import admin_bp
     from .profile import profile_bp
+    from .health import health_bp, monitor
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(reviews_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(profile_bp)
+    app.register_blueprint(health_bp)
     
-    # Kreiranje admin korisnika pri prvom pokretanju
-    with app.app_context():
-        try:
-            create_admin_user()
-        except Exception as e:
-            # Ne prekida aplikaciju ako kreiranje admina fejla
-            print(f"⚠️ Admin user creation skipped: {e}")
+    # Health monitor - pozadinska dretva umjesto pinga na svakom zahtjevu
+    if app.config.get('HEALTH_MONITOR_ENABLED'):
+        monitor.start(app)
     
-    return app
-
-def create_admin_user():
-    from bson import ObjectId
-    
-    try:
-        # Test MongoDB veze
-        mongo.db.command('ping')
-        print("✅ MongoDB connection successful")
-        
-        admin_email = 'admin@kolegarecenzije.hr'
-        admin_exists = mongo.db.users.find_one({'email': admin_email})
-        
-        if not admin_exists:
-            admin_data = {
-                'email': admin_email,
-                'name': 'Administrator',
-                'password': generate_password_hash('admin123'),
-                'role': 'admin',
-                'email_verified': True,
-                'date_created': datetime.utcnow()
-            }
-            mongo.db.users.insert_one(admin_data)
-            print("✅ Admin user created: admin@kolegarecenzije.hr / admin123")
-        else:
-            print("✅ Admin user already exists")
-            
-    except Exception as e:
-        print(f"⚠️ Could not create admin user: {e}")
-        # NE prekida aplikaciju ako kreiranje admina fejla
-
-def create_admin_user():
-    from bson import ObjectId
-    
-    admin_email = 'admin@kolegarecenzije.hr'
-    admin_exists = mongo.db.users.find_one({'email': admin_email})
-    
-    if not admin_exists:
-        admin_data = {
-            'email': admin_email,
-            'name': 'Administrator',
-            'password': generate_password_hash('admin123'),
-            'role': 'admin',
-            'email_verified': True,
-            'date_created': datetime.utcnow()
-        }
-        mongo.db.users.insert_one(admin_data)
-        print("Admin user created: admin@kolegarecenzije.hr / 1admin1")
\ No newline at end of file
+    # Pozadinsko slanje emailova iz outboxa
+    if app.config.get('MAIL_OUTBOX_IN_PROCESS'):
+        from .outbox import worker_pool
+        worker_pool.start(app)
+    
+    # Pozadinski poslovi (brisanje korisnika u batchevima)
+    if app.config.get('JOBS_IN_PROCESS'):
+        from .jobs import job_worker
+        job_worker.start(app)
+    
+    # Circuit breaker - kad je baza poznato nedostupna, odmah vrati 503
+    @app.before_request
+    def db_circuit_breaker():
+        if not app.config.get('DB_CIRCUIT_BREAKER') or not monitor.is_down:
+            return None
+        if request.blueprint == 'health' or request.endpoint == 'static':
+            return None
+        abort(503)
+    
+    # CLI naredbe (flask indexes create/verify, ...)
+    from .commands import register_commands
+    register_commands(app)
+    
+    # Jednokratni posao (admin korisnik, indeksi) - jednom po deployu, ne blokira worker
+    from . import bootstrap
+    bootstrap.start(app)
+    
+    return app
\ No newline at end of file
@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+import threading
+from itertools import islice
+from ..extensions import mongo
+from ..reviews.utils import hydrate_reviews
+from ..models import Review, UserListItem
+
+REVIEW_COLUMNS = ['id', 'date_created', 'last_updated', 'reviewer_user_id', 'reviewer_name',
+                  'reviewed_user_id', 'reviewed_user_name', 'rating', 'project_type', 'comment']
+USER_COLUMNS = ['id', 'name', 'email', 'faculty', 'department', 'role', 'email_verified', 'date_created']
+SORT = [('date_created', -1), ('_id', -1)]
+
+# Izvoz drži dretvu workera dok traje - ograniči broj istovremenih izvoza po procesu
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def acquire_slot(limit):
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(limit)
+    return _slots.acquire(blocking=False)
+
+
+def release_slot():
+    _slots.release()
+
+
+class SlotRelease:
+    """Callable koji oslobađa mjesto najviše jednom (call_on_close + greška prije odgovora)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._released = False
+
+    def __call__(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        release_slot()
+
+
+def _chunks(cursor, size):
+    while True:
+        chunk = list(islice(cursor, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value) if not isinstance(value, (bool, int, float)) else value
+
+
+def review_rows(query, batch_size):
+    """Recenzije kao dictovi, imena razriješena jednim upitom po batchu"""
+    cursor = mongo.db.reviews.find(query, Review.PROJECTION).sort(SORT).batch_size(batch_size)
+    for chunk in _chunks(cursor, batch_size):
+        chunk = [Review(document) for document in chunk]
+        hydrate_reviews(chunk, unknown_name='Nepoznat')
+        for review in chunk:
+            yield {
+                'id': review._id,
+                'date_created': review.date_created,
+                'last_updated': review.last_updated,
+                'reviewer_user_id': review.reviewer_user_id,
+                'reviewer_name': review.reviewer_name,
+                'reviewed_user_id': review.reviewed_user_id,
+                'reviewed_user_name': review.reviewed_user_name,
+                'rating': review.rating,
+                'project_type': review.project_type,
+                'comment': review.comment
+            }
+
+
+def user_rows(query, batch_size):
+    cursor = mongo.db.users.find(query, UserListItem.PROJECTION).sort(SORT).batch_size(batch_size)
+    for user in map(UserListItem, cursor):
+        yield {
+            'id': user._id,
+            'name': user.name,
+            'email': user.email,
+            'faculty': user.faculty,
+            'department': user.department,
+            'role': user.role,
+            'email_verified': user.email_verified,
+            'date_created': user.date_created
+        }
+
+
+def _csv_cell(value):
+    value = _value(value)
+    # Zaštita od CSV/formula injekcije u Excelu
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+
+def to_csv(rows, columns, rows_per_chunk=500):
+    """Generator CSV teksta u komadima od rows_per_chunk redaka"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for number, row in enumerate(rows, 1):
+        writer.writerow([_csv_cell(row[column]) for column in columns])
+        if number % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def to_jsonl(rows, columns, rows_per_chunk=500):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({column: _value(row[column]) for column in columns}, ensure_ascii=False))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
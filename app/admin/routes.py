@@ -1,14 +1,20 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify, abort
+from flask import render_template, redirect, url_for, flash, request, jsonify, abort, Response, stream_with_context, current_app
 from flask_login import login_required, current_user
 from flask_principal import Permission, RoleNeed
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
-import bleach
 from . import admin_bp
 from ..extensions import mongo
-from ..models import User
+from ..models import User, UserListItem, Review
 from ..auth.forms import RegistrationForm
-from werkzeug.security import generate_password_hash
+from ..reviews.utils import hydrate_reviews, review_list_filters
+from .. import stats, counters, user_cache, versions, jobs, leaderboard
+from ..search import search_fields, prefix_filter
+from ..pagination import keyset_paginate
+from ..passwords import hash_password
+from ..fragment_cache import fragment_cache
+from . import export
 
 admin_permission = Permission(RoleNeed('admin'))
 
@@ -21,65 +27,63 @@ def restrict_admin():
 
 @admin_bp.route('/')
 def dashboard():
-    # Statistike
-    total_users = mongo.db.users.count_documents({})
-    total_reviews = mongo.db.reviews.count_documents({})
-    total_admins = mongo.db.users.count_documents({'role': 'admin'})
+    # Statistike (keširani brojači)
+    site_counters = counters.get_counters()
     
     # Zadnje aktivnosti
-    recent_users = list(mongo.db.users.find().sort('date_created', -1).limit(5))
-    recent_reviews = list(mongo.db.reviews.find().sort('date_created', -1).limit(5))
+    recent_users = UserListItem.find(mongo.db.users, {}, sort=[('date_created', -1)], limit=5)
+    recent_reviews = Review.find(mongo.db.reviews, {}, sort=[('date_created', -1)], limit=5)
     
     # Pripremi podatke
-    for review in recent_reviews:
-        reviewer = mongo.db.users.find_one({'_id': review['reviewer_user_id']})
-        reviewed_user = mongo.db.users.find_one({'_id': review['reviewed_user_id']})
-        review['reviewer_name'] = reviewer['name'] if reviewer else 'Nepoznat'
-        review['reviewed_user_name'] = reviewed_user['name'] if reviewed_user else 'Nepoznat'
-        review['formatted_date'] = review['date_created'].strftime('%d.%m.%Y.')
+    hydrate_reviews(recent_reviews, unknown_name='Nepoznat', date_format='%d.%m.%Y.')
+    
+    # Pozadinski poslovi (npr. brisanje korisnika) s napretkom
+    recent_jobs = jobs.recent_jobs()
     
     return render_template('admin/dashboard.html',
-                         total_users=total_users,
-                         total_reviews=total_reviews,
-                         total_admins=total_admins,
+                         recent_jobs=recent_jobs,
+                         total_users=site_counters['users'],
+                         total_reviews=site_counters['reviews'],
+                         total_admins=site_counters['admins'],
                          recent_users=recent_users,
                          recent_reviews=recent_reviews)
 
+def _users_query(search_query, role_filter):
+    query = {}
+    if search_query:
+        # Indeksirana pretraga po prefiksima riječi imena i emaila
+        search_filter = prefix_filter(search_query)
+        if search_filter:
+            query.update(search_filter)
+    
+    if role_filter:
+        query['role'] = role_filter
+    return query
+
 @admin_bp.route('/users')
 def users():
     page = request.args.get('page', 1, type=int)
     per_page = 15
-    skip = (page - 1) * per_page
     
     search_query = request.args.get('search', '')
     role_filter = request.args.get('role', '')
+    query = _users_query(search_query, role_filter)
     
-    query = {}
-    if search_query:
-        query['$or'] = [
-            {'name': {'$regex': search_query, '$options': 'i'}},
-            {'email': {'$regex': search_query, '$options': 'i'}}
-        ]
-    
-    if role_filter:
-        query['role'] = role_filter
-    
-    users_list = list(mongo.db.users.find(query).sort('date_created', -1).skip(skip).limit(per_page))
-    
-    total_users = mongo.db.users.count_documents(query)
-    total_pages = (total_users + per_page - 1) // per_page
+    pagination = keyset_paginate(mongo.db.users, query, per_page,
+                                 after=request.args.get('after'),
+                                 before=request.args.get('before'),
+                                 model=UserListItem)
+    users_list = pagination.items
     
-    # Dohvati statistiku za svakog korisnika
+    # Dohvati statistiku za sve korisnike na stranici jednim upitom
+    users_stats = stats.get_stats_for_users([user._id for user in users_list])
     for user in users_list:
-        reviews_received = mongo.db.reviews.count_documents({'reviewed_user_id': user['_id']})
-        reviews_written = mongo.db.reviews.count_documents({'reviewer_user_id': user['_id']})
-        user['reviews_received'] = reviews_received
-        user['reviews_written'] = reviews_written
+        user.set_stats(users_stats[user._id])
     
     return render_template('admin/users.html',
                          users=users_list,
                          page=page,
-                         total_pages=total_pages,
+                         pagination=pagination,
                          search_query=search_query,
                          role_filter=role_filter)
 
@@ -97,15 +101,23 @@ def create_user():
         user_data = {
             'email': form.email.data,
             'name': form.name.data,
-            'password': generate_password_hash(form.password.data),
+            'password': hash_password(form.password.data),
             'faculty': form.faculty.data,
             'department': form.department.data,
             'role': 'user',
             'email_verified': True,
             'date_created': datetime.utcnow()
         }
+        user_data.update(search_fields(user_data['name'], user_data['email']))
         
-        mongo.db.users.insert_one(user_data)
+        try:
+            mongo.db.users.insert_one(user_data)
+        except DuplicateKeyError:
+            # Isti email spremljen istodobno (indeks email_unique)
+            flash('Korisnik s ovom email adresom već postoji.', 'danger')
+            return render_template('admin/create_user.html', form=form)
+        counters.increment('users')
+        versions.bump('users')
         flash('Korisnik uspješno kreiran!', 'success')
         return redirect(url_for('admin.users'))
     
@@ -132,16 +144,36 @@ def edit_user(user_id):
             'role': request.form.get('role'),
             'email_verified': request.form.get('email_verified') == 'on'
         }
+        update_data.update(search_fields(update_data['name'], update_data['email']))
+        
+        # Email mora ostati jedinstven (indeks email_unique)
+        if mongo.db.users.find_one({'email': update_data['email'], '_id': {'$ne': user['_id']}}, {'_id': 1}):
+            flash('Korisnik s ovom email adresom već postoji.', 'danger')
+            return render_template('admin/edit_user.html', user=user)
         
         # Ažuriraj lozinku samo ako je unesena nova
         new_password = request.form.get('password')
         if new_password:
-            update_data['password'] = generate_password_hash(new_password)
+            update_data['password'] = hash_password(new_password)
+        
+        try:
+            mongo.db.users.update_one(
+                {'_id': ObjectId(user_id)},
+                {'$set': update_data}
+            )
+        except DuplicateKeyError:
+            # Isti email je u međuvremenu spremljen drugom korisniku
+            flash('Korisnik s ovom email adresom već postoji.', 'danger')
+            return render_template('admin/edit_user.html', user=user)
+        user_cache.invalidate(user_id)
+        leaderboard.update_profile(user_id, update_data['name'], update_data['faculty'], update_data['department'])
+        versions.bump('users')
         
-        mongo.db.users.update_one(
-            {'_id': ObjectId(user_id)},
-            {'$set': update_data}
-        )
+        # Promjena uloge mijenja broj admina
+        was_admin = user.get('role') == 'admin'
+        is_admin = update_data['role'] == 'admin'
+        if was_admin != is_admin:
+            counters.increment('admins', 1 if is_admin else -1)
         
         flash('Korisnik uspješno ažuriran!', 'success')
         return redirect(url_for('admin.users'))
@@ -160,46 +192,39 @@ def delete_user(user_id):
         flash('Ne možete obrisati vlastiti profil.', 'danger')
         return redirect(url_for('admin.users'))
     
-    # Obriši sve recenzije povezane s korisnikom
-    mongo.db.reviews.delete_many({
-        '$or': [
-            {'reviewer_user_id': ObjectId(user_id)},
-            {'reviewed_user_id': ObjectId(user_id)}
-        ]
-    })
-    
-    # Obriši korisnika
-    mongo.db.users.delete_one({'_id': ObjectId(user_id)})
+    # Korisnik se briše odmah, recenzije i statistika u pozadinskom poslu
+    jobs.enqueue_user_deletion(user)
+    user_cache.invalidate(user_id)
     
-    flash('Korisnik i sve povezane recenzije su uspješno obrisane!', 'success')
+    flash('Korisnik je obrisan. Njegove recenzije brišu se u pozadini (napredak na dashboardu).', 'success')
     return redirect(url_for('admin.users'))
 
+@admin_bp.route('/cache-stats')
+def cache_stats():
+    # Hit/miss statistika in-process cacheova ovog procesa (za podešavanje veličine)
+    return jsonify({
+        'users': user_cache.cache_stats(),
+        'fragments': fragment_cache.stats()
+    })
+
 @admin_bp.route('/reviews')
 def manage_reviews():
     page = request.args.get('page', 1, type=int)
     per_page = 15
-    skip = (page - 1) * per_page
     
-    reviews_list = list(mongo.db.reviews.find()
-                                       .sort('date_created', -1)
-                                       .skip(skip)
-                                       .limit(per_page))
-    
-    total_reviews = mongo.db.reviews.count_documents({})
-    total_pages = (total_reviews + per_page - 1) // per_page
+    pagination = keyset_paginate(mongo.db.reviews, {}, per_page,
+                                 after=request.args.get('after'),
+                                 before=request.args.get('before'),
+                                 model=Review)
+    reviews_list = pagination.items
     
     # Pripremi podatke
-    for review in reviews_list:
-        reviewer = mongo.db.users.find_one({'_id': review['reviewer_user_id']})
-        reviewed_user = mongo.db.users.find_one({'_id': review['reviewed_user_id']})
-        review['reviewer_name'] = reviewer['name'] if reviewer else 'Nepoznat'
-        review['reviewed_user_name'] = reviewed_user['name'] if reviewed_user else 'Nepoznat'
-        review['formatted_date'] = review['date_created'].strftime('%d.%m.%Y. %H:%M')
+    hydrate_reviews(reviews_list, unknown_name='Nepoznat')
     
     return render_template('admin/reviews.html',
                          reviews=reviews_list,
                          page=page,
-                         total_pages=total_pages)
+                         pagination=pagination)
 
 @admin_bp.route('/reviews/<review_id>/delete', methods=['POST'])
 def delete_review_admin(review_id):
@@ -209,5 +234,50 @@ def delete_review_admin(review_id):
         abort(404)
     
     mongo.db.reviews.delete_one({'_id': ObjectId(review_id)})
+    stats.record_reviews_removed([review])
+    leaderboard.refresh([review['reviewed_user_id']])
+    counters.increment('reviews', -1)
+    versions.bump('reviews', f'review:{review_id}')
     flash('Recenzija uspješno obrisana!', 'success')
-    return redirect(url_for('admin.manage_reviews'))
\ No newline at end of file
+    return redirect(url_for('admin.manage_reviews'))
+
+def _export_response(rows, columns, name):
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'jsonl'):
+        abort(400)
+    if not export.acquire_slot(current_app.config.get('EXPORT_MAX_CONCURRENT', 2)):
+        abort(429)
+    
+    encode = export.to_csv if export_format == 'csv' else export.to_jsonl
+    
+    # Mjesto se oslobađa kad server zatvori odgovor - i ako generator nikad ne krene
+    # (HEAD, klijent prekine prije prvog bajta), točno jednom
+    release = export.SlotRelease()
+    try:
+        filename = f"{name}-{datetime.utcnow().strftime('%Y%m%d-%H%M')}.{export_format}"
+        mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        response = Response(stream_with_context(encode(rows, columns)), mimetype=mimetype)
+        response.call_on_close(release)
+    except Exception:
+        release()
+        raise
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@admin_bp.route('/export/reviews')
+def export_reviews():
+    # Isti filtri kao javni popis recenzija
+    query, filters = review_list_filters(request.args.get('rating', type=int),
+                                         request.args.get('project_type', ''),
+                                         request.args.get('user', '').strip())
+    query.update(filters)
+    
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    return _export_response(export.review_rows(query, batch_size), export.REVIEW_COLUMNS, 'recenzije')
+
+@admin_bp.route('/export/users')
+def export_users():
+    query = _users_query(request.args.get('search', ''), request.args.get('role', ''))
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    return _export_response(export.user_rows(query, batch_size), export.USER_COLUMNS, 'korisnici')
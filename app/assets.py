@@ -0,0 +1,181 @@
+"""Statičke datoteke s hashom sadržaja u imenu (dist/css/style.<hash>.css) i unaprijed
+komprimiranim .gz/.br inačicama.
+
+Hashirane datoteke se nikad ne mijenjaju pa se poslužuju s Cache-Control: immutable
+i max-age od godinu dana; url_for('static', ...) automatski vraća hashirano ime.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+OUTPUT_DIR = 'dist'
+MANIFEST = 'manifest.json'
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.map'}
+# Redoslijed je i prednost: brotli je manji od gzipa
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def _fingerprint(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return data, hashlib.sha256(data).hexdigest()[:12]
+
+
+def _write(path, data):
+    # Atomično (tmp + rename) - više workera može graditi istovremeno
+    if os.path.exists(path):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _write_compressed(hashed_path, data):
+    # gzip 9 / brotli 11 su skupi - računaju se samo za inačice kojih još nema
+    compressors = [('.gz', lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.append(('.br', lambda: brotli.compress(data, quality=11)))
+    written = 0
+    for suffix, compress in compressors:
+        if os.path.exists(hashed_path + suffix):
+            continue
+        compressed = compress()
+        # Inačica se sprema samo ako je stvarno manja
+        if len(compressed) < len(data):
+            written += _write(hashed_path + suffix, compressed)
+    return written
+
+
+def _source_files(static_folder):
+    for root, dirs, files in os.walk(static_folder):
+        if os.path.relpath(root, static_folder) == '.':
+            dirs[:] = [name for name in dirs if name != OUTPUT_DIR]
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, static_folder).replace(os.sep, '/'), path
+
+
+def build(static_folder, prune=False):
+    """Izgradi dist/ i manifest.json; vrati (manifest, broj novih datoteka).
+
+    Idempotentno - postojeće hashirane datoteke se ne prepisuju ni ne komprimiraju ponovno.
+    """
+    output_folder = os.path.join(static_folder, OUTPUT_DIR)
+    manifest = {}
+    written = 0
+
+    for name, path in _source_files(static_folder):
+        data, digest = _fingerprint(path)
+        stem, extension = os.path.splitext(name)
+        hashed_name = f'{OUTPUT_DIR}/{stem}.{digest}{extension}'
+        manifest[name] = hashed_name
+
+        # Hashirana datoteka se piše zadnja: ako postoji, komprimirane inačice su već gotove
+        hashed_path = os.path.join(static_folder, hashed_name)
+        if os.path.exists(hashed_path):
+            continue
+        if extension in COMPRESSIBLE:
+            written += _write_compressed(hashed_path, data)
+        written += _write(hashed_path, data)
+
+    manifest_path = os.path.join(output_folder, MANIFEST)
+    os.makedirs(output_folder, exist_ok=True)
+    tmp_path = f'{manifest_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+    if prune:
+        _prune(static_folder, manifest)
+    return manifest, written
+
+
+def _prune(static_folder, manifest):
+    """Obriši hashirane datoteke koje više nisu u manifestu (nakon što stari HTML istekne)"""
+    keep = set(manifest.values()) | {f'{OUTPUT_DIR}/{MANIFEST}'}
+    output_folder = os.path.join(static_folder, OUTPUT_DIR)
+    for root, _, files in os.walk(output_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            for _, suffix in ENCODINGS:
+                if relative.endswith(suffix):
+                    relative = relative[:-len(suffix)]
+            if relative not in keep:
+                os.remove(path)
+
+
+def load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, OUTPUT_DIR, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def init_app(app):
+    if not app.config.get('ASSETS_FINGERPRINT', True):
+        return
+
+    static_folder = app.static_folder
+    if app.config.get('ASSETS_BUILD_ON_STARTUP', True):
+        try:
+            manifest, written = build(static_folder)
+            if written:
+                print(f"📦 Static assets built: {written} new files")
+        except OSError as e:
+            # Npr. static direktorij samo za čitanje - koristi manifest iz `flask assets build`
+            print(f"⚠️ Static asset build skipped: {e}")
+            manifest = load_manifest(static_folder)
+    else:
+        manifest = load_manifest(static_folder)
+
+    if not manifest:
+        print("⚠️ Static asset manifest missing - serving unhashed files")
+        return
+
+    hashed = {value: os.path.splitext(key)[1] for key, value in manifest.items()}
+    encodings = {name: [(encoding, suffix) for encoding, suffix in ENCODINGS
+                        if os.path.exists(os.path.join(static_folder, name + suffix))]
+                 for name in hashed}
+    max_age = app.config.get('ASSETS_MAX_AGE', 31536000)
+    send_static_file = app.view_functions['static']
+
+    @app.url_defaults
+    def hashed_static_url(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]
+
+    def static(filename):
+        if filename not in hashed:
+            return send_static_file(filename=filename)
+
+        accepted = request.accept_encodings
+        served_name, content_encoding = filename, None
+        for encoding, suffix in encodings[filename]:
+            if accepted[encoding]:
+                served_name, content_encoding = filename + suffix, encoding
+                break
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(static_folder, served_name, mimetype=mimetype, max_age=max_age)
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+        if encodings[filename]:
+            response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    app.view_functions['static'] = static
@@ -0,0 +1,211 @@
+"""Asinkroni JSON API za čitanje (ASGI, Motor) - pokreće se preko asgi.py.
+
+Dijeli konfiguraciju i model podataka s Flask aplikacijom: isti indeksi,
+isti kursori paginacije i isto rangiranje pretrage korisnika.
+"""
+import json
+import re
+from datetime import datetime
+from urllib.parse import parse_qs
+from bson import ObjectId
+from bson.errors import InvalidId
+from config import config
+from .cache import TTLCache
+from .pagination import keyset_query, build_page
+from .models import Review, UserSummary
+from .reviews.utils import review_user_ids, apply_user_names, review_list_filters, REVIEWED_USER_FILTER_LIMIT
+from .replicas import client_options, secondary_read_preference
+from .search import candidate_filters, prefix_filter, rank_candidates, SEARCH_PROJECTION, CANDIDATE_LIMIT, RESULT_LIMIT
+
+DEFAULT_PER_PAGE = 12
+MAX_PER_PAGE = 50
+
+
+def _json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} nije JSON serijalizabilan')
+
+
+def serialize_review(review):
+    return {
+        'id': review._id,
+        'reviewer_user_id': review.reviewer_user_id,
+        'reviewer_name': review.reviewer_name,
+        'reviewer_faculty': review.reviewer_faculty,
+        'reviewed_user_id': review.reviewed_user_id,
+        'reviewed_user_name': review.reviewed_user_name,
+        'reviewed_user_faculty': review.reviewed_user_faculty,
+        'rating': review.rating,
+        'project_type': review.project_type,
+        'comment': review.comment,
+        'date_created': review.date_created,
+        'last_updated': review.last_updated
+    }
+
+
+class AsyncReadAPI:
+    """Minimalna ASGI aplikacija: /api/reviews, /api/reviews/<id>, /api/users/search"""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.client = None
+        self.db = None
+        self._search_cache = TTLCache(maxsize=2048, ttl=getattr(settings, 'SEARCH_CACHE_TTL', 30))
+        self.routes = [
+            (re.compile(r'^/api/reviews$'), self.list_reviews),
+            (re.compile(r'^/api/reviews/(?P<review_id>[0-9a-f]{24})$'), self.review_detail),
+            (re.compile(r'^/api/users/search$'), self.search_users),
+            (re.compile(r'^/healthz$'), self.healthz),
+        ]
+
+    async def startup(self):
+        try:
+            from motor.motor_asyncio import AsyncIOMotorClient
+        except ImportError:
+            raise RuntimeError('Async API treba paket "motor" (pip install -r requirements.txt).')
+        self.client = AsyncIOMotorClient(self.settings.MONGO_URI, **client_options(self.settings))
+        self.db = self.client.get_default_database()
+        # API samo čita (nema pisanja ni read-your-writes) pa sve ide na sekundare
+        if getattr(self.settings, 'MONGO_SECONDARY_READS', False):
+            self.db = self.db.with_options(read_preference=secondary_read_preference(self.settings))
+
+    async def shutdown(self):
+        if self.client is not None:
+            self.client.close()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if scope['method'] not in ('GET', 'HEAD'):
+            await self._respond(send, 405, {'error': 'Metoda nije dozvoljena'}, {'allow': 'GET, HEAD'})
+            return
+
+        args = {key: values[-1] for key, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+        for pattern, handler in self.routes:
+            match = pattern.match(scope['path'])
+            if match:
+                try:
+                    status, payload, headers = await handler(args, **match.groupdict())
+                except Exception as e:
+                    print(f"⚠️ Async API error on {scope['path']}: {e}")
+                    status, payload, headers = 500, {'error': 'Greška na serveru'}, {}
+                await self._respond(send, status, payload, headers, head=scope['method'] == 'HEAD')
+                return
+        await self._respond(send, 404, {'error': 'Nije pronađeno'})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def _respond(send, status, payload, headers=None, head=False):
+        body = json.dumps(payload, default=_json_default, ensure_ascii=False).encode('utf-8')
+        raw_headers = [(b'content-type', b'application/json; charset=utf-8'),
+                       (b'content-length', str(len(body)).encode())]
+        raw_headers += [(key.encode(), value.encode()) for key, value in (headers or {}).items()]
+        await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+        await send({'type': 'http.response.body', 'body': b'' if head else body})
+
+    def _public_cache_headers(self):
+        max_age = getattr(self.settings, 'PUBLIC_PAGE_MAX_AGE', 0)
+        shared_max_age = getattr(self.settings, 'PUBLIC_PAGE_SHARED_MAX_AGE', 10)
+        return {'cache-control': f'public, max-age={max_age}, s-maxage={shared_max_age}'}
+
+    async def _hydrate(self, reviews):
+        user_ids = review_user_ids(reviews)
+        users = {}
+        if user_ids:
+            cursor = self.db.users.find({'_id': {'$in': user_ids}}, UserSummary.PROJECTION)
+            users = {user['_id']: UserSummary(user) async for user in cursor}
+        return apply_user_names(reviews, users)
+
+    async def list_reviews(self, args):
+        # Isti filtri i kursori kao reviews.reviews (ocjena, vrsta projekta, ime ocijenjenog kolege)
+        try:
+            rating = int(args.get('rating') or 0)
+            per_page = min(max(int(args.get('per_page') or DEFAULT_PER_PAGE), 1), MAX_PER_PAGE)
+        except ValueError:
+            return 400, {'error': 'Neispravan parametar'}, {}
+
+        # Korisnici se razrješavaju ovdje (Motor), ostatak upita gradi review_list_filters
+        user_ids = None
+        user_filter = prefix_filter(args.get('user', '').strip())
+        if user_filter:
+            cursor = self.db.users.find(user_filter, {'_id': 1}).limit(REVIEWED_USER_FILTER_LIMIT)
+            user_ids = [user['_id'] for user in await cursor.to_list(REVIEWED_USER_FILTER_LIMIT)]
+        query, filters = review_list_filters(rating, args.get('project_type', ''), user_ids=user_ids)
+        query.update(filters)
+
+        page_query, sort, after, before = keyset_query(query, args.get('after'), args.get('before'))
+        cursor = self.db.reviews.find(page_query, Review.PROJECTION).sort(sort).limit(per_page + 1)
+        items = [Review(document) for document in await cursor.to_list(per_page + 1)]
+        page = build_page(items, per_page, after, before)
+        await self._hydrate(page.items)
+
+        return 200, {
+            'items': [serialize_review(review) for review in page.items],
+            'has_next': page.has_next,
+            'has_prev': page.has_prev,
+            'next_cursor': page.next_cursor,
+            'prev_cursor': page.prev_cursor
+        }, self._public_cache_headers()
+
+    async def review_detail(self, args, review_id):
+        try:
+            document = await self.db.reviews.find_one({'_id': ObjectId(review_id)}, Review.PROJECTION)
+        except InvalidId:
+            document = None
+        if not document:
+            return 404, {'error': 'Recenzija ne postoji'}, {}
+        review = Review(document)
+        await self._hydrate([review])
+        return 200, serialize_review(review), self._public_cache_headers()
+
+    async def search_users(self, args):
+        # Isti upiti za kandidate i rangiranje kao search.search_users
+        query = args.get('q', '')
+        filters = candidate_filters(query)
+        if not filters:
+            return 200, [], {}
+
+        terms = filters[-1]['search_prefixes']['$all']
+        key = (query.strip(), RESULT_LIMIT)
+        results = self._search_cache.get(key)
+        if results is None:
+            candidates = {}
+            for query_filter in filters:
+                if len(candidates) >= CANDIDATE_LIMIT:
+                    break
+                cursor = self.db.users.find(query_filter, SEARCH_PROJECTION).limit(CANDIDATE_LIMIT)
+                for user in await cursor.to_list(CANDIDATE_LIMIT):
+                    candidates.setdefault(user['_id'], user)
+            results = rank_candidates(list(candidates.values()), terms, RESULT_LIMIT)
+            self._search_cache.set(key, results)
+
+        ttl = getattr(self.settings, 'SEARCH_CACHE_TTL', 30)
+        return 200, results, {'cache-control': f'private, max-age={ttl}'}
+
+    async def healthz(self, args):
+        return 200, {'status': 'ok'}, {}
+
+
+def create_asgi_app(config_name='default'):
+    return AsyncReadAPI(config[config_name])
@@ -1,10 +1,13 @@
 from flask import render_template, redirect, url_for, flash, request, jsonify, current_app
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 from ..extensions import mongo, mail, limiter
 from ..models import User
+from .. import counters, user_cache, versions
+from ..passwords import hash_password, verify_password, needs_rehash
+from ..search import search_fields
 from . import auth_bp
 from .forms import LoginForm, RegistrationForm
 from .utils import generate_verification_token, send_verification_email
@@ -26,15 +29,23 @@ def register():
         user_data = {
             'email': form.email.data,
             'name': form.name.data,
-            'password': generate_password_hash(form.password.data),
+            'password': hash_password(form.password.data),
             'faculty': form.faculty.data,
             'department': form.department.data,
             'role': 'user',
             'email_verified': False, # za verifikaciju mailom, postavi na false
             'date_created': datetime.utcnow()
         }
+        user_data.update(search_fields(user_data['name'], user_data['email']))
         
-        result = mongo.db.users.insert_one(user_data)
+        try:
+            result = mongo.db.users.insert_one(user_data)
+        except DuplicateKeyError:
+            # Isti email registriran istodobno (indeks email_unique)
+            flash('Korisnik s ovom email adresom već postoji.', 'danger')
+            return render_template('auth/register.html', form=form)
+        counters.increment('users')
+        versions.bump('users')
         user = User(user_data)
         
         # Pokušaj slanje emaila, ali ako ne uspije, molim te aplikacija nemoj se srušiti već po 100ti put
@@ -44,8 +55,7 @@ def register():
                 {'_id': result.inserted_id},
                 {'$set': {'verification_token': user_data['verification_token'], 'email_verified': False}}
             )
-            user.verification_token = user_data['verification_token']
-            send_verification_email(user)
+            send_verification_email(user, user_data['verification_token'])
             flash('Registracija uspješna! Provjerite email za verifikaciju.', 'success')
         except Exception as e:
             # Ako email ne radi, automatski verificiraj korisnika
@@ -67,7 +77,14 @@ def login():
     if form.validate_on_submit():
         user_data = mongo.db.users.find_one({'email': form.email.data})
         
-        if user_data and check_password_hash(user_data['password'], form.password.data):
+        if user_data and verify_password(user_data['password'], form.password.data):
+            # Nadogradi hash na trenutni algoritam/cijenu dok imamo lozinku u čistom obliku
+            if needs_rehash(user_data['password']):
+                mongo.db.users.update_one(
+                    {'_id': user_data['_id']},
+                    {'$set': {'password': hash_password(form.password.data)}}
+                )
+            
             # U dev, dopusti prijavu ne-verificiranim korisnicima
             if not user_data.get('email_verified', False) and current_app.config.get('DEBUG'):
                 flash('Prijava uspješna! (Development mode: email verificiran automatski)', 'info')
@@ -76,6 +93,7 @@ def login():
                     {'_id': user_data['_id']},
                     {'$set': {'email_verified': True}}
                 )
+                user_cache.invalidate(user_data['_id'])
             
             user = User(user_data)
             login_user(user)
@@ -108,6 +126,7 @@ def verify_email(token):
         {'_id': user_data['_id']},
         {'$set': {'email_verified': True}, '$unset': {'verification_token': ''}}
     )
+    user_cache.invalidate(user_data['_id'])
     
     flash('Email je uspješno verificiran! Sada se možete prijaviti.', 'success')
     return redirect(url_for('auth.login'))
@@ -125,10 +144,11 @@ def resend_verification():
         {'_id': ObjectId(current_user.id)},
         {'$set': {'verification_token': new_token}}
     )
+    user_cache.invalidate(current_user.id)
     
-    # Pošalji email
+    # Pošalji email (s novim tokenom)
     try:
-        send_verification_email(current_user)
+        send_verification_email(current_user, new_token)
         flash('Verifikacijski email je ponovno poslan.', 'success')
     except Exception as e:
         flash('Greška pri slanju verifikacijskog emaila.', 'danger')
@@ -1,7 +1,6 @@
 from itsdangerous import URLSafeTimedSerializer
 from flask import current_app, url_for
-from flask_mail import Message
-from ..extensions import mail
+from ..outbox import enqueue_email
 
 def generate_verification_token():
     serializer = URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
@@ -15,17 +14,11 @@ def verify_token(token, expiration=3600):
     except:
         return False
 
-def send_verification_email(user):
-    token = user.verification_token
+def send_verification_email(user, token):
+    # Email se samo sprema u outbox, šalje ga pozadinski worker
     verify_url = url_for('auth.verify_email', token=token, _external=True)
     
-    msg = Message(
-        subject='Verificirajte svoj email - KolegaRecenzije',
-        recipients=[user.email],
-        sender=current_app.config['MAIL_USERNAME']
-    )
-    
-    msg.body = f'''
+    body = f'''
         Poštovani/a {user.name},
 
         Hvala vam što ste se registrirali na KolegaRecenzije!
@@ -39,5 +32,10 @@ def send_verification_email(user):
 
         Lijep pozdrav,
         Tim KolegaRecenzije
-        '''      
-    mail.send(msg)
\ No newline at end of file
+        '''
+    enqueue_email(
+        subject='Verificirajte svoj email - KolegaRecenzije',
+        recipients=[user.email],
+        body=body,
+        sender=current_app.config['MAIL_USERNAME']
+    )
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""Jednokratni posao pri deployu: admin korisnik i indeksi.
+
+Izvodi se jednom po deployu (ne u svakom workeru): ili `flask bootstrap`, ili
+workeri pri pokretanju u pozadinskoj dretvi, a posao preuzima samo onaj koji
+prvi upiše zapis u kolekciju bootstrap (leader lock).
+"""
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from .extensions import mongo
+
+ADMIN_EMAIL = 'admin@kolegarecenzije.hr'
+
+# Stanja zapisa u bootstrap kolekciji
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def create_admin_user():
+    """Kreiraj admin korisnika ako ne postoji"""
+    from . import counters, versions
+    from .passwords import hash_password
+    from .search import search_fields
+
+    if mongo.db.users.find_one({'email': ADMIN_EMAIL}, {'_id': 1}):
+        return False
+
+    admin_data = {
+        'email': ADMIN_EMAIL,
+        'name': 'Administrator',
+        'password': hash_password('admin123'),
+        'role': 'admin',
+        'email_verified': True,
+        'date_created': datetime.utcnow()
+    }
+    admin_data.update(search_fields(admin_data['name'], admin_data['email']))
+    try:
+        mongo.db.users.insert_one(admin_data)
+    except DuplicateKeyError:
+        # Drugi proces ga je upravo kreirao (email_unique indeks)
+        return False
+    counters.increment('users')
+    counters.increment('admins')
+    versions.bump('users')
+    print(f"✅ Admin user created: {ADMIN_EMAIL} / admin123")
+    return True
+
+
+def run(app):
+    """Sav jednokratni posao; vrati popis poruka o preskočenim koracima"""
+    from .search import reindex_users
+    problems = []
+    create_admin_user()
+    if app.config.get('MONGO_AUTO_CREATE_INDEXES'):
+        from .indexes import ensure_indexes
+        for collection_name, index_name, message in ensure_indexes():
+            problems.append(f"Index {collection_name}.{index_name} skipped: {message}")
+    # Brojači za početnu stranicu, dashboard i filtere /reviews (zahtjevi ih samo čitaju)
+    from .counters import reconcile_if_due
+    from .stats import ensure_review_facets
+    reconcile_if_due()
+    if ensure_review_facets():
+        print("📊 Review facet counts built")
+    # Korisnici bez polja za pretragu (stari zapisi) ili s poljima starije verzije
+    reindexed = reindex_users(outdated_only=True)
+    if reindexed:
+        print(f"🔎 Search fields updated for {reindexed} users")
+    return problems
+
+
+def deployment_id(app):
+    """Oznaka deploya: BOOTSTRAP_DEPLOYMENT_ID ili sažetak definicija indeksa"""
+    configured = app.config.get('BOOTSTRAP_DEPLOYMENT_ID')
+    if configured:
+        return configured
+    from .indexes import INDEXES
+    digest = hashlib.sha1(ADMIN_EMAIL.encode())
+    for collection_name in sorted(INDEXES):
+        for index in INDEXES[collection_name]:
+            digest.update(f'{collection_name}:{sorted(index.document.items(), key=lambda item: item[0])}'.encode())
+    return digest.hexdigest()[:12]
+
+
+def acquire(deployment, stale_after):
+    """Leader lock: True ako je ovaj proces preuzeo bootstrap za deployment"""
+    now = datetime.utcnow()
+    document = {'_id': deployment, 'status': RUNNING, 'owner': os.getpid(),
+                'started_at': now, 'updated_at': now}
+    try:
+        mongo.db.bootstrap.insert_one(document)
+        return True
+    except DuplicateKeyError:
+        pass
+    # Preuzmi posao koji nije uspio ili čiji je vlasnik prestao javljati napredak
+    taken = mongo.db.bootstrap.find_one_and_update(
+        {'_id': deployment, '$or': [
+            {'status': FAILED},
+            {'status': RUNNING, 'updated_at': {'$lte': now - stale_after}}
+        ]},
+        {'$set': {'status': RUNNING, 'owner': os.getpid(), 'updated_at': now}},
+        return_document=ReturnDocument.AFTER
+    )
+    return taken is not None
+
+
+def missing_setup(app):
+    """Što od bootstrapa nedostaje u bazi (obrisan admin, izbačen indeks); prazno ako ništa"""
+    missing = []
+    if not mongo.db.users.find_one({'email': ADMIN_EMAIL}, {'_id': 1}):
+        missing.append(f'admin user {ADMIN_EMAIL}')
+    if app.config.get('MONGO_AUTO_CREATE_INDEXES'):
+        from .indexes import INDEXES
+        for collection_name, indexes in INDEXES.items():
+            existing = mongo.db[collection_name].index_information()
+            missing.extend(f'index {collection_name}.{index.document["name"]}'
+                           for index in indexes if index.document['name'] not in existing)
+    return missing
+
+
+def reclaim(deployment):
+    """Ponovno preuzmi završeni bootstrap (popravak); samo jedan proces uspijeva"""
+    now = datetime.utcnow()
+    taken = mongo.db.bootstrap.find_one_and_update(
+        {'_id': deployment, 'status': DONE},
+        {'$set': {'status': RUNNING, 'owner': os.getpid(), 'updated_at': now}}
+    )
+    return taken is not None
+
+
+def _finish(deployment, status, error=None):
+    mongo.db.bootstrap.update_one(
+        {'_id': deployment},
+        {'$set': {'status': status, 'error': error, 'updated_at': datetime.utcnow()}}
+    )
+
+
+def run_once(app):
+    """Izvedi bootstrap ako ga za ovaj deploy još nitko nije napravio; vrati True ako je ovaj proces bio leader"""
+    deployment = deployment_id(app)
+    stale_after = timedelta(seconds=app.config.get('BOOTSTRAP_STALE_AFTER', 120))
+    if not acquire(deployment, stale_after):
+        # Deploy je već odrađen, ali ako je admin ili indeks u međuvremenu obrisan, popravi
+        missing = missing_setup(app)
+        if not missing or not reclaim(deployment):
+            return False
+        print(f"⚠️ Bootstrap repeated for deployment {deployment}, missing: {', '.join(missing)}")
+    try:
+        for problem in run(app):
+            print(f"⚠️ {problem}")
+    except Exception as e:
+        _finish(deployment, FAILED, str(e))
+        raise
+    _finish(deployment, DONE)
+    print(f"✅ Bootstrap done for deployment {deployment}")
+    return True
+
+
+def start(app):
+    """Pokreni bootstrap prema BOOTSTRAP_MODE: background (zadano), sync ili cli (ništa)"""
+    mode = app.config.get('BOOTSTRAP_MODE', 'background')
+    if mode == 'cli':
+        return None
+    if mode == 'sync':
+        with app.app_context():
+            try:
+                run(app)
+            except Exception as e:
+                print(f"⚠️ Bootstrap skipped: {e}")
+        return None
+
+    def target():
+        with app.app_context():
+            try:
+                run_once(app)
+            except Exception as e:
+                # Nedostupna baza ne blokira worker; sljedeći worker ili deploy pokušava ponovno
+                print(f"⚠️ Bootstrap skipped: {e}")
+
+    thread = threading.Thread(target=target, name='bootstrap', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,218 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from pymongo.errors import BulkWriteError
+from werkzeug.datastructures import MultiDict
+from .extensions import mongo
+from .auth.forms import RegistrationForm
+from .reviews.forms import ReviewForm
+from .reviews.utils import clean_comment
+from .passwords import hash_many, process_pool
+from .search import search_fields
+from . import counters, stats, versions, leaderboard
+
+DUPLICATE_KEY = 11000
+
+
+def read_rows(path, skip=0):
+    """Čitaj CSV ili JSONL zapis po zapis: (redni broj zapisa, dict ili None)"""
+    if path.endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            number = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                number += 1
+                if number <= skip:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield number, row if isinstance(row, dict) else None
+    else:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            for number, row in enumerate(csv.DictReader(f), 1):
+                if number > skip:
+                    yield number, row
+
+
+def _validate(form_class, row):
+    """Ista pravila kao web forma; vrati (podaci, None) ili (None, poruka)"""
+    data = MultiDict({key: '' if value is None else str(value) for key, value in row.items()})
+    form = form_class(formdata=data, meta={'csrf': False})
+    if form.validate():
+        return form.data, None
+    return None, '; '.join(f"{field}: {', '.join(errors)}" for field, errors in form.errors.items())
+
+
+def validate_user(row):
+    # Lozinka se u datoteci ne ponavlja
+    row = dict(row, confirm_password=row.get('password'))
+    return _validate(RegistrationForm, row)
+
+
+def validate_review(row):
+    data, error = _validate(ReviewForm, row)
+    if data and not (row.get('reviewer_email') or '').strip():
+        return None, 'reviewer_email: polje je obavezno'
+    if data:
+        data['reviewer_email'] = row['reviewer_email'].strip()
+    return data, error
+
+
+def _insert_many(collection, documents):
+    """insert_many(ordered=False); duplikati (unique indeks) se preskaču, vrati upisane"""
+    if not documents:
+        return []
+    try:
+        collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get('writeErrors', [])
+        if any(error['code'] != DUPLICATE_KEY for error in errors):
+            raise
+        failed = {error['index'] for error in errors}
+        return [document for index, document in enumerate(documents) if index not in failed]
+    return documents
+
+
+def insert_user_batch(rows, executor=None):
+    """Upiši validirane korisnike, vrati (upisano, preskočeno)"""
+    # Postojeće emailove preskoči prije skupog hashiranja lozinki
+    emails = [row['email'] for row in rows]
+    existing = {user['email'] for user in mongo.db.users.find({'email': {'$in': emails}}, {'email': 1})}
+    unique_rows = {}
+    for row in rows:
+        if row['email'] not in existing:
+            unique_rows.setdefault(row['email'], row)
+    rows_to_insert = list(unique_rows.values())
+
+    hashes = hash_many([row['password'] for row in rows_to_insert], executor)
+    now = datetime.utcnow()
+    documents = []
+    for row, password_hash in zip(rows_to_insert, hashes):
+        document = {
+            'email': row['email'],
+            'name': row['name'],
+            'password': password_hash,
+            'faculty': row['faculty'],
+            'department': row['department'],
+            'role': 'user',
+            'email_verified': True,
+            'date_created': now
+        }
+        document.update(search_fields(document['name'], document['email']))
+        documents.append(document)
+
+    inserted = _insert_many(mongo.db.users, documents)
+    if inserted:
+        counters.increment('users', len(inserted))
+        versions.bump('users')
+    return len(inserted), len(rows) - len(inserted)
+
+
+def insert_review_batch(rows):
+    """Upiši validirane recenzije, vrati (upisano, preskočeno)"""
+    emails = {row['reviewer_email'] for row in rows} | {row['reviewed_user_email'] for row in rows}
+    user_ids = {user['email']: user['_id'] for user in mongo.db.users.find({'email': {'$in': list(emails)}}, {'email': 1})}
+
+    now = datetime.utcnow()
+    documents = []
+    for row in rows:
+        reviewer_id = user_ids.get(row['reviewer_email'])
+        reviewed_id = user_ids.get(row['reviewed_user_email'])
+        # Nepostojeći korisnici i samoocjenjivanje se preskaču kao u add_review
+        if not reviewer_id or not reviewed_id or reviewer_id == reviewed_id:
+            continue
+        documents.append({
+            'reviewer_user_id': reviewer_id,
+            'reviewed_user_id': reviewed_id,
+            'rating': row['rating'],
+            'comment': clean_comment(row['comment']),
+            'project_type': row['project_type'],
+            'date_created': now,
+            'last_updated': now
+        })
+
+    # Već postojeći par recenzent/recenzirani odbija unique indeks
+    inserted = _insert_many(mongo.db.reviews, documents)
+    if inserted:
+        stats.record_reviews_added(inserted)
+        leaderboard.refresh(review['reviewed_user_id'] for review in inserted)
+        counters.increment('reviews', len(inserted))
+        versions.bump('reviews')
+    return len(inserted), len(rows) - len(inserted)
+
+
+class Checkpoint:
+    """Napredak uvoza u <datoteka>.checkpoint - nastavak nakon prekida (--resume)"""
+
+    def __init__(self, path):
+        self.path = f'{path}.checkpoint'
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, state):
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def import_file(path, kind, batch_size=500, resume=False, workers=None, on_progress=None, on_invalid=None):
+    """Streaming uvoz: memorija ovisi o veličini batcha, ne o veličini datoteke.
+
+    Ponovni upis batcha je idempotentan (unique indeksi), pa je checkpoint
+    nakon svakog batcha dovoljan i za nastavak nakon rušenja usred batcha.
+    """
+    validate = validate_user if kind == 'users' else validate_review
+    checkpoint = Checkpoint(path)
+    state = (checkpoint.load() if resume else None) or {'row': 0, 'inserted': 0, 'skipped': 0, 'invalid': 0}
+    executor = process_pool(workers) if kind == 'users' and workers and workers > 1 else None
+    started = time.perf_counter()
+    batch = []
+    last_row = state['row']
+
+    def flush():
+        if batch:
+            if kind == 'users':
+                inserted, skipped = insert_user_batch(batch, executor)
+            else:
+                inserted, skipped = insert_review_batch(batch)
+            state['inserted'] += inserted
+            state['skipped'] += skipped
+            batch.clear()
+        state['row'] = last_row
+        checkpoint.save(state)
+        if on_progress:
+            on_progress(dict(state, elapsed=time.perf_counter() - started))
+
+    try:
+        for number, row in read_rows(path, skip=state['row']):
+            last_row = number
+            data, error = validate(row) if row is not None else (None, 'neispravan JSON zapis')
+            if error:
+                state['invalid'] += 1
+                if on_invalid:
+                    on_invalid(number, error)
+                continue
+            batch.append(data)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    checkpoint.clear()
+    return state
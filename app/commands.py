@@ -0,0 +1,321 @@
+import os
+import time
+import click
+from flask.cli import AppGroup
+
+bootstrap_cli = AppGroup('bootstrap', help='Jednokratni posao pri deployu (admin korisnik, indeksi).')
+
+
+@bootstrap_cli.command('run')
+@click.option('--force', is_flag=True, help='Izvedi i ako je za ovaj deploy već napravljen.')
+def bootstrap_run_command(force):
+    """Kreiraj admin korisnika i indekse (jednom po deployu, uz BOOTSTRAP_MODE=cli)."""
+    from flask import current_app
+    from . import bootstrap
+
+    if force:
+        for problem in bootstrap.run(current_app):
+            click.echo(f"⚠️ {problem}")
+        click.echo("✅ Bootstrap izveden")
+    elif not bootstrap.run_once(current_app):
+        click.echo(f"Bootstrap za deploy {bootstrap.deployment_id(current_app)} je već napravljen ili u tijeku (--force za ponovno)")
+
+
+@bootstrap_cli.command('status')
+def bootstrap_status_command():
+    """Prikaži zadnje bootstrap zapise."""
+    from flask import current_app
+    from .extensions import mongo
+    from .bootstrap import deployment_id
+
+    click.echo(f"Trenutni deploy: {deployment_id(current_app)}")
+    for document in mongo.db.bootstrap.find().sort('updated_at', -1).limit(5):
+        click.echo(f"{document['_id']}: {document['status']} ({document['updated_at']:%Y-%m-%d %H:%M:%S})"
+                   + (f" - {document['error']}" if document.get('error') else ''))
+
+
+indexes_cli = AppGroup('indexes', help='Upravljanje MongoDB indeksima.')
+
+
+@indexes_cli.command('create')
+def create_indexes_command():
+    """Kreiraj sve registrirane indekse."""
+    from .indexes import ensure_indexes
+
+    errors = ensure_indexes()
+    for collection_name, index_name, message in errors:
+        click.echo(f"⚠️ {collection_name}.{index_name}: {message}")
+    if errors:
+        raise SystemExit(1)
+    click.echo("✅ Indeksi su kreirani")
+
+
+@indexes_cli.command('verify')
+def verify_indexes_command():
+    """Provjeri da nijedan registrirani upit ne radi COLLSCAN."""
+    from .indexes import explain_route_queries
+
+    failed = False
+    for name, stages, collscan in explain_route_queries():
+        status = '❌' if collscan else '✅'
+        click.echo(f"{status} {name}: {' > '.join(stages)}")
+        failed = failed or collscan
+    if failed:
+        raise SystemExit(1)
+
+
+stats_cli = AppGroup('stats', help='Upravljanje agregiranom statistikom korisnika.')
+
+
+@stats_cli.command('rebuild')
+def rebuild_stats_command():
+    """Ponovno izračunaj user_stats i brojeve za filtere popisa recenzija iz svih recenzija."""
+    from .stats import rebuild_user_stats, rebuild_review_facets
+
+    count = rebuild_user_stats()
+    facets = rebuild_review_facets()
+    click.echo(f"✅ Statistika ponovno izračunata za {count} korisnika, {facets} kombinacija ocjene i vrste projekta")
+
+
+leaderboard_cli = AppGroup('leaderboard', help='Ljestvica kolega po Bayesovom prosjeku ocjena.')
+
+
+@leaderboard_cli.command('rebuild')
+@click.option('--batch-size', default=1000, show_default=True)
+def rebuild_leaderboard_command(batch_size):
+    """Ponovno izgradi ljestvicu iz user_stats (nakon flask stats rebuild)."""
+    from flask import current_app
+    from .leaderboard import rebuild
+
+    count, mean = rebuild(batch_size)
+    click.echo(f"✅ Ljestvica izgrađena za {count} korisnika")
+    if mean is not None:
+        click.echo(f"Prosjek svih ocjena: {mean:.2f} (LEADERBOARD_PRIOR_MEAN = {current_app.config['LEADERBOARD_PRIOR_MEAN']})")
+
+
+counters_cli = AppGroup('counters', help='Brojači korisnika i recenzija.')
+
+
+@counters_cli.command('reconcile')
+def reconcile_counters_command():
+    """Uskladi brojače s kolekcijama."""
+    from .counters import reconcile
+
+    values = reconcile()
+    click.echo(f"✅ Brojači usklađeni: {values}")
+
+
+search_cli = AppGroup('search', help='Indeks za pretragu korisnika.')
+
+
+@search_cli.command('reindex')
+@click.option('--batch-size', default=1000, show_default=True)
+def reindex_search_command(batch_size):
+    """Izračunaj search_prefixes za sve korisnike."""
+    from .search import reindex_users
+
+    updated = reindex_users(batch_size)
+    click.echo(f"✅ Pretraga ažurirana za {updated} korisnika")
+
+
+outbox_cli = AppGroup('outbox', help='Red za slanje emailova.')
+
+
+@outbox_cli.command('work')
+@click.option('--workers', default=None, type=int, help='Broj dretvi (zadano MAIL_OUTBOX_WORKERS).')
+def outbox_work_command(workers):
+    """Pokreni slanje emailova iz outboxa (do Ctrl+C)."""
+    from flask import current_app
+    from .outbox import worker_pool
+
+    worker_pool.start(current_app._get_current_object(), workers)
+    click.echo("📨 Outbox worker pokrenut")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker_pool.stop(timeout=10)
+
+
+@outbox_cli.command('status')
+def outbox_status_command():
+    """Prikaži broj poruka po stanju."""
+    from .outbox import outbox_status
+
+    for status, count in outbox_status().items():
+        click.echo(f"{status}: {count}")
+
+
+jobs_cli = AppGroup('jobs', help='Pozadinski poslovi (npr. brisanje korisnika).')
+
+
+@jobs_cli.command('work')
+def jobs_work_command():
+    """Izvršavaj pozadinske poslove (do Ctrl+C)."""
+    from flask import current_app
+    from .jobs import job_worker
+
+    job_worker.start(current_app._get_current_object())
+    click.echo("⚙️ Job worker pokrenut")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        job_worker.stop(timeout=10)
+
+
+@jobs_cli.command('status')
+@click.option('--limit', default=10, show_default=True)
+def jobs_status_command(limit):
+    """Prikaži zadnje poslove i njihov napredak."""
+    from .jobs import recent_jobs
+
+    for job in recent_jobs(limit):
+        total = job.get('total')
+        click.echo(f"{job['created_at']:%Y-%m-%d %H:%M} {job['type']} {job['status']}: "
+                   f"{job.get('progress', 0)}/{total if total is not None else '?'} {job.get('user_email') or ''}")
+
+
+passwords_cli = AppGroup('passwords', help='Hashiranje lozinki.')
+
+
+@passwords_cli.command('benchmark')
+@click.option('--seconds', default=5.0, show_default=True, help='Trajanje mjerenja.')
+@click.option('--concurrency', default=8, show_default=True, help='Broj istovremenih prijava.')
+def passwords_benchmark_command(seconds, concurrency):
+    """Izmjeri broj provjera lozinke (prijava) u sekundi po jezgri."""
+    from concurrent.futures import ThreadPoolExecutor
+    from flask import current_app
+    from .passwords import hash_password, verify_password
+
+    config = current_app.config
+    stored_hash = hash_password('benchmark-lozinka')
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        count = 0
+        while time.perf_counter() < deadline:
+            verify_password(stored_hash, 'benchmark-lozinka')
+            count += 1
+        return count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        total = sum(executor.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    # bcrypt i pbkdf2 otpuštaju GIL - bez poola dretve zahtjeva koriste do `concurrency` jezgri
+    workers = config['PASSWORD_HASH_WORKERS']
+    cores = min(workers, concurrency) if workers else min(concurrency, os.cpu_count() or 1)
+    per_second = total / elapsed
+    click.echo(f"Algoritam: {config['PASSWORD_HASH_ALGORITHM']}, procesa: {workers}, jezgri: {cores}")
+    click.echo(f"Prijava/s: {per_second:.1f}, po jezgri: {per_second / cores:.1f}")
+
+
+import_cli = AppGroup('import', help='Skupni uvoz korisnika i recenzija iz CSV/JSONL datoteka.')
+
+
+def _echo_progress(state):
+    rate = state['row'] / state['elapsed'] if state['elapsed'] else 0
+    click.echo(f"… zapisa: {state['row']}, uvezeno: {state['inserted']}, preskočeno: {state['skipped']}, "
+               f"neispravno: {state['invalid']} ({rate:.0f} zapisa/s)")
+
+
+def _echo_invalid(number, error):
+    click.echo(f"⚠️ Zapis {number}: {error}", err=True)
+
+
+@import_cli.command('users')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=500, show_default=True)
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True, help='Procesa za hashiranje lozinki.')
+@click.option('--resume', is_flag=True, help='Nastavi od zadnjeg checkpointa.')
+def import_users_command(path, batch_size, workers, resume):
+    """Uvezi korisnike (name, email, password, faculty, department)."""
+    from .bulk_import import import_file
+
+    state = import_file(path, 'users', batch_size=batch_size, resume=resume, workers=workers,
+                        on_progress=_echo_progress, on_invalid=_echo_invalid)
+    click.echo(f"✅ Uvezeno korisnika: {state['inserted']}, preskočeno (postoje): {state['skipped']}, "
+               f"neispravno: {state['invalid']}")
+
+
+@import_cli.command('reviews')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--resume', is_flag=True, help='Nastavi od zadnjeg checkpointa.')
+def import_reviews_command(path, batch_size, resume):
+    """Uvezi recenzije (reviewer_email, reviewed_user_email, rating, project_type, comment)."""
+    from .bulk_import import import_file
+
+    state = import_file(path, 'reviews', batch_size=batch_size, resume=resume,
+                        on_progress=_echo_progress, on_invalid=_echo_invalid)
+    click.echo(f"✅ Uvezeno recenzija: {state['inserted']}, preskočeno: {state['skipped']}, "
+               f"neispravno: {state['invalid']}")
+
+
+assets_cli = AppGroup('assets', help='Statičke datoteke s hashom i komprimirane inačice.')
+
+
+@assets_cli.command('build')
+@click.option('--prune', is_flag=True, help='Obriši hashirane datoteke kojih više nema u manifestu.')
+def build_assets_command(prune):
+    """Izgradi static/dist i manifest.json (npr. pri deployu, uz ASSETS_BUILD_ON_STARTUP=false)."""
+    from flask import current_app
+    from . import assets
+
+    if assets.brotli is None:
+        click.echo("⚠️ Paket brotli nije instaliran - samo gzip inačice")
+    manifest, written = assets.build(current_app.static_folder, prune=prune)
+    click.echo(f"✅ Datoteka u manifestu: {len(manifest)}, novih datoteka: {written}")
+
+
+mongo_cli = AppGroup('mongo', help='Veza prema MongoDB-u (replica set, pool, usmjeravanje čitanja).')
+
+
+@mongo_cli.command('status')
+def mongo_status_command():
+    """Prikaži članove replica seta, zaostajanje sekundara, postavke poola i server koji poslužuje čitanja."""
+    from flask import current_app
+    from pymongo.errors import OperationFailure
+    from .extensions import mongo
+    from .replicas import client_options, read_db
+
+    mongo.db.command('ping')
+    description = mongo.cx.topology_description
+    click.echo(f"Topologija: {description.topology_type_name}")
+    for address, server in sorted(description.server_descriptions().items()):
+        rtt = f", RTT {server.round_trip_time * 1000:.1f} ms" if server.round_trip_time is not None else ''
+        click.echo(f"  {address[0]}:{address[1]} {server.server_type_name}{rtt}")
+
+    try:
+        members = mongo.cx.admin.command('replSetGetStatus')['members']
+        primary = next((member for member in members if member['stateStr'] == 'PRIMARY'), None)
+        for member in members:
+            lag = (primary['optimeDate'] - member['optimeDate']).total_seconds() if primary and 'optimeDate' in member else None
+            click.echo(f"  {member['name']} {member['stateStr']}" + (f", zaostaje {lag:.0f} s" if lag is not None else ''))
+    except OperationFailure:
+        click.echo("Nije replica set - sva čitanja idu na jedini server")
+
+    options = client_options(current_app.config)
+    click.echo("Pool: " + ', '.join(f"{name}={value}" for name, value in options.items()))
+
+    cursor = read_db().reviews.find({}, {'_id': 1}).limit(1)
+    list(cursor)
+    click.echo(f"Čitanja popisa ({'sekundari' if current_app.config.get('MONGO_SECONDARY_READS') else 'primary'}): "
+               f"{cursor.address[0]}:{cursor.address[1]}" if cursor.address else "Čitanja popisa: nema odgovora")
+
+
+def register_commands(app):
+    app.cli.add_command(bootstrap_cli)
+    app.cli.add_command(indexes_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(leaderboard_cli)
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(outbox_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(passwords_cli)
+    app.cli.add_command(import_cli)
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(mongo_cli)
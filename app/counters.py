@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from pymongo.errors import DuplicateKeyError
+from .cache import TTLCache
+from .extensions import mongo
+from . import versions
+
+COUNTERS = ('users', 'reviews', 'admins')
+
+_cache = TTLCache(maxsize=1)
+_CACHE_KEY = 'counters'
+# Zapis u kolekciji counters kojim jedan proces preuzima periodično usklađivanje
+RECONCILE_LOCK = 'reconcile_lock'
+
+
+def increment(name, amount=1):
+    """Atomski promijeni brojač ($inc) i poništi lokalni cache"""
+    if not amount:
+        return
+    mongo.db.counters.update_one({'_id': name}, {'$inc': {'value': amount}}, upsert=True)
+    _cache.delete(_CACHE_KEY)
+
+
+def reconcile():
+    """Ponovno izračunaj brojače iz kolekcija, vrati nove vrijednosti"""
+    values = {
+        'users': mongo.db.users.estimated_document_count(),
+        'reviews': mongo.db.reviews.estimated_document_count(),
+        'admins': mongo.db.users.count_documents({'role': 'admin'})
+    }
+    now = datetime.utcnow()
+    changed = False
+    for name, value in values.items():
+        previous = mongo.db.counters.find_one_and_update(
+            {'_id': name},
+            {'$set': {'value': value, 'reconciled_at': now}},
+            upsert=True
+        )
+        changed = changed or previous is None or previous.get('value') != value
+    _cache.delete(_CACHE_KEY)
+    if changed:
+        # Brojevi na početnoj stranici su se promijenili - novi ETag
+        versions.bump('stats')
+    return values
+
+
+def reconcile_if_due(interval=None):
+    """Uskladi brojače ako to nitko nije napravio u zadnjem intervalu; True ako je ovaj proces uskladio.
+
+    Poziva se iz bootstrapa i pozadinskog job workera, nikad iz zahtjeva; lock zapis
+    osigurava da od svih workera usklađuje samo jedan.
+    """
+    if interval is None:
+        interval = timedelta(seconds=current_app.config.get('COUNTERS_RECONCILE_INTERVAL', 3600))
+    now = datetime.utcnow()
+    try:
+        mongo.db.counters.find_one_and_update(
+            {'_id': RECONCILE_LOCK, 'claimed_at': {'$lte': now - interval}},
+            {'$set': {'claimed_at': now}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # Lock postoji i svjež je - netko je nedavno uskladio
+        return False
+    reconcile()
+    return True
+
+
+def _load_counters():
+    # Samo spremljene vrijednosti (bez upita za brojanje); usklađuje ih bootstrap/job worker
+    documents = {document['_id']: document for document in mongo.db.counters.find({'_id': {'$in': list(COUNTERS)}})}
+    return {name: documents.get(name, {}).get('value', 0) for name in COUNTERS}
+
+
+def get_counters():
+    """Dohvati brojače korisnika, recenzija i admina kroz in-process TTL cache"""
+    ttl = current_app.config.get('COUNTERS_CACHE_TTL', 30)
+    return _cache.get_or_set(_CACHE_KEY, _load_counters, ttl)
@@ -1,12 +1,34 @@
 from flask_pymongo import PyMongo
 from flask_login import LoginManager
-from flask_mail import Mail
+import threading
 from flask_principal import Principal
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from .metrics import record_rate_limit
+
+
+class LazyMail:
+    """Flask-Mail se uvozi i konfigurira tek pri prvom slanju (outbox worker), ne pri pokretanju"""
+
+    def __init__(self):
+        self._app = None
+        self._mail = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._app = app
+
+    def __getattr__(self, name):
+        if self._mail is None:
+            with self._lock:
+                if self._mail is None:
+                    from flask_mail import Mail
+                    self._mail = Mail(self._app)
+        return getattr(self._mail, name)
+
 
 mongo = PyMongo()
 login_manager = LoginManager()
-mail = Mail()
+mail = LazyMail()
 principal = Principal()
-limiter = Limiter(key_func=get_remote_address)
\ No newline at end of file
+limiter = Limiter(key_func=get_remote_address, on_breach=record_rate_limit)
\ No newline at end of file
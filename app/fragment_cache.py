@@ -0,0 +1,111 @@
+import threading
+from collections import defaultdict
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from .cache import TTLCache
+
+
+class MemoryBackend:
+    """Ograničeni in-process cache (zadano)"""
+
+    def __init__(self, maxsize, ttl):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def clear(self):
+        self._cache.clear()
+
+
+class RedisBackend:
+    """Dijeljeni cache između workera (opcionalno, treba paket redis)"""
+
+    def __init__(self, url, ttl):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('FRAGMENT_CACHE_REDIS_URL je postavljen, ali paket "redis" nije instaliran.')
+        self._client = redis.Redis.from_url(url)
+        self._ttl = ttl
+
+    def get(self, key):
+        value = self._client.get(key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value):
+        self._client.set(key, value.encode('utf-8'), ex=self._ttl)
+
+    def clear(self):
+        for key in self._client.scan_iter('fragment:*'):
+            self._client.delete(key)
+
+
+class FragmentCache:
+    def __init__(self):
+        self.enabled = True
+        self.backend = MemoryBackend(maxsize=2048, ttl=3600)
+        self._stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self._lock = threading.Lock()
+
+    def configure(self, app):
+        self.enabled = app.config.get('FRAGMENT_CACHE_ENABLED', True)
+        ttl = app.config.get('FRAGMENT_CACHE_TTL', 3600)
+        redis_url = app.config.get('FRAGMENT_CACHE_REDIS_URL')
+        if redis_url:
+            self.backend = RedisBackend(redis_url, ttl)
+        else:
+            self.backend = MemoryBackend(app.config.get('FRAGMENT_CACHE_SIZE', 2048), ttl)
+
+    def render(self, name, key, render_fragment):
+        """Vrati HTML fragmenta iz cachea ili ga renderiraj i spremi"""
+        if not self.enabled:
+            return render_fragment()
+
+        html = self.backend.get(key)
+        with self._lock:
+            self._stats[name]['hits' if html is not None else 'misses'] += 1
+        if html is None:
+            html = str(render_fragment())
+            self.backend.set(key, html)
+        return html
+
+    def stats(self):
+        """Hit rate po fragmentu"""
+        with self._lock:
+            result = {}
+            for name, counts in self._stats.items():
+                total = counts['hits'] + counts['misses']
+                result[name] = dict(counts, hit_rate=round(counts['hits'] / total, 3) if total else 0.0)
+            return result
+
+
+fragment_cache = FragmentCache()
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache 'naziv', kljuc1, kljuc2 %} ... {% endcache %}
+
+    Prvi argument je naziv fragmenta (za statistiku), ostali čine ključ.
+    Ključ mora sadržavati sve što mijenja sadržaj fragmenta (npr. _id i last_updated).
+    """
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_render_fragment', [nodes.List(parts)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render_fragment(self, parts, caller):
+        name = str(parts[0])
+        key = 'fragment:' + '|'.join(str(part) for part in parts)
+        return Markup(fragment_cache.render(name, key, caller))
@@ -0,0 +1,7 @@
+from flask import Blueprint
+from .monitor import HealthMonitor
+
+health_bp = Blueprint('health', __name__)
+monitor = HealthMonitor()
+
+from . import routes
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class HealthMonitor:
+    """Pozadinska dretva koja periodički pinga MongoDB i pamti stanje veze"""
+
+    def __init__(self, window=20):
+        self.state = 'unknown'
+        self.last_error = None
+        self.last_check = None
+        self.consecutive_failures = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self, app):
+        """Pokreni dretvu (jednom po procesu)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(app, app.config.get('HEALTH_CHECK_INTERVAL', 10)),
+                name='mongo-health-monitor',
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, app, interval):
+        while not self._stop.is_set():
+            with app.app_context():
+                self.check()
+            self._stop.wait(interval)
+
+    def check(self):
+        """Jedan ping prema bazi, ažurira stanje"""
+        from ..extensions import mongo
+
+        started = time.perf_counter()
+        try:
+            mongo.db.command('ping')
+        except Exception as e:
+            with self._lock:
+                self.state = 'down'
+                self.last_error = str(e)
+                self.consecutive_failures += 1
+                self.last_check = datetime.utcnow()
+            return False
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.state = 'up'
+            self.last_error = None
+            self.consecutive_failures = 0
+            self.last_check = datetime.utcnow()
+            self._latencies.append(latency_ms)
+        return True
+
+    @property
+    def is_up(self):
+        return self.state == 'up'
+
+    @property
+    def is_down(self):
+        return self.state == 'down'
+
+    def snapshot(self):
+        with self._lock:
+            latencies = list(self._latencies)
+            return {
+                'state': self.state,
+                'last_check': self.last_check.isoformat() + 'Z' if self.last_check else None,
+                'last_error': self.last_error,
+                'consecutive_failures': self.consecutive_failures,
+                'latency_ms': {
+                    'last': round(latencies[-1], 2) if latencies else None,
+                    'avg': round(sum(latencies) / len(latencies), 2) if latencies else None,
+                    'max': round(max(latencies), 2) if latencies else None
+                }
+            }
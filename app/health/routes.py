@@ -0,0 +1,46 @@
+import hmac
+import ipaddress
+from flask import abort, current_app, jsonify, request, Response
+from . import health_bp, monitor
+from ..extensions import limiter
+from ..metrics import registry, pool_listener
+
+
+@health_bp.route('/healthz')
+@limiter.exempt
+def healthz():
+    # Liveness - proces radi, baza se ne provjerava
+    return jsonify({'status': 'ok'})
+
+
+@health_bp.route('/readyz')
+@limiter.exempt
+def readyz():
+    # Readiness - stanje iz pozadinskog health monitora, bez upita prema bazi; iskorištenost poola ovog procesa
+    snapshot = dict(monitor.snapshot(), pools=pool_listener.snapshot())
+    status_code = 200 if monitor.is_up else 503
+    return jsonify(dict(snapshot, status='ready' if monitor.is_up else 'unavailable')), status_code
+
+
+def _metrics_allowed():
+    """Uz METRICS_TOKEN treba Authorization: Bearer <token>; lokalni zahtjevi samo uz METRICS_ALLOW_LOCALHOST"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    # Reverse proxy na istom hostu šalje sve zahtjeve s 127.0.0.1 pa ovo nije zadano
+    if not current_app.config.get('METRICS_ALLOW_LOCALHOST'):
+        return False
+    try:
+        return ipaddress.ip_address(request.remote_addr or '').is_loopback
+    except ValueError:
+        return False
+
+
+@health_bp.route('/metrics')
+@limiter.exempt
+def metrics():
+    # Prometheus scrape - zbroj svih procesa iz METRICS_MULTIPROC_DIR
+    if not _metrics_allowed():
+        abort(403)
+    registry.flush()
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,154 @@
+from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from .extensions import mongo
+from .pagination import facet_pipeline
+
+# Deklarativni popis indeksa po kolekcijama
+INDEXES = {
+    'users': [
+        IndexModel([('email', ASCENDING)], name='email_unique', unique=True),
+        IndexModel([('verification_token', ASCENDING)], name='verification_token_partial',
+                   partialFilterExpression={'verification_token': {'$exists': True}}),
+        IndexModel([('date_created', DESCENDING), ('_id', DESCENDING)], name='date_created_id'),
+        IndexModel([('role', ASCENDING), ('date_created', DESCENDING), ('_id', DESCENDING)],
+                   name='role_date_created_id'),
+        IndexModel([('search_prefixes', ASCENDING)], name='search_prefixes'),
+        IndexModel([('search_tokens', ASCENDING)], name='search_tokens'),
+    ],
+    'reviews': [
+        IndexModel([('reviewer_user_id', ASCENDING), ('reviewed_user_id', ASCENDING)],
+                   name='reviewer_reviewed_unique', unique=True),
+        IndexModel([('reviewer_user_id', ASCENDING), ('date_created', DESCENDING), ('_id', DESCENDING)],
+                   name='reviewer_date_created_id'),
+        IndexModel([('reviewed_user_id', ASCENDING), ('date_created', DESCENDING), ('_id', DESCENDING)],
+                   name='reviewed_date_created_id'),
+        IndexModel([('date_created', DESCENDING), ('_id', DESCENDING)], name='date_created_id'),
+        IndexModel([('project_type', ASCENDING), ('date_created', DESCENDING), ('_id', DESCENDING)],
+                   name='project_type_date_created_id'),
+    ],
+    'leaderboard': [
+        IndexModel([('score', DESCENDING), ('_id', ASCENDING)], name='score_id'),
+        IndexModel([('faculty', ASCENDING), ('score', DESCENDING), ('_id', ASCENDING)], name='faculty_score_id'),
+        IndexModel([('faculty', ASCENDING), ('department', ASCENDING), ('score', DESCENDING), ('_id', ASCENDING)],
+                   name='faculty_department_score_id'),
+        IndexModel([('department', ASCENDING), ('score', DESCENDING), ('_id', ASCENDING)],
+                   name='department_score_id'),
+    ],
+    'outbox': [
+        IndexModel([('status', ASCENDING), ('next_attempt_at', ASCENDING)], name='status_next_attempt_at'),
+    ],
+    'versions': [
+        IndexModel([('expires_at', ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0),
+    ],
+    'jobs': [
+        IndexModel([('status', ASCENDING), ('created_at', ASCENDING)], name='status_created_at'),
+        IndexModel([('created_at', DESCENDING)], name='created_at'),
+    ],
+}
+
+# Paginacija po ključu sortira po (date_created, _id)
+KEYSET_SORT = [('date_created', DESCENDING), ('_id', DESCENDING)]
+LEADERBOARD_SORT = [('score', DESCENDING), ('_id', ASCENDING)]
+
+# Upiti koje rute šalju, s oglednim vrijednostima, za provjeru preko explain()
+_SAMPLE_ID = ObjectId()
+
+ROUTE_QUERIES = [
+    ('auth.login / auth.register', 'users', {'email': 'provjera@kolegarecenzije.hr'}, None),
+    ('auth.verify_email', 'users', {'verification_token': 'token'}, None),
+    ('admin.users', 'users', {}, KEYSET_SORT),
+    ('admin.users (uloga)', 'users', {'role': 'admin'}, KEYSET_SORT),
+    ('reviews.search_users', 'users', {'search_prefixes': {'$all': ['ivan', 'ho']}}, None),
+    ('reviews.search_users (cijele riječi)', 'users', {'search_tokens': {'$all': ['ivan', 'horvat']}}, None),
+    ('reviews.add_review / can_user_review', 'reviews',
+     {'reviewer_user_id': _SAMPLE_ID, 'reviewed_user_id': _SAMPLE_ID}, None),
+    ('reviews.reviews', 'reviews', {}, KEYSET_SORT),
+    ('reviews.reviews (ocjena i vrsta projekta)', 'reviews',
+     {'rating': {'$gte': 4}, 'project_type': 'Timski rad'}, KEYSET_SORT),
+    ('reviews.reviews (ocijenjeni kolega)', 'reviews',
+     {'reviewed_user_id': {'$in': [_SAMPLE_ID]}, 'rating': {'$gte': 4}}, KEYSET_SORT),
+    ('async_api.list_reviews', 'reviews', {}, KEYSET_SORT),
+    ('async_api.list_reviews (vrsta projekta)', 'reviews',
+     {'project_type': 'Timski rad'}, KEYSET_SORT),
+    ('async_api.list_reviews (ocijenjeni kolega)', 'reviews',
+     {'reviewed_user_id': {'$in': [_SAMPLE_ID]}, 'project_type': 'Timski rad'}, KEYSET_SORT),
+    ('reviews.my_reviews', 'reviews',
+     {'reviewer_user_id': _SAMPLE_ID}, KEYSET_SORT),
+    ('profile.profile', 'reviews',
+     {'reviewed_user_id': _SAMPLE_ID}, KEYSET_SORT),
+    ('main.leaderboard', 'leaderboard', {}, LEADERBOARD_SORT),
+    ('main.leaderboard (fakultet i odsjek)', 'leaderboard',
+     {'faculty': 'FER', 'department': 'Računarstvo'}, LEADERBOARD_SORT),
+    ('main.leaderboard (odsjek)', 'leaderboard', {'department': 'Računarstvo'}, LEADERBOARD_SORT),
+    ('jobs.delete_user_reviews (autor)', 'reviews', {'reviewer_user_id': _SAMPLE_ID}, None),
+    ('jobs.delete_user_reviews (ocijenjeni)', 'reviews', {'reviewed_user_id': _SAMPLE_ID}, None),
+]
+
+# Agregacije koje rute šalju (isti pipeline kao u ruti); explain pokriva cijeli pipeline
+ROUTE_PIPELINES = [
+    ('reviews.reviews (brojevi po ocjeni i vrsti projekta, ocijenjeni kolega)', 'reviews',
+     facet_pipeline({'reviewed_user_id': {'$in': [_SAMPLE_ID]}}, ['rating', 'project_type'])),
+]
+
+
+def ensure_indexes():
+    """Kreiraj sve registrirane indekse (idempotentno), vrati popis grešaka"""
+    errors = []
+    for collection_name, indexes in INDEXES.items():
+        collection = mongo.db[collection_name]
+        for index in indexes:
+            # Jedan po jedan, da neuspjeh jednog indeksa ne blokira ostale
+            try:
+                collection.create_indexes([index])
+            except OperationFailure as e:
+                errors.append((collection_name, index.document['name'], str(e)))
+    return errors
+
+
+def _plan_stages(plan):
+    """Vrati sve nazive faza iz explain plana (rekurzivno)"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+def _winning_plans(explain):
+    """Svi winningPlan dijelovi explaina (find ima jedan, agregacija po jedan za svaki $cursor)"""
+    plans = []
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == 'winningPlan':
+                plans.append(value)
+            elif key != 'rejectedPlans':
+                plans.extend(_winning_plans(value))
+    elif isinstance(explain, list):
+        for item in explain:
+            plans.extend(_winning_plans(item))
+    return plans
+
+
+def explain_route_queries():
+    """Pokreni explain() za svaki registrirani upit i agregaciju, vrati (naziv, faze, collscan)"""
+    commands = []
+    for name, collection_name, query, sort in ROUTE_QUERIES:
+        command = {'find': collection_name, 'filter': query}
+        if sort:
+            command['sort'] = dict(sort)
+        commands.append((name, command))
+    for name, collection_name, pipeline in ROUTE_PIPELINES:
+        commands.append((name, {'aggregate': collection_name, 'pipeline': pipeline, 'cursor': {}}))
+
+    results = []
+    for name, command in commands:
+        explain = mongo.db.command('explain', command, verbosity='queryPlanner')
+        stages = _plan_stages(_winning_plans(explain))
+        results.append((name, stages, 'COLLSCAN' in stages))
+    return results
@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+from flask import request
+from pymongo import monitoring
+
+# Stanje mjerenja za zahtjev koji se trenutno obrađuje u ovoj dretvi.
+# PyMongo poziva listenere sinkrono u dretvi koja je poslala naredbu.
+_local = threading.local()
+
+
+class RequestRecorder:
+    """Mongo naredbe jednog HTTP zahtjeva"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.commands = []
+        self._pending = {}
+
+    def start(self, event):
+        self._pending[event.request_id] = (event.command_name, event.command.get(event.command_name))
+
+    def finish(self, event, failed=False):
+        name, target = self._pending.pop(event.request_id, (event.command_name, None))
+        host, port = event.connection_id
+        self.commands.append({
+            'command': name,
+            'collection': target if isinstance(target, str) else None,
+            # Server koji je odgovorio (primary ili sekundar, vidi replicas.read_db)
+            'server': f'{host}:{port}',
+            'ms': round(event.duration_micros / 1000, 3),
+            'failed': failed
+        })
+
+    @property
+    def count(self):
+        return len(self.commands)
+
+    @property
+    def total_ms(self):
+        return round(sum(command['ms'] for command in self.commands), 3)
+
+    @property
+    def slowest(self):
+        return max(self.commands, key=lambda command: command['ms']) if self.commands else None
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Prosljeđuje Mongo događaje recorderu aktivnog zahtjeva (ako postoji)"""
+
+    def started(self, event):
+        recorder = getattr(_local, 'recorder', None)
+        if recorder is not None:
+            recorder.start(event)
+
+    def succeeded(self, event):
+        recorder = getattr(_local, 'recorder', None)
+        if recorder is not None:
+            recorder.finish(event)
+
+    def failed(self, event):
+        recorder = getattr(_local, 'recorder', None)
+        if recorder is not None:
+            recorder.finish(event, failed=True)
+
+
+command_listener = MongoCommandListener()
+
+
+def current_recorder():
+    return getattr(_local, 'recorder', None)
+
+
+def _server_timing(recorder, total_ms):
+    metrics = [f'mongo;dur={recorder.total_ms};desc="{recorder.count} naredbi"']
+    slowest = recorder.slowest
+    if slowest:
+        label = ' '.join(part for part in (slowest['command'], slowest['collection']) if part)
+        metrics.append(f'mongo-slowest;dur={slowest["ms"]};desc="{label}"')
+    metrics.append(f'app;dur={total_ms}')
+    return ', '.join(metrics)
+
+
+def init_app(app):
+    """Mjerenje Mongo naredbi po zahtjevu: Server-Timing header i log sporih zahtjeva"""
+    if not app.config.get('MONGO_INSTRUMENTATION_ENABLED', True):
+        return
+
+    slow_ms = app.config.get('SLOW_REQUEST_MS', 500)
+    slow_queries = app.config.get('SLOW_REQUEST_QUERIES', 20)
+    server_timing = app.config.get('SERVER_TIMING_HEADER', True)
+
+    @app.before_request
+    def start_recording():
+        _local.recorder = RequestRecorder()
+
+    @app.after_request
+    def report_commands(response):
+        recorder = current_recorder()
+        if recorder is None:
+            return response
+
+        total_ms = round((time.perf_counter() - recorder.started_at) * 1000, 3)
+        if server_timing:
+            response.headers['Server-Timing'] = _server_timing(recorder, total_ms)
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': total_ms,
+            'mongo_commands': recorder.count,
+            'mongo_ms': recorder.total_ms,
+            'mongo_slowest': recorder.slowest
+        }
+        if total_ms > slow_ms or recorder.count > slow_queries:
+            # Popis naredbi odmah pokazuje N+1 petlje (isti find ponovljen N puta)
+            record['commands'] = recorder.commands
+            app.logger.warning('🐢 Slow request %s', json.dumps(record, ensure_ascii=False))
+        else:
+            app.logger.debug('request %s', json.dumps(record, ensure_ascii=False))
+        return response
+
+    @app.teardown_request
+    def stop_recording(exception=None):
+        _local.recorder = None
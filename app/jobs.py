@@ -0,0 +1,223 @@
+import threading
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument, DESCENDING
+from .extensions import mongo
+from . import stats, counters, versions, leaderboard
+
+# Stanja posla u jobs kolekciji
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+DELETE_USER = 'delete_user'
+
+
+def enqueue_job(job_type, **payload):
+    """Spremi posao u jobs kolekciju; izvršava ga pozadinski worker"""
+    now = datetime.utcnow()
+    result = mongo.db.jobs.insert_one(dict(payload, **{
+        'type': job_type,
+        'status': PENDING,
+        'progress': 0,
+        'total': None,
+        'attempts': 0,
+        'next_attempt_at': now,
+        'created_at': now,
+        'updated_at': now
+    }))
+    job_worker.wake()
+    return result.inserted_id
+
+
+def claim_next(stale_after):
+    """Atomski preuzmi sljedeći posao (i one čiji je worker prestao javljati napredak)"""
+    now = datetime.utcnow()
+    return mongo.db.jobs.find_one_and_update(
+        {'$or': [
+            # Poslovi od prije ponovnih pokušaja nemaju next_attempt_at
+            {'status': PENDING, 'next_attempt_at': {'$not': {'$gt': now}}},
+            {'status': RUNNING, 'updated_at': {'$lte': now - stale_after}}
+        ]},
+        {'$set': {'status': RUNNING, 'updated_at': now}, '$inc': {'attempts': 1}},
+        sort=[('created_at', 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def _report(job_id, **fields):
+    # Ujedno i heartbeat - posao koji dugo ne javlja napredak preuzima drugi worker
+    fields['updated_at'] = datetime.utcnow()
+    mongo.db.jobs.update_one({'_id': job_id}, {'$set': fields})
+
+
+def recent_jobs(limit=5):
+    """Zadnji poslovi za admin dashboard"""
+    return list(mongo.db.jobs.find().sort('created_at', DESCENDING).limit(limit))
+
+
+def enqueue_user_deletion(user):
+    """Obriši korisnika odmah, a njegove recenzije u pozadini"""
+    user_id = user['_id']
+    mongo.db.users.delete_one({'_id': user_id})
+    leaderboard.remove(user_id)
+    counters.increment('users', -1)
+    if user.get('role') == 'admin':
+        counters.increment('admins', -1)
+    versions.bump('users')
+    return enqueue_job(DELETE_USER, user_id=user_id, user_name=user.get('name'), user_email=user.get('email'))
+
+
+def _apply_batch(job, batch, progress):
+    """Obriši zapisani batch i primijeni ga na statistiku, brojače i leaderboard.
+
+    Batch je u job dokumentu (pending_batch) prije brisanja, pa ponovni pokušaj nakon
+    pada ovdje nastavlja s istim recenzijama. Koraci koji nisu idempotentni ($inc)
+    bilježe se u pending_batch.applied i ne ponavljaju se.
+    """
+    user_id = job['user_id']
+    reviews, applied = batch['reviews'], set(batch.get('applied', []))
+
+    def done(step):
+        mongo.db.jobs.update_one({'_id': job['_id']}, {'$addToSet': {'pending_batch.applied': step}})
+
+    mongo.db.reviews.delete_many({'_id': {'$in': [review['_id'] for review in reviews]}})
+    if 'stats' not in applied:
+        stats.record_reviews_removed(reviews, skip_user_id=user_id)
+        done('stats')
+    if 'counters' not in applied:
+        counters.increment('reviews', -len(reviews))
+        done('counters')
+    # Osvježavanje leaderboarda i verzija može se ponoviti bez posljedica
+    leaderboard.refresh(review['reviewed_user_id'] for review in reviews if review['reviewed_user_id'] != user_id)
+    versions.bump('reviews', *[f"review:{review['_id']}" for review in reviews])
+
+    progress += len(reviews)
+    mongo.db.jobs.update_one({'_id': job['_id']}, {
+        '$set': {'progress': progress, 'updated_at': datetime.utcnow()},
+        '$unset': {'pending_batch': ''}
+    })
+    return progress
+
+
+def delete_user_reviews(job, batch_size):
+    """Briši recenzije korisnika u batchevima i ažuriraj statistiku ostalih korisnika"""
+    user_id = job['user_id']
+    progress = job.get('progress', 0)
+    if job.get('total') is None:
+        total = (mongo.db.reviews.count_documents({'reviewer_user_id': user_id}) +
+                 mongo.db.reviews.count_documents({'reviewed_user_id': user_id}))
+        _report(job['_id'], total=total)
+
+    # Batch prekinutog pokušaja: recenzije su možda već obrisane, a statistika još nije ažurirana
+    if job.get('pending_batch'):
+        progress = _apply_batch(job, job['pending_batch'], progress)
+
+    # Dva upita po jednom indeksiranom polju umjesto $or
+    for field in ('reviewer_user_id', 'reviewed_user_id'):
+        while True:
+            reviews = list(mongo.db.reviews.find(
+                {field: user_id},
+                {'reviewer_user_id': 1, 'reviewed_user_id': 1, 'rating': 1, 'project_type': 1}
+            ).limit(batch_size))
+            if not reviews:
+                break
+            batch = {'reviews': reviews, 'applied': []}
+            _report(job['_id'], pending_batch=batch)
+            progress = _apply_batch(job, batch, progress)
+
+    stats.delete_user_stats(user_id)
+
+
+HANDLERS = {
+    DELETE_USER: delete_user_reviews,
+}
+
+
+def mark_failed(job, error, max_attempts, backoff_base):
+    """Zabilježi grešku; ponovi s eksponencijalnim odmakom ili odustani"""
+    attempts = job.get('attempts', 1)
+    if attempts >= max_attempts:
+        fields = {'status': FAILED, 'failed_at': datetime.utcnow()}
+    else:
+        delay = backoff_base * 2 ** (attempts - 1)
+        fields = {'status': PENDING, 'next_attempt_at': datetime.utcnow() + timedelta(seconds=delay)}
+    _report(job['_id'], error=str(error), **fields)
+
+
+def run_job(job, batch_size, max_attempts=5, backoff_base=30):
+    try:
+        HANDLERS[job['type']](job, batch_size)
+    except Exception as e:
+        print(f"⚠️ Job {job['_id']} ({job['type']}) failed (attempt {job.get('attempts', 1)}): {e}")
+        mark_failed(job, e, max_attempts, backoff_base)
+        return False
+    _report(job['_id'], status=DONE, finished_at=datetime.utcnow())
+    return True
+
+
+def run_pending(batch_size=500, stale_after=timedelta(minutes=5), max_attempts=5, backoff_base=30):
+    """Izvrši sve poslove na čekanju u ovoj dretvi (CLI, testiranje)"""
+    count = 0
+    while True:
+        job = claim_next(stale_after)
+        if job is None:
+            return count
+        run_job(job, batch_size, max_attempts, backoff_base)
+        count += 1
+
+
+class JobWorker:
+    """Pozadinska dretva koja izvršava poslove iz jobs kolekcije"""
+
+    def __init__(self):
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self, app):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(app,), name='job-worker', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self, app):
+        with app.app_context():
+            poll_interval = app.config.get('JOBS_POLL_INTERVAL', 5)
+            batch_size = app.config.get('JOBS_BATCH_SIZE', 500)
+            stale_after = timedelta(seconds=app.config.get('JOBS_STALE_AFTER', 300))
+            max_attempts = app.config.get('JOBS_MAX_ATTEMPTS', 5)
+            backoff_base = app.config.get('JOBS_BACKOFF', 30)
+
+            while not self._stop.is_set():
+                try:
+                    job = claim_next(stale_after)
+                except Exception as e:
+                    print(f"⚠️ Job claim failed: {e}")
+                    job = None
+
+                if job is None:
+                    # Periodično usklađivanje brojača (jedan worker po intervalu)
+                    try:
+                        counters.reconcile_if_due()
+                    except Exception as e:
+                        print(f"⚠️ Counter reconcile failed: {e}")
+                    self._wake.wait(poll_interval)
+                    self._wake.clear()
+                    continue
+                run_job(job, batch_size, max_attempts, backoff_base)
+
+
+job_worker = JobWorker()
@@ -0,0 +1,133 @@
+from datetime import datetime
+from bson import ObjectId
+from flask import current_app
+from pymongo import ReplaceOne, DeleteOne, DESCENDING, ASCENDING
+from .extensions import mongo
+from .stats import snapshot, delete_unchanged
+from . import versions
+
+# Poredak: najveći Bayesov prosjek prvi, kod istog rezultata stariji _id (indeksi imaju isti sort)
+SORT = [('score', DESCENDING), ('_id', ASCENDING)]
+PROFILE_PROJECTION = {'name': 1, 'faculty': 1, 'department': 1}
+
+
+def bayesian_score(received_count, rating_sum, prior_mean, prior_weight):
+    """Prosjek "skupljen" prema prior_mean; korisnik s malo recenzija ne preskače one s mnogo"""
+    return (prior_weight * prior_mean + rating_sum) / (prior_weight + received_count)
+
+
+def _entry(user, user_stats, prior_mean, prior_weight, updated_at):
+    received = user_stats['received_count']
+    rating_sum = user_stats['rating_sum']
+    return {
+        'name': user.get('name'),
+        'faculty': user.get('faculty') or '',
+        'department': user.get('department') or '',
+        'received_count': received,
+        'avg_rating': round(rating_sum / received, 2),
+        'score': bayesian_score(received, rating_sum, prior_mean, prior_weight),
+        'updated_at': updated_at
+    }
+
+
+def _prior():
+    config = current_app.config
+    return config.get('LEADERBOARD_PRIOR_MEAN', 3.0), config.get('LEADERBOARD_PRIOR_WEIGHT', 5)
+
+
+def refresh(user_ids):
+    """Preračunaj zapise ljestvice za ocijenjene korisnike iz user_stats (nakon promjene recenzija)"""
+    user_ids = list({ObjectId(user_id) for user_id in user_ids})
+    if not user_ids:
+        return
+    prior_mean, prior_weight = _prior()
+
+    stats = {document['_id']: document for document in mongo.db.user_stats.find(
+        {'_id': {'$in': user_ids}}, {'received_count': 1, 'rating_sum': 1})}
+    users = {user['_id']: user for user in mongo.db.users.find({'_id': {'$in': user_ids}}, PROFILE_PROJECTION)}
+
+    now = datetime.utcnow()
+    operations = []
+    for user_id in user_ids:
+        user_stats = stats.get(user_id)
+        if user_id not in users or not user_stats or user_stats.get('received_count', 0) <= 0:
+            operations.append(DeleteOne({'_id': user_id}))
+        else:
+            operations.append(ReplaceOne(
+                {'_id': user_id}, _entry(users[user_id], user_stats, prior_mean, prior_weight, now), upsert=True))
+    mongo.db.leaderboard.bulk_write(operations, ordered=False)
+
+
+def update_profile(user_id, name, faculty, department):
+    """Uskladi ime, fakultet i odsjek nakon izmjene korisnika"""
+    mongo.db.leaderboard.update_one(
+        {'_id': ObjectId(user_id)},
+        {'$set': {'name': name, 'faculty': faculty or '', 'department': department or ''}}
+    )
+
+
+def remove(user_id):
+    mongo.db.leaderboard.delete_one({'_id': ObjectId(user_id)})
+
+
+def top(faculty='', department='', limit=20):
+    """Top-N za fakultet i/ili odsjek, čita se s indeksa (filter, score, _id)"""
+    query = {}
+    if faculty:
+        query['faculty'] = faculty
+    if department:
+        query['department'] = department
+    return list(mongo.db.leaderboard.find(query).sort(SORT).limit(limit))
+
+
+def faculties():
+    return sorted(value for value in mongo.db.leaderboard.distinct('faculty') if value)
+
+
+def departments(faculty=''):
+    query = {'faculty': faculty} if faculty else {}
+    return sorted(value for value in mongo.db.leaderboard.distinct('department', query) if value)
+
+
+def rebuild(batch_size=1000):
+    """Ponovno izgradi ljestvicu iz user_stats, vrati (broj korisnika, stvarni prosjek svih ocjena)"""
+    prior_mean, prior_weight = _prior()
+    rebuilt_at = datetime.utcnow()
+    count = 0
+    total_received = 0
+    total_sum = 0
+    written_ids = []
+    before = snapshot(mongo.db.leaderboard, ['updated_at'])
+
+    cursor = mongo.db.user_stats.find({'received_count': {'$gt': 0}}, {'received_count': 1, 'rating_sum': 1})
+    batch = []
+    for user_stats in cursor:
+        batch.append(user_stats)
+        total_received += user_stats['received_count']
+        total_sum += user_stats['rating_sum']
+        if len(batch) >= batch_size:
+            count += _write_batch(batch, prior_mean, prior_weight, rebuilt_at, written_ids)
+            batch = []
+    if batch:
+        count += _write_batch(batch, prior_mean, prior_weight, rebuilt_at, written_ids)
+
+    # Kao rebuild_user_stats: zamjena na mjestu pa brisanje zapisa koji nisu dio izgradnje
+    # (osim onih koje je refresh() u međuvremenu upisao)
+    delete_unchanged(mongo.db.leaderboard, before, written_ids)
+    versions.bump('stats')
+    return count, (total_sum / total_received if total_received else None)
+
+
+def _write_batch(batch, prior_mean, prior_weight, rebuilt_at, written_ids):
+    user_ids = [user_stats['_id'] for user_stats in batch]
+    users = {user['_id']: user for user in mongo.db.users.find({'_id': {'$in': user_ids}}, PROFILE_PROJECTION)}
+    operations = [
+        ReplaceOne({'_id': user_stats['_id']},
+                   _entry(users[user_stats['_id']], user_stats, prior_mean, prior_weight, rebuilt_at),
+                   upsert=True)
+        for user_stats in batch if user_stats['_id'] in users
+    ]
+    if operations:
+        mongo.db.leaderboard.bulk_write(operations, ordered=False)
+    written_ids.extend(user_stats['_id'] for user_stats in batch if user_stats['_id'] in users)
+    return len(operations)
@@ -1,30 +1,30 @@
-from flask import render_template, current_app
+from flask import render_template, current_app, request
 from . import main_bp
-from ..extensions import mongo
+from ..reviews.utils import hydrate_reviews
+from ..models import Review
+from .. import counters, leaderboard as ranking
+from ..versions import conditional_get
+from ..replicas import read_db
 from bson import ObjectId
 
 @main_bp.route('/')
+@conditional_get(lambda: ['reviews', 'users', 'stats'])
 def index():
     # Dohvati nove recenzije za prikaz na početnoj stranici
-    recent_reviews = list(mongo.db.reviews.find().sort('date_created', -1).limit(3))
+    # Samo čitanje - sekundar replica seta (osim odmah nakon vlastitog spremanja)
+    db = read_db()
+    recent_reviews = Review.find(db.reviews, {}, sort=[('date_created', -1)], limit=3)
     
     # Pripremi podatke za prikaz
-    for review in recent_reviews:
-        reviewed_user = mongo.db.users.find_one({'_id': review['reviewed_user_id']})
-        reviewer_user = mongo.db.users.find_one({'_id': review['reviewer_user_id']})
-        
-        review['reviewed_user_name'] = reviewed_user['name'] if reviewed_user else 'Nepoznat korisnik'
-        review['reviewer_name'] = reviewer_user['name'] if reviewer_user else 'Nepoznat korisnik'
-        review['formatted_date'] = review['date_created'].strftime('%d.%m.%Y.')
+    hydrate_reviews(recent_reviews, db=db)
     
-    # Dohvati broj korisnika i recenzija za statistiku
-    users_count = mongo.db.users.count_documents({})
-    reviews_count = mongo.db.reviews.count_documents({})
+    # Dohvati broj korisnika i recenzija za statistiku (keširani brojači)
+    site_counters = counters.get_counters()
     
     return render_template('main/index.html', 
                          recent_reviews=recent_reviews,
-                         users_count=users_count,
-                         reviews_count=reviews_count)
+                         users_count=site_counters['users'],
+                         reviews_count=site_counters['reviews'])
 
 @main_bp.route('/about')
 def about_page():
@@ -34,6 +34,22 @@ def about_page():
 def contact_page():
     return render_template('main/contact.html')
 
+@main_bp.route('/leaderboard')
+@conditional_get(lambda: ['reviews', 'users', 'stats'])
+def leaderboard():
+    faculty = request.args.get('faculty', '')
+    department = request.args.get('department', '')
+    
+    # Unaprijed izračunata ljestvica (kolekcija leaderboard), top N s indeksa
+    colleagues = ranking.top(faculty, department, current_app.config.get('LEADERBOARD_SIZE', 20))
+    
+    return render_template('main/leaderboard.html',
+                         colleagues=colleagues,
+                         faculties=ranking.faculties(),
+                         departments=ranking.departments(faculty),
+                         faculty=faculty,
+                         department=department)
+
 # Error handlers
 @main_bp.app_errorhandler(404)
 def not_found_error(error):
@@ -49,4 +65,8 @@ def internal_error(error):
 
 @main_bp.app_errorhandler(429)
 def too_many_requests(error):
-    return render_template('errors/429.html'), 429
\ No newline at end of file
+    return render_template('errors/429.html'), 429
+
+@main_bp.app_errorhandler(503)
+def service_unavailable(error):
+    return render_template('errors/503.html'), 503
\ No newline at end of file
@@ -10,24 +10,10 @@ def format_date(value, format='%d.%m.%Y.'):
 
 def get_user_stats(user_id):
     """Dohvati statistiku korisnika"""
-    from ..extensions import mongo
-    from bson import ObjectId
-
-    # Broj recenzija koje je korisnik dobio
-    reviews_received = mongo.db.reviews.count_documents({
-        'reviewed_user_id': ObjectId(user_id)
-    })
-
-    # Prosječna ocjena korisnika
-    pipeline = [
-        {'$match': {'reviewed_user_id': ObjectId(user_id)}},
-        {'$group': {'_id': None, 'avg_rating': {'$avg': '$rating'}}}
-    ]
-
-    result = list(mongo.db.reviews.aggregate(pipeline))
-    avg_rating = result[0]['avg_rating'] if result else 0
+    from ..stats import get_stats
 
+    user_stats = get_stats(user_id)
     return {
-        'reviews_received': reviews_received,
-        'avg_rating': round(avg_rating, 1) if avg_rating else 0
+        'reviews_received': user_stats['reviews_received'],
+        'avg_rating': user_stats['avg_rating']
     }
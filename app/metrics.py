@@ -0,0 +1,326 @@
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from pymongo import common, monitoring
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class Registry:
+    """In-process registar metrika (counteri, gaugei i histogrami) u Prometheus text formatu.
+
+    Uz METRICS_MULTIPROC_DIR svaki proces (gunicorn worker, outbox worker) svakih
+    METRICS_FLUSH_INTERVAL sekundi zapisuje svoje vrijednosti u vlastitu datoteku, a
+    /metrics zbraja sve datoteke. Gaugei procesa koji više ne rade se ne zbrajaju.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._definitions = {}
+        self._values = {}
+        self._pid = os.getpid()
+        self.directory = None
+        self.flush_interval = 5
+        self._flusher_pid = None
+        # Zapisivanje datoteke (dretva za flush, /metrics, atexit) - jedan pisac istovremeno
+        self._flush_lock = threading.Lock()
+
+    def configure(self, app):
+        self.directory = app.config.get('METRICS_MULTIPROC_DIR')
+        self.flush_interval = app.config.get('METRICS_FLUSH_INTERVAL', 5)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._start_flusher()
+
+    def _start_flusher(self):
+        """Pozadinska dretva koja zapisuje datoteku i kad proces nema novih događaja (jednom po procesu)"""
+        if self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _ensure_flusher(self):
+        # Nakon forka (gunicorn --preload) dretva roditelja ne postoji u djetetu
+        if self.directory and self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def counter(self, name, documentation):
+        self._definitions[name] = ('counter', documentation, None)
+
+    def gauge(self, name, documentation):
+        # Vrijednosti gaugea svih procesa se zbrajaju (npr. otvorene konekcije)
+        self._definitions[name] = ('gauge', documentation, None)
+
+    def histogram(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self._definitions[name] = ('histogram', documentation, tuple(buckets))
+
+    def _check_fork(self):
+        # Nakon forka dijete ne smije ponovno prijaviti vrijednosti roditelja
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._values = {}
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            self._values[key] = self._values.get(key, 0) + amount
+        self._ensure_flusher()
+
+    def set(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            self._values[key] = value
+        self._ensure_flusher()
+
+    def observe(self, name, value, **labels):
+        buckets = self._definitions[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0}
+            index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+            state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+        self._ensure_flusher()
+
+    def _snapshot(self):
+        with self._lock:
+            self._check_fork()
+            snapshot = []
+            for (name, labels), value in self._values.items():
+                if isinstance(value, dict):
+                    value = dict(value, buckets=list(value['buckets']))
+                snapshot.append([name, [list(label) for label in labels], value])
+            return snapshot
+
+    def flush(self):
+        """Zapiši vrijednosti ovog procesa u dijeljeni direktorij (atomski); greška se samo logira"""
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f'metrics_{os.getpid()}.json')
+        with self._flush_lock:
+            temporary = None
+            try:
+                with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.directory,
+                                                 suffix='.tmp', delete=False) as f:
+                    temporary = f.name
+                    json.dump(self._snapshot(), f)
+                os.replace(temporary, path)
+            except OSError as e:
+                print(f"⚠️ Metrics flush failed: {e}")
+                if temporary:
+                    try:
+                        os.remove(temporary)
+                    except OSError:
+                        pass
+
+    def collect(self):
+        """Zbroji vrijednosti svih procesa: {(naziv, labele): vrijednost}"""
+        sources = [(self._snapshot(), True)]
+        if self.directory:
+            own_file = f'metrics_{os.getpid()}.json'
+            for filename in os.listdir(self.directory):
+                if not filename.startswith('metrics_') or not filename.endswith('.json') or filename == own_file:
+                    continue
+                try:
+                    with open(os.path.join(self.directory, filename), encoding='utf-8') as f:
+                        sources.append((json.load(f), _process_alive(filename[len('metrics_'):-len('.json')])))
+                except (OSError, ValueError):
+                    continue
+
+        merged = {}
+        for source, alive in sources:
+            for name, labels, value in source:
+                if name not in self._definitions:
+                    continue
+                # Counteri i histogrami završenog procesa ostaju u zbroju (da ukupno ne padne),
+                # gaugei (npr. otvorene konekcije) ne
+                if not alive and self._definitions[name][0] == 'gauge':
+                    continue
+                key = (name, tuple(tuple(label) for label in labels))
+                if isinstance(value, dict):
+                    state = merged.setdefault(key, {'buckets': [0] * len(value['buckets']), 'sum': 0.0, 'count': 0})
+                    state['buckets'] = [a + b for a, b in zip(state['buckets'], value['buckets'])]
+                    state['sum'] += value['sum']
+                    state['count'] += value['count']
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)"""
+        merged = self.collect()
+        lines = []
+        for name, (kind, documentation, buckets) in sorted(self._definitions.items()):
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (metric_name, labels), value in sorted(merged.items()):
+                if metric_name != name:
+                    continue
+                if kind in ('counter', 'gauge'):
+                    lines.append(f'{name}{_labels(labels)} {_number(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + (math.inf,), value['buckets']):
+                    cumulative += count
+                    le = '+Inf' if bound == math.inf else _number(bound)
+                    lines.append(f'{name}_bucket{_labels(labels + (("le", le),))} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(value["sum"])}')
+                lines.append(f'{name}_count{_labels(labels)} {value["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _process_alive(pid):
+    """Radi li proces s tim pidom (direktorij je lokalan za host/kontejner)"""
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        pass
+    return True
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+# Zadnje vrijednosti procesa koji se uredno gasi (recikliranje gunicorn workera)
+atexit.register(registry.flush)
+registry.counter('http_requests_total', 'HTTP zahtjevi po endpointu, metodi i statusu.')
+registry.histogram('http_request_duration_seconds', 'Trajanje HTTP zahtjeva po endpointu.')
+registry.counter('rate_limit_rejections_total', 'Zahtjevi odbijeni rate limiterom.')
+registry.histogram('mongo_pool_checkout_wait_seconds', 'Čekanje na konekciju iz Mongo poola.', POOL_WAIT_BUCKETS)
+registry.counter('mongo_pool_checkout_failures_total', 'Neuspjela preuzimanja konekcije iz Mongo poola.')
+registry.counter('mongo_pool_cleared_total', 'Pražnjenja Mongo poola (npr. nakon promjene primaryja).')
+registry.gauge('mongo_pool_connections', 'Otvorene konekcije po Mongo serveru.')
+registry.gauge('mongo_pool_checked_out_connections', 'Konekcije trenutno u upotrebi po Mongo serveru.')
+registry.gauge('mongo_pool_max_size', 'Najveća veličina poola (maxPoolSize) po Mongo serveru.')
+registry.counter('email_send_total', 'Ishodi slanja emailova iz outboxa (sent, retry, failed).')
+
+
+class PoolCheckoutListener(monitoring.ConnectionPoolListener):
+    """Mjeri koliko dugo dretva čeka na slobodnu konekciju iz poola i iskorištenost poola po serveru"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pools = {}
+
+    def _update(self, address, **changes):
+        label = f'{address[0]}:{address[1]}'
+        # Gaugei se postavljaju pod lockom da istovremeni događaji ne upišu stariju vrijednost
+        with self._lock:
+            pool = self._pools.setdefault(label, {'connections': 0, 'checked_out': 0, 'max_size': None})
+            for field, value in changes.items():
+                pool[field] = value(pool[field]) if callable(value) else value
+            registry.set('mongo_pool_connections', pool['connections'], address=label)
+            registry.set('mongo_pool_checked_out_connections', pool['checked_out'], address=label)
+            if pool['max_size'] is not None:
+                registry.set('mongo_pool_max_size', pool['max_size'], address=label)
+
+    def snapshot(self):
+        """{server: {connections, checked_out, max_size, utilization}} za ovaj proces"""
+        with self._lock:
+            pools = {label: dict(pool) for label, pool in self._pools.items()}
+        for pool in pools.values():
+            pool['utilization'] = round(pool['checked_out'] / pool['max_size'], 3) if pool['max_size'] else None
+        return pools
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, 'started', None)
+        if started is not None:
+            registry.observe('mongo_pool_checkout_wait_seconds', time.perf_counter() - started)
+            self._local.started = None
+        self._update(event.address, checked_out=lambda value: value + 1)
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        registry.inc('mongo_pool_checkout_failures_total', reason=str(event.reason))
+
+    def pool_created(self, event):
+        # options sadrži samo nezadane postavke; maxPoolSize=0 znači bez ograničenja
+        self._update(event.address, max_size=event.options.get('maxPoolSize', common.MAX_POOL_SIZE) or None)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        registry.inc('mongo_pool_cleared_total', address=f'{event.address[0]}:{event.address[1]}')
+
+    def pool_closed(self, event):
+        self._update(event.address, connections=0, checked_out=0)
+
+    def connection_created(self, event):
+        self._update(event.address, connections=lambda value: value + 1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, connections=lambda value: max(value - 1, 0))
+
+    def connection_checked_in(self, event):
+        self._update(event.address, checked_out=lambda value: max(value - 1, 0))
+
+
+pool_listener = PoolCheckoutListener()
+
+
+def record_rate_limit(request_limit):
+    """on_breach callback za Flask-Limiter"""
+    from flask import request
+    registry.inc('rate_limit_rejections_total', endpoint=request.endpoint or 'none')
+
+
+def init_app(app):
+    """Bilježenje trajanja i statusa svakog zahtjeva"""
+    registry.configure(app)
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started_at = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started_at', None)
+        if started is not None:
+            # Labela je endpoint, ne putanja - broj serija ostaje ograničen
+            endpoint = request.endpoint or 'none'
+            registry.observe('http_request_duration_seconds', time.perf_counter() - started, endpoint=endpoint)
+            registry.inc('http_requests_total', endpoint=endpoint, method=request.method,
+                         status=str(response.status_code))
+        return response
@@ -1,20 +1,126 @@
-from flask_login import UserMixin
-from bson import ObjectId
-
-class User(UserMixin):
-    def __init__(self, user_data):
-        self.id = str(user_data['_id'])
-        self.email = user_data['email']
-        self.name = user_data['name']
-        self.faculty = user_data.get('faculty', '')
-        self.department = user_data.get('department', '')
-        self.role = user_data.get('role', 'user')
-        self.email_verified = user_data.get('email_verified', False)
-        self.verification_token = user_data.get('verification_token')
-        self.date_created = user_data.get('date_created')
-    
+class Model:
+    """Osnova view modela: __slots__ i projekcija koja određuje koja se polja učitavaju.
+
+    Podklase u PROJECTION navode polja iz Mongo dokumenta; sve ostalo (hash lozinke,
+    tokeni, search_prefixes) se ne dohvaća i ne drži u memoriji.
+    """
+    __slots__ = ('_id',)
+    PROJECTION = {}
+    DEFAULTS = {}
+
+    def __init__(self, document):
+        self._id = document['_id']
+        for field in self.PROJECTION:
+            setattr(self, field, document.get(field, self.DEFAULTS.get(field)))
+
+    @classmethod
+    def find(cls, collection, query, sort=None, limit=0):
+        cursor = collection.find(query, cls.PROJECTION)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return [cls(document) for document in cursor]
+
+    @classmethod
+    def find_one(cls, collection, query):
+        document = collection.find_one(query, cls.PROJECTION)
+        return cls(document) if document else None
+
+    def __getitem__(self, key):
+        # Čitanje kao iz dicta, za helpere koji rade i s dokumentima (encode_cursor, izvoz)
+        return getattr(self, key)
+
+
+class User(Model):
+    """Prijavljeni korisnik (Flask-Login)"""
+    # Učitava se na svakom zahtjevu (load_user) - verifikacijski token čitaju samo auth rute
+    PROJECTION = {'email': 1, 'name': 1, 'faculty': 1, 'department': 1, 'role': 1,
+                  'email_verified': 1, 'date_created': 1}
+    DEFAULTS = {'faculty': '', 'department': '', 'role': 'user', 'email_verified': False}
+    __slots__ = tuple(PROJECTION)
+
+    # Sučelje koje Flask-Login očekuje (umjesto UserMixin, koji nema __slots__)
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    @property
+    def id(self):
+        return str(self._id)
+
+    def get_id(self):
+        return self.id
+
+    def __eq__(self, other):
+        return isinstance(other, User) and self.id == other.id
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
     def has_role(self, role_name):
         return self.role == role_name
-    
+
     def is_admin(self):
-        return self.role == 'admin'
\ No newline at end of file
+        return self.role == 'admin'
+
+
+class UserSummary(Model):
+    """Autor ili ocijenjeni korisnik recenzije - samo ime i fakultet"""
+    PROJECTION = {'name': 1, 'faculty': 1}
+    DEFAULTS = {'faculty': ''}
+    __slots__ = tuple(PROJECTION)
+
+
+class UserListItem(Model):
+    """Redak u admin popisu korisnika"""
+    PROJECTION = {'name': 1, 'email': 1, 'faculty': 1, 'department': 1, 'role': 1,
+                  'email_verified': 1, 'date_created': 1}
+    DEFAULTS = {'faculty': '', 'department': '', 'role': 'user', 'email_verified': False}
+    __slots__ = tuple(PROJECTION) + ('reviews_received', 'reviews_written')
+
+    def __init__(self, document):
+        super().__init__(document)
+        self.reviews_received = 0
+        self.reviews_written = 0
+
+    def set_stats(self, stats):
+        # Samo brojači, ne cijeli dict statistike (raspodjela ocjena se ovdje ne prikazuje)
+        self.reviews_received = stats['reviews_received']
+        self.reviews_written = stats['reviews_written']
+
+
+class Review(Model):
+    """Recenzija za prikaz; imena korisnika i datum računaju se tek kad ih template traži"""
+    PROJECTION = {'reviewer_user_id': 1, 'reviewed_user_id': 1, 'rating': 1, 'comment': 1,
+                  'project_type': 1, 'date_created': 1, 'last_updated': 1}
+    __slots__ = tuple(PROJECTION) + ('reviewer', 'reviewed_user', 'unknown_name', 'date_format')
+
+    def __init__(self, document):
+        super().__init__(document)
+        self.reviewer = None
+        self.reviewed_user = None
+        self.unknown_name = 'Nepoznat korisnik'
+        self.date_format = None
+
+    @property
+    def reviewer_name(self):
+        return self.reviewer.name if self.reviewer else self.unknown_name
+
+    @property
+    def reviewed_user_name(self):
+        return self.reviewed_user.name if self.reviewed_user else self.unknown_name
+
+    @property
+    def reviewer_faculty(self):
+        return self.reviewer.faculty if self.reviewer else ''
+
+    @property
+    def reviewed_user_faculty(self):
+        return self.reviewed_user.faculty if self.reviewed_user else ''
+
+    @property
+    def formatted_date(self):
+        return self.date_created.strftime(self.date_format) if self.date_format and self.date_created else ''
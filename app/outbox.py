@@ -0,0 +1,189 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from .extensions import mongo, mail
+from .metrics import registry
+
+# Stanja poruke u outbox kolekciji
+PENDING = 'pending'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+
+
+def enqueue_email(subject, recipients, body, sender=None):
+    """Spremi email u outbox; šalje ga pozadinski worker, ne zahtjev"""
+    now = datetime.utcnow()
+    result = mongo.db.outbox.insert_one({
+        'subject': subject,
+        'recipients': list(recipients),
+        'body': body,
+        'sender': sender,
+        'status': PENDING,
+        'attempts': 0,
+        'next_attempt_at': now,
+        'created_at': now
+    })
+    worker_pool.wake()
+    return result.inserted_id
+
+
+def claim_next(stale_after):
+    """Atomski preuzmi sljedeću poruku za slanje (i one zapele u 'sending')"""
+    now = datetime.utcnow()
+    return mongo.db.outbox.find_one_and_update(
+        {'$or': [
+            {'status': PENDING, 'next_attempt_at': {'$lte': now}},
+            {'status': SENDING, 'locked_at': {'$lte': now - stale_after}}
+        ]},
+        {'$set': {'status': SENDING, 'locked_at': now}, '$inc': {'attempts': 1}},
+        sort=[('next_attempt_at', 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def mark_sent(message_id):
+    mongo.db.outbox.update_one(
+        {'_id': message_id},
+        {'$set': {'status': SENT, 'sent_at': datetime.utcnow()}, '$unset': {'locked_at': '', 'last_error': ''}}
+    )
+
+
+def mark_failed(document, error, max_attempts, backoff_base):
+    """Zabilježi grešku; ponovi s eksponencijalnim odmakom ili odustani"""
+    if document['attempts'] >= max_attempts:
+        update = {'status': FAILED, 'failed_at': datetime.utcnow()}
+        registry.inc('email_send_total', outcome=FAILED)
+    else:
+        registry.inc('email_send_total', outcome='retry')
+        delay = backoff_base * 2 ** (document['attempts'] - 1)
+        update = {'status': PENDING, 'next_attempt_at': datetime.utcnow() + timedelta(seconds=delay)}
+    update['last_error'] = str(error)
+    mongo.db.outbox.update_one({'_id': document['_id']}, {'$set': update, '$unset': {'locked_at': ''}})
+
+
+def outbox_status():
+    """Broj poruka po stanju"""
+    counts = {PENDING: 0, SENDING: 0, SENT: 0, FAILED: 0}
+    for row in mongo.db.outbox.aggregate([{'$group': {'_id': '$status', 'count': {'$sum': 1}}}]):
+        counts[row['_id']] = row['count']
+    return counts
+
+
+class OutboxWorkerPool:
+    """Pozadinske dretve koje šalju poruke iz outboxa, svaka s vlastitom SMTP vezom"""
+
+    def __init__(self):
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self, app, workers=None):
+        with self._lock:
+            if any(thread.is_alive() for thread in self._threads):
+                return
+            self._stop.clear()
+            workers = workers or app.config.get('MAIL_OUTBOX_WORKERS', 2)
+            self._threads = [
+                threading.Thread(target=self._run, args=(app,), name=f'outbox-worker-{i}', daemon=True)
+                for i in range(workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self, app):
+        with app.app_context():
+            config = app.config
+            poll_interval = config.get('MAIL_OUTBOX_POLL_INTERVAL', 2)
+            idle_timeout = config.get('MAIL_OUTBOX_IDLE_TIMEOUT', 30)
+            max_attempts = config.get('MAIL_OUTBOX_MAX_ATTEMPTS', 5)
+            backoff_base = config.get('MAIL_OUTBOX_BACKOFF', 30)
+            stale_after = timedelta(seconds=config.get('MAIL_OUTBOX_STALE_AFTER', 300))
+
+            from flask_mail import Message
+
+            connection = None
+            last_used = 0
+            # Isporučene poruke čiji status još nije zapisan (npr. promjena primaryja)
+            unmarked = []
+            while not self._stop.is_set():
+                self._mark_sent(unmarked)
+                try:
+                    document = claim_next(stale_after)
+                except Exception as e:
+                    print(f"⚠️ Outbox claim failed: {e}")
+                    document = None
+
+                if document is None:
+                    # Zatvori SMTP vezu ako dugo nije korištena
+                    if connection and time.monotonic() - last_used > idle_timeout:
+                        connection = self._close(connection)
+                    self._wake.wait(poll_interval)
+                    self._wake.clear()
+                    continue
+
+                try:
+                    if connection is None:
+                        connection = mail.connect()
+                        connection.__enter__()
+                    connection.send(Message(
+                        subject=document['subject'],
+                        recipients=document['recipients'],
+                        body=document['body'],
+                        sender=document.get('sender')
+                    ))
+                except Exception as e:
+                    # Vezu nakon greške otvaramo iznova
+                    connection = self._close(connection)
+                    try:
+                        mark_failed(document, e, max_attempts, backoff_base)
+                    except Exception as db_error:
+                        print(f"⚠️ Outbox status update failed: {db_error}")
+                    continue
+
+                last_used = time.monotonic()
+                registry.inc('email_send_total', outcome=SENT)
+                unmarked.append(document['_id'])
+                self._mark_sent(unmarked)
+
+            self._mark_sent(unmarked)
+            self._close(connection)
+            registry.flush()
+
+    @staticmethod
+    def _mark_sent(message_ids):
+        """Zapiši 'sent' za isporučene poruke; neuspjele ostaju na popisu za sljedeći krug.
+
+        Isporučena poruka se nikad ne vraća u red (bila bi poslana dvaput) - ostaje
+        'sending' dok se status ne uspije zapisati.
+        """
+        while message_ids:
+            try:
+                mark_sent(message_ids[0])
+            except Exception as e:
+                print(f"⚠️ Outbox message {message_ids[0]} sent, but marking it failed: {e}")
+                return
+            message_ids.pop(0)
+
+    @staticmethod
+    def _close(connection):
+        if connection:
+            try:
+                connection.__exit__(None, None, None)
+            except Exception:
+                pass
+        return None
+
+
+worker_pool = OutboxWorkerPool()
@@ -0,0 +1,185 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app
+from pymongo import ASCENDING, DESCENDING
+from .cache import TTLCache
+
+# Recenzije i korisnici se listaju od najnovijih, (date_created, _id) je jedinstven ključ
+SORT = [('date_created', DESCENDING), ('_id', DESCENDING)]
+REVERSE_SORT = [('date_created', ASCENDING), ('_id', ASCENDING)]
+
+_count_cache = TTLCache(maxsize=256)
+
+
+def encode_cursor(document):
+    """Pretvori (date_created, _id) dokumenta u neprozirni token za URL"""
+    payload = json.dumps([document['date_created'].isoformat(), str(document['_id'])])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Vrati (date_created, _id) iz tokena, ili None ako token nije ispravan"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        date_created, object_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date_created), ObjectId(object_id)
+    except (ValueError, TypeError, InvalidId):
+        return None
+
+
+class Page:
+    def __init__(self, items, has_next, has_prev, total, per_page, facets=None):
+        self.items = items
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.total = total
+        self.per_page = per_page
+        self.facets = facets or {}
+
+    @property
+    def next_cursor(self):
+        return encode_cursor(self.items[-1]) if self.has_next and self.items else None
+
+    @property
+    def prev_cursor(self):
+        return encode_cursor(self.items[0]) if self.has_prev and self.items else None
+
+    @property
+    def total_pages(self):
+        return (self.total + self.per_page - 1) // self.per_page
+
+
+def approximate_count(collection, query):
+    """Broj dokumenata, keširan nakratko; bez filtera koristi estimated_document_count"""
+    ttl = current_app.config.get('PAGINATION_COUNT_CACHE_TTL', 60)
+    if not ttl:
+        return collection.count_documents(query)
+
+    key = (collection.name, repr(sorted(query.items())))
+    if query:
+        return _count_cache.get_or_set(key, lambda: collection.count_documents(query), ttl)
+    return _count_cache.get_or_set(key, collection.estimated_document_count, ttl)
+
+
+def keyset_query(query, after=None, before=None):
+    """Filter i sortiranje za stranicu po ključu; vrati (upit, sort, after, before)"""
+    after = decode_cursor(after)
+    before = None if after else decode_cursor(before)
+
+    page_query = query
+    sort = SORT
+    if after or before:
+        date_created, object_id = after or before
+        operator = '$lt' if after else '$gt'
+        keyset = {'$or': [
+            {'date_created': {operator: date_created}},
+            {'date_created': date_created, '_id': {operator: object_id}}
+        ]}
+        page_query = {'$and': [query, keyset]} if query else keyset
+        if before:
+            sort = REVERSE_SORT
+    return page_query, sort, after, before
+
+
+def build_page(items, per_page, after, before, total=None, facets=None):
+    """Page iz per_page + 1 dohvaćenih dokumenata (višak znači da postoji sljedeća stranica)"""
+    has_more = len(items) > per_page
+    items = items[:per_page]
+
+    if before:
+        items.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, after is not None
+
+    return Page(items, has_next, has_prev, total, per_page, facets)
+
+
+def keyset_paginate(collection, query, per_page, after=None, before=None, model=None):
+    """Dohvati stranicu po ključu (date_created, _id) umjesto skip().
+
+    Uz model (npr. Review) učitavaju se samo polja iz model.PROJECTION.
+    """
+    items, after, before = _find_page(collection, query, per_page, after, before, model)
+    return build_page(items, per_page, after, before, approximate_count(collection, query))
+
+
+def _find_page(collection, query, per_page, after, before, model):
+    page_query, sort, after, before = keyset_query(query, after, before)
+
+    # Dohvati jedan dokument više da znamo postoji li sljedeća stranica
+    projection = model.PROJECTION if model else None
+    items = list(collection.find(page_query, projection).sort(sort).limit(per_page + 1))
+    if model:
+        items = [model(document) for document in items]
+    return items, after, before
+
+
+def facet_pipeline(query, facet_fields):
+    """Brojevi po kombinaciji vrijednosti facet_fields; query mora biti indeksiran (vidi indexes verify)"""
+    return [
+        {'$match': query},
+        {'$group': {'_id': {field: f'${field}' for field in facet_fields}, 'count': {'$sum': 1}}}
+    ]
+
+
+def facet_rows(collection, query, facet_fields):
+    """[({polje: vrijednost}, broj)] za dokumente iz query, keširano kao approximate_count"""
+    def load():
+        return [(row['_id'], row['count']) for row in collection.aggregate(facet_pipeline(query, facet_fields))]
+
+    ttl = current_app.config.get('PAGINATION_COUNT_CACHE_TTL', 60)
+    if not ttl:
+        return load()
+    key = (collection.name, 'facets', tuple(facet_fields), repr(sorted(query.items())))
+    return _count_cache.get_or_set(key, load, ttl)
+
+
+def _matches(value, condition):
+    # Podskup Mongo uvjeta koji koriste filteri popisa (jednakost, usporedbe, $in)
+    if not isinstance(condition, dict):
+        return value == condition
+    operators = {
+        '$eq': lambda expected: value == expected,
+        '$in': lambda expected: value in expected,
+        '$gte': lambda expected: value is not None and value >= expected,
+        '$gt': lambda expected: value is not None and value > expected,
+        '$lte': lambda expected: value is not None and value <= expected,
+        '$lt': lambda expected: value is not None and value < expected,
+    }
+    return all(operators[operator](expected) for operator, expected in condition.items())
+
+
+def count_facets(rows, filters, facet_fields):
+    """(ukupno, {polje: {vrijednost: broj}}) iz redaka facet_rows; broj za polje uz sve filtere osim njegovog"""
+    total = 0
+    facets = {field: {} for field in facet_fields}
+    for values, count in rows:
+        failed = [field for field, condition in filters.items() if not _matches(values.get(field), condition)]
+        if not failed:
+            total += count
+        for field in facet_fields:
+            if not failed or failed == [field]:
+                value = values.get(field)
+                facets[field][value] = facets[field].get(value, 0) + count
+    return total, facets
+
+
+def faceted_paginate(collection, query, filters, facet_fields, per_page, after=None, before=None, model=None,
+                     rows=None):
+    """Stranica po ključu, ukupan broj i brojevi po vrijednostima facet_fields.
+
+    Stranica je indeksirani keyset find (query i filters zajedno). Brojevi dolaze iz
+    rows (npr. održavani brojači) ili iz $group iza indeksiranog $match na query -
+    bez query (cijela kolekcija) rows treba proslijediti.
+    """
+    items, after, before = _find_page(collection, dict(query, **filters), per_page, after, before, model)
+    if rows is None:
+        rows = facet_rows(collection, query, facet_fields)
+    total, facets = count_facets(rows, filters, facet_fields)
+    return build_page(items, per_page, after, before, total, facets)
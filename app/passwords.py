@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import bcrypt
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Postavke se čitaju iz konfiguracije u configure(app)
+_settings = {
+    'algorithm': 'bcrypt',
+    'bcrypt_rounds': 12,
+    'pbkdf2_iterations': 600000,
+    'workers': 0
+}
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+def configure(app):
+    _settings['algorithm'] = app.config.get('PASSWORD_HASH_ALGORITHM', 'bcrypt')
+    _settings['bcrypt_rounds'] = app.config.get('PASSWORD_BCRYPT_ROUNDS', 12)
+    _settings['pbkdf2_iterations'] = app.config.get('PASSWORD_PBKDF2_ITERATIONS', 600000)
+    _settings['workers'] = app.config.get('PASSWORD_HASH_WORKERS', 0)
+
+
+def _hash(password, algorithm, cost):
+    if algorithm == 'bcrypt':
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=cost)).decode('ascii')
+    return generate_password_hash(password, method=f'pbkdf2:sha256:{cost}')
+
+
+def _verify(stored_hash, password):
+    if stored_hash.startswith('$2'):
+        return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('ascii'))
+    return check_password_hash(stored_hash, password)
+
+
+def process_pool(workers):
+    """ProcessPoolExecutor čiji se procesi pokreću kroz 'spawn' - fork procesa koji već ima
+    dretve (PyMongo monitor, outbox, poslovi) može naslijediti zaključane lockove"""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _get_executor():
+    """Process pool se kreira lijeno i ponovno nakon forka (gunicorn worker)"""
+    global _executor, _executor_pid
+    if not _settings['workers']:
+        return None
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = process_pool(_settings['workers'])
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _run(function, *args):
+    # Hashiranje je CPU-bound; u zasebnom procesu ne drži GIL ostalim zahtjevima
+    executor = _get_executor()
+    if executor is None:
+        return function(*args)
+    return executor.submit(function, *args).result()
+
+
+def _current_cost():
+    if _settings['algorithm'] == 'bcrypt':
+        return _settings['bcrypt_rounds']
+    return _settings['pbkdf2_iterations']
+
+
+def hash_password(password):
+    """Hashiraj lozinku konfiguriranim algoritmom i cijenom"""
+    return _run(_hash, password, _settings['algorithm'], _current_cost())
+
+
+def hash_many(passwords, executor=None):
+    """Hashiraj više lozinki paralelno (npr. bulk import), redoslijed ostaje isti"""
+    executor = executor or _get_executor()
+    algorithm, cost = _settings['algorithm'], _current_cost()
+    if executor is None:
+        return [_hash(password, algorithm, cost) for password in passwords]
+    return list(executor.map(_hash, passwords, repeat(algorithm), repeat(cost)))
+
+
+def verify_password(stored_hash, password):
+    """Provjeri lozinku (bcrypt ili werkzeug hash)"""
+    if not stored_hash:
+        return False
+    return _run(_verify, stored_hash, password)
+
+
+def needs_rehash(stored_hash):
+    """Je li hash spremljen starijim algoritmom ili nižom cijenom od trenutne"""
+    if _settings['algorithm'] == 'bcrypt':
+        if not stored_hash.startswith('$2'):
+            return True
+        return int(stored_hash.split('$')[2]) < _settings['bcrypt_rounds']
+
+    method = stored_hash.split('$', 1)[0]
+    parts = method.split(':')
+    if parts[0] != 'pbkdf2':
+        return True
+    iterations = int(parts[2]) if len(parts) > 2 else 0
+    return iterations < _settings['pbkdf2_iterations']
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False)
+        _executor = None
@@ -1,8 +1,12 @@
 from flask import render_template, request, flash, redirect, url_for
 from flask_login import login_required, current_user
 from bson import ObjectId
-from werkzeug.security import generate_password_hash, check_password_hash
 from ..extensions import mongo
+from ..reviews.utils import hydrate_reviews
+from ..models import Review
+from .. import stats, user_cache, versions, leaderboard
+from ..search import search_fields
+from ..passwords import hash_password, verify_password
 
 # Import profile_bp iz __init__.py
 from . import profile_bp
@@ -11,26 +15,16 @@ from . import profile_bp
 @login_required
 def profile():
     # Dohvati korisnikove recenzije (koje je dobio)
-    user_reviews = list(mongo.db.reviews.find({'reviewed_user_id': ObjectId(current_user.id)}).sort('date_created', -1))
+    user_reviews = Review.find(mongo.db.reviews, {'reviewed_user_id': ObjectId(current_user.id)}, sort=[('date_created', -1)])
     
-    # Dohvati informacije o autorima recenzija
-    for review in user_reviews:
-        reviewer = mongo.db.users.find_one({'_id': review['reviewer_user_id']})
-        review['reviewer_name'] = reviewer['name'] if reviewer else 'Nepoznat korisnik'
-        review['reviewer_faculty'] = reviewer.get('faculty', '') if reviewer else ''
-    
-    # Izračunaj prosječnu ocjenu
-    total_rating = sum(review['rating'] for review in user_reviews)
-    avg_rating = total_rating / len(user_reviews) if user_reviews else 0
+    # Prosječna ocjena iz user_stats
+    avg_rating = stats.get_stats(current_user.id)['avg_rating']
     
     # Dohvati i recenzije koje je korisnik napisao
-    reviews_written = list(mongo.db.reviews.find({'reviewer_user_id': ObjectId(current_user.id)}).sort('date_created', -1).limit(5))
+    reviews_written = Review.find(mongo.db.reviews, {'reviewer_user_id': ObjectId(current_user.id)}, sort=[('date_created', -1)], limit=5)
     
-    # Pripremi podatke za recenzije koje je napisao
-    for review in reviews_written:
-        reviewed_user = mongo.db.users.find_one({'_id': review['reviewed_user_id']})
-        review['reviewed_user_name'] = reviewed_user['name'] if reviewed_user else 'Nepoznat korisnik'
-        review['formatted_date'] = review['date_created'].strftime('%d.%m.%Y. %H:%M')
+    # Dohvati informacije o korisnicima za obje liste jednim upitom
+    hydrate_reviews(user_reviews + reviews_written)
     
     return render_template('profile/profile.html', 
                          reviews=user_reviews, 
@@ -56,9 +50,13 @@ def edit_profile():
             {'$set': {
                 'name': name.strip(),
                 'faculty': faculty,
-                'department': department
+                'department': department,
+                **search_fields(name.strip(), current_user.email)
             }}
         )
+        user_cache.invalidate(current_user.id)
+        leaderboard.update_profile(current_user.id, name.strip(), faculty, department)
+        versions.bump('users')
         
         flash('Profil uspješno ažuriran!', 'success')
         return redirect(url_for('profile.profile'))
@@ -89,15 +87,16 @@ def change_password():
     
     # Provjeri trenutnu lozinku
     user_data = mongo.db.users.find_one({'_id': ObjectId(current_user.id)})
-    if not check_password_hash(user_data['password'], current_password):
+    if not verify_password(user_data['password'], current_password):
         flash('Trenutna lozinka nije točna.', 'danger')
         return redirect(url_for('profile.profile'))
     
     # Ažuriraj lozinku
     mongo.db.users.update_one(
         {'_id': ObjectId(current_user.id)},
-        {'$set': {'password': generate_password_hash(new_password)}}
+        {'$set': {'password': hash_password(new_password)}}
     )
+    user_cache.invalidate(current_user.id)
     
     flash('Lozinka uspješno promijenjena!', 'success')
     return redirect(url_for('profile.profile'))
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""Postavke Mongo klijenta (pool, timeouti, kompresija) i usmjeravanje čitanja.
+
+Rute koje samo čitaju popise i statistiku koriste read_db(): uz MONGO_SECONDARY_READS
+čitaju sa sekundara (secondaryPreferred, najviše MONGO_MAX_STALENESS_SECONDS
+zastarjelo). Pisanja uvijek idu na primary, a korisnik koji je upravo nešto
+spremio (POST -> redirect) određeno vrijeme čita s primaryja.
+"""
+import time
+from flask import current_app, has_request_context, request, session
+from pymongo.read_preferences import SecondaryPreferred
+from .extensions import mongo
+
+# Server ne prihvaća manje od 90 s (i ne manje od heartbeata + 10 s)
+MIN_MAX_STALENESS_SECONDS = 90
+PRIMARY_UNTIL_KEY = '_read_primary_until'
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+# Postavka iz config.py -> argument MongoClienta
+POOL_OPTIONS = [
+    ('MONGO_MAX_POOL_SIZE', 'maxPoolSize'),
+    ('MONGO_MIN_POOL_SIZE', 'minPoolSize'),
+    ('MONGO_MAX_CONNECTING', 'maxConnecting'),
+    ('MONGO_MAX_IDLE_TIME_MS', 'maxIdleTimeMS'),
+    ('MONGO_WAIT_QUEUE_TIMEOUT_MS', 'waitQueueTimeoutMS'),
+    ('MONGO_SERVER_SELECTION_TIMEOUT_MS', 'serverSelectionTimeoutMS'),
+    ('MONGO_CONNECT_TIMEOUT_MS', 'connectTimeoutMS'),
+    ('MONGO_SOCKET_TIMEOUT_MS', 'socketTimeoutMS'),
+]
+
+# Kompresori i paketi koje PyMongo za njih treba (zlib je u standardnoj biblioteci)
+COMPRESSOR_MODULES = {'zstd': 'zstandard', 'snappy': 'snappy', 'zlib': 'zlib'}
+
+
+def _setting(settings, name, default=None):
+    # app.config (dict) u Flasku, klasa iz config.py u asinkronom API-ju
+    if isinstance(settings, dict):
+        return settings.get(name, default)
+    return getattr(settings, name, default)
+
+
+def available_compressors(names):
+    """Kompresori iz popisa čiji je paket instaliran, istim redoslijedom (prednost)"""
+    available = []
+    for name in names:
+        module = COMPRESSOR_MODULES.get(name)
+        if module is None:
+            print(f"⚠️ Unknown Mongo compressor: {name}")
+            continue
+        try:
+            __import__(module)
+        except ImportError:
+            print(f"⚠️ Mongo compressor {name} skipped: package {module} is not installed")
+            continue
+        available.append(name)
+    return available
+
+
+def client_options(settings):
+    """Argumenti za MongoClient/PyMongo iz konfiguracije (neprazne vrijednosti)"""
+    options = {}
+    for setting, option in POOL_OPTIONS:
+        value = _setting(settings, setting)
+        if value is not None:
+            options[option] = value
+
+    compressors = [name.strip() for name in (_setting(settings, 'MONGO_COMPRESSORS') or '').split(',') if name.strip()]
+    compressors = available_compressors(compressors)
+    if compressors:
+        options['compressors'] = ','.join(compressors)
+        if 'zlib' in compressors and _setting(settings, 'MONGO_ZLIB_COMPRESSION_LEVEL') is not None:
+            options['zlibCompressionLevel'] = _setting(settings, 'MONGO_ZLIB_COMPRESSION_LEVEL')
+    return options
+
+
+def secondary_read_preference(settings):
+    """secondaryPreferred s ograničenom zastarjelošću (0 = bez ograničenja)"""
+    max_staleness = int(_setting(settings, 'MONGO_MAX_STALENESS_SECONDS') or 0)
+    if max_staleness <= 0:
+        return SecondaryPreferred()
+    return SecondaryPreferred(max_staleness=max(max_staleness, MIN_MAX_STALENESS_SECONDS))
+
+
+def pin_primary(seconds=None):
+    """Sljedećih N sekundi ovaj korisnik čita s primaryja (vidi vlastite izmjene)"""
+    if seconds is None:
+        seconds = current_app.config.get('MONGO_READ_YOUR_WRITES_SECONDS', MIN_MAX_STALENESS_SECONDS)
+    if seconds > 0:
+        session[PRIMARY_UNTIL_KEY] = time.time() + seconds
+
+
+def _pinned():
+    if not has_request_context():
+        return False
+    # Istekla oznaka se ne briše - izmjena sesije bi dodala Set-Cookie javnoj stranici
+    return session.get(PRIMARY_UNTIL_KEY, 0) > time.time()
+
+
+def read_db():
+    """Baza za rute koje samo čitaju: sekundari, osim ako je korisnik nedavno pisao"""
+    secondary_db = current_app.extensions.get('mongo_secondary_db')
+    if secondary_db is None or _pinned():
+        return mongo.db
+    return secondary_db
+
+
+def init_app(app):
+    if not app.config.get('MONGO_SECONDARY_READS') or mongo.db is None:
+        return
+
+    app.extensions['mongo_secondary_db'] = mongo.db.with_options(
+        read_preference=secondary_read_preference(app.config))
+
+    # Nakon uspješnog POST-a (spremanje pa redirect) sljedeća čitanja idu na primary
+    @app.after_request
+    def read_your_writes(response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and request.blueprint != 'health':
+            pin_primary()
+        return response
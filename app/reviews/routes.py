@@ -1,54 +1,64 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify, abort
+from flask import render_template, redirect, url_for, flash, request, jsonify, abort, current_app
 from flask_login import login_required, current_user
 from flask_principal import Permission, RoleNeed
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
-import bleach
 from . import reviews_bp
 from ..extensions import mongo
-from ..models import User
+from ..models import User, Review
+from .. import stats, counters, versions, leaderboard
+from ..replicas import read_db
+from ..versions import conditional_get
+from ..search import search_users as autocomplete_users
+from ..pagination import keyset_paginate, faceted_paginate
 from .forms import ReviewForm, EditReviewForm
+from .utils import hydrate_reviews, review_list_filters, clean_comment
 
 admin_permission = Permission(RoleNeed('admin'))
 
 @reviews_bp.route('/reviews')
+@conditional_get(lambda: ['reviews', 'users', 'stats'])
 def reviews():
     page = request.args.get('page', 1, type=int)
     # Paginacija - broj recenzija po stranici, inače je postavljeno na 12, stavljen 3 da se brže testira
     per_page = 3
-    skip = (page - 1) * per_page
     
-    # Filteri
+    # Filteri (sve na serveru, uključujući ime ocijenjenog kolege)
     rating_filter = request.args.get('rating', type=int)
     project_filter = request.args.get('project_type', '')
-    
-    query = {}
-    if rating_filter:
-        query['rating'] = {'$gte': rating_filter}
-    if project_filter:
-        query['project_type'] = project_filter
-    
-    # Dohvati recenzije s paginacijom
-    all_reviews = list(mongo.db.reviews.find(query).sort('date_created', -1).skip(skip).limit(per_page))
-    
-    total_reviews = mongo.db.reviews.count_documents(query)
-    total_pages = (total_reviews + per_page - 1) // per_page
+    user_filter = request.args.get('user', '').strip()
+    # Samo čitanje - sekundar replica seta (osim odmah nakon vlastitog spremanja)
+    db = read_db()
+    query, filters = review_list_filters(rating_filter, project_filter, user_filter, db=db)
+    
+    # Stranica po ključu (date_created, _id); ukupan broj i brojevi po ocjeni i vrsti projekta
+    # bez filtra po kolegi iz održavanih brojača, inače $group iza indeksiranog reviewed_user_id
+    rows = None if query else stats.get_review_facets()
+    pagination = faceted_paginate(db.reviews, query, filters, list(stats.FACET_FIELDS), per_page,
+                                  after=request.args.get('after'),
+                                  before=request.args.get('before'),
+                                  model=Review,
+                                  rows=rows)
+    all_reviews = pagination.items
+    
+    # Filter ocjene je "N i više" pa se brojevi po ocjeni zbrajaju odozgo
+    rating_counts = {rating: sum(count for value, count in pagination.facets['rating'].items()
+                                 if value is not None and value >= rating)
+                     for rating in range(1, 6)}
     
     # Pripremi podatke za prikaz
-    for review in all_reviews:
-        reviewer = mongo.db.users.find_one({'_id': review['reviewer_user_id']})
-        reviewed_user = mongo.db.users.find_one({'_id': review['reviewed_user_id']})
-        
-        review['reviewer_name'] = reviewer['name'] if reviewer else 'Nepoznat korisnik'
-        review['reviewed_user_name'] = reviewed_user['name'] if reviewed_user else 'Nepoznat korisnik'
-        review['formatted_date'] = review['date_created'].strftime('%d.%m.%Y. %H:%M')
+    hydrate_reviews(all_reviews, db=db)
     
     return render_template('reviews/reviews.html', 
                          reviews=all_reviews,
                          page=page,
-                         total_pages=total_pages,
+                         pagination=pagination,
+                         rating_counts=rating_counts,
+                         project_counts=pagination.facets['project_type'],
                          rating_filter=rating_filter,
-                         project_filter=project_filter)
+                         project_filter=project_filter,
+                         user_filter=user_filter)
 
 @reviews_bp.route('/add_review', methods=['GET', 'POST'])
 @login_required
@@ -58,7 +68,7 @@ def add_review():
     if form.validate_on_submit():
         reviewed_user_email = form.reviewed_user_email.data
         rating = form.rating.data
-        comment = bleach.clean(form.comment.data)
+        comment = clean_comment(form.comment.data)
         project_type = form.project_type.data
         
         # Pronađi korisnika koji se recenzira
@@ -93,7 +103,16 @@ def add_review():
             'last_updated': datetime.utcnow()
         }
         
-        mongo.db.reviews.insert_one(review_data)
+        try:
+            result = mongo.db.reviews.insert_one(review_data)
+        except DuplicateKeyError:
+            # Istodobno poslana ista recenzija (indeks reviewer_reviewed_unique)
+            flash('Već ste ocijenili ovog korisnika.', 'warning')
+            return render_template('reviews/add_review.html', form=form)
+        versions.bump('reviews', f'review:{result.inserted_id}')
+        stats.record_review_added(current_user.id, reviewed_user['_id'], rating, project_type)
+        leaderboard.refresh([reviewed_user['_id']])
+        counters.increment('reviews')
         flash('Recenzija uspješno dodana!', 'success')
         return redirect(url_for('reviews.reviews'))
     
@@ -104,24 +123,21 @@ def add_review():
 def my_reviews():
     page = request.args.get('page', 1, type=int)
     per_page = 10
-    skip = (page - 1) * per_page
     
     # Dohvati recenzije koje je korisnik napisao
-    my_reviews_list = list(mongo.db.reviews.find({'reviewer_user_id': ObjectId(current_user.id)}).sort('date_created', -1).skip(skip).limit(per_page))
-    
-    total_reviews = mongo.db.reviews.count_documents({'reviewer_user_id': ObjectId(current_user.id)})
-    total_pages = (total_reviews + per_page - 1) // per_page
+    pagination = keyset_paginate(mongo.db.reviews, {'reviewer_user_id': ObjectId(current_user.id)}, per_page,
+                                 after=request.args.get('after'),
+                                 before=request.args.get('before'),
+                                 model=Review)
+    my_reviews_list = pagination.items
     
     # Pripremi podatke za prikaz
-    for review in my_reviews_list:
-        reviewed_user = mongo.db.users.find_one({'_id': review['reviewed_user_id']})
-        review['reviewed_user_name'] = reviewed_user['name'] if reviewed_user else 'Nepoznat korisnik'
-        review['formatted_date'] = review['date_created'].strftime('%d.%m.%Y. %H:%M')
+    hydrate_reviews(my_reviews_list, date_format='%d.%m.%Y. %H:%M')
     
     return render_template('reviews/my_reviews.html', 
                          reviews=my_reviews_list,
                          page=page,
-                         total_pages=total_pages)
+                         pagination=pagination)
 
 @reviews_bp.route('/edit_review/<review_id>', methods=['GET', 'POST'])
 @login_required
@@ -141,7 +157,7 @@ def edit_review(review_id):
         # Ažuriraj recenziju
         update_data = {
             'rating': form.rating.data,
-            'comment': bleach.clean(form.comment.data),
+            'comment': clean_comment(form.comment.data),
             'project_type': form.project_type.data,
             'last_updated': datetime.utcnow()
         }
@@ -150,6 +166,10 @@ def edit_review(review_id):
             {'_id': ObjectId(review_id)},
             {'$set': update_data}
         )
+        stats.record_rating_changed(review['reviewed_user_id'], review['rating'], update_data['rating'],
+                                    review.get('project_type', ''), update_data['project_type'])
+        leaderboard.refresh([review['reviewed_user_id']])
+        versions.bump('reviews', f'review:{review_id}')
         
         flash('Recenzija uspješno ažurirana!', 'success')
         return redirect(url_for('reviews.my_reviews'))
@@ -179,26 +199,25 @@ def delete_review(review_id):
         abort(403)
     
     mongo.db.reviews.delete_one({'_id': ObjectId(review_id)})
+    stats.record_reviews_removed([review])
+    leaderboard.refresh([review['reviewed_user_id']])
+    counters.increment('reviews', -1)
+    versions.bump('reviews', f'review:{review_id}')
     flash('Recenzija uspješno obrisana!', 'success')
     
     return redirect(url_for('reviews.my_reviews'))
 
 @reviews_bp.route('/review/<review_id>')
+@conditional_get(lambda review_id: [f'review:{review_id}', 'users'])
 def review_detail(review_id):
-    review = mongo.db.reviews.find_one({'_id': ObjectId(review_id)})
+    db = read_db()
+    review = Review.find_one(db.reviews, {'_id': ObjectId(review_id)})
     
     if not review:
         abort(404)
     
     # Dohvati podatke o korisnicima
-    reviewer = mongo.db.users.find_one({'_id': review['reviewer_user_id']})
-    reviewed_user = mongo.db.users.find_one({'_id': review['reviewed_user_id']})
-    
-    review['reviewer_name'] = reviewer['name'] if reviewer else 'Nepoznat korisnik'
-    review['reviewed_user_name'] = reviewed_user['name'] if reviewed_user else 'Nepoznat korisnik'
-    review['reviewer_faculty'] = reviewer.get('faculty', '') if reviewer else ''
-    review['reviewed_user_faculty'] = reviewed_user.get('faculty', '') if reviewed_user else ''
-    review['formatted_date'] = review['date_created'].strftime('%d. %B %Y. u %H:%M')
+    hydrate_reviews([review], date_format='%d. %B %Y. u %H:%M', db=db)
     
     return render_template('reviews/review_detail.html', review=review)
 
@@ -206,21 +225,10 @@ def review_detail(review_id):
 def search_users():
     query = request.args.get('q', '')
     if query:
-        users = list(mongo.db.users.find({
-            '$or': [
-                {'name': {'$regex': query, '$options': 'i'}},
-                {'email': {'$regex': query, '$options': 'i'}}
-            ]
-        }).limit(10))
-        
-        users_data = [{
-            'id': str(user['_id']),
-            'name': user['name'],
-            'email': user['email'],
-            'faculty': user.get('faculty', ''),
-            'department': user.get('department', '')
-        } for user in users]
-        
-        return jsonify(users_data)
+        # Pretraga po indeksiranim prefiksima riječi (bez dijakritika), rangirano
+        response = jsonify(autocomplete_users(query, db=read_db()))
+        response.cache_control.private = True
+        response.cache_control.max_age = current_app.config.get('SEARCH_CACHE_TTL', 30)
+        return response
     
     return jsonify([])
\ No newline at end of file
@@ -1,35 +1,80 @@
 from bson import ObjectId
 from ..extensions import mongo
+from ..models import UserSummary
+from ..search import prefix_filter
+from .. import stats
+
+UNKNOWN_USER_NAME = 'Nepoznat korisnik'
+
+# Najviše korisnika čije se recenzije traže po imenu (širi upit treba precizniji unos)
+REVIEWED_USER_FILTER_LIMIT = 500
+
+
+def review_user_ids(reviews):
+    user_ids = set()
+    for review in reviews:
+        user_ids.add(review.reviewer_user_id)
+        user_ids.add(review.reviewed_user_id)
+    return list(user_ids)
+
+
+def apply_user_names(reviews, users, unknown_name=UNKNOWN_USER_NAME, date_format=None):
+    """Poveži recenzije s korisnicima iz {_id: UserSummary}; imena se čitaju lijeno"""
+    for review in reviews:
+        review.reviewer = users.get(review.reviewer_user_id)
+        review.reviewed_user = users.get(review.reviewed_user_id)
+        review.unknown_name = unknown_name
+        review.date_format = date_format
+
+    return reviews
+
+
+def hydrate_reviews(reviews, unknown_name=UNKNOWN_USER_NAME, date_format=None, db=None):
+    """Dopuni recenzije (Review) korisnicima jednim upitom (db: npr. replicas.read_db())"""
+    user_ids = review_user_ids(reviews)
+    db = mongo.db if db is None else db
+
+    # Jedan $in upit za sve korisnike na stranici, samo potrebna polja
+    users = {}
+    if user_ids:
+        users = {user._id: user for user in UserSummary.find(db.users, {'_id': {'$in': user_ids}})}
+
+    return apply_user_names(reviews, users, unknown_name, date_format)
+
+
+def review_list_filters(rating=None, project_type='', user_name='', db=None, user_ids=None):
+    """(query, filters) za popis recenzija.
+
+    Ime ocijenjenog korisnika razrješava se indeksiranom pretragom korisnika u
+    reviewed_user_id upit (ili se predaju već razriješeni user_ids, npr. iz
+    asinkronog API-ja); ocjena (N i više) i vrsta projekta idu u filters.
+    """
+    query = {}
+    user_filter = prefix_filter(user_name)
+    if user_ids is None and user_filter:
+        db = mongo.db if db is None else db
+        users = db.users.find(user_filter, {'_id': 1}).limit(REVIEWED_USER_FILTER_LIMIT)
+        user_ids = [user['_id'] for user in users]
+    if user_ids is not None:
+        query['reviewed_user_id'] = {'$in': user_ids}
+
+    filters = {}
+    if rating:
+        filters['rating'] = {'$gte': rating}
+    if project_type:
+        filters['project_type'] = project_type
+    return query, filters
+
+
+def clean_comment(text):
+    """Očisti HTML iz komentara; bleach se uvozi tek pri prvoj upotrebi"""
+    import bleach
+    return bleach.clean(text)
 
 
 def get_user_reviews_stats(user_id):
     """Dohvati statistiku recenzija za korisnika"""
-    # Recenzije koje je korisnik dobio
-    reviews_received = list(mongo.db.reviews.find({
-        'reviewed_user_id': ObjectId(user_id)
-    }))
-
-    # Recenzije koje je korisnik napisao
-    reviews_written = mongo.db.reviews.count_documents({
-        'reviewer_user_id': ObjectId(user_id)
-    })
-
-    # Prosječna ocjena
-    total_rating = sum(review['rating'] for review in reviews_received)
-    avg_rating = total_rating / \
-        len(reviews_received) if reviews_received else 0
-
-    # Raspodjela ocjena
-    rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    for review in reviews_received:
-        rating_distribution[review['rating']] += 1
-
-    return {
-        'reviews_received': len(reviews_received),
-        'reviews_written': reviews_written,
-        'avg_rating': round(avg_rating, 1),
-        'rating_distribution': rating_distribution
-    }
+    return stats.get_stats(user_id)
 
 
 def can_user_review(reviewer_id, reviewed_user_id):
@@ -0,0 +1,140 @@
+import re
+import unicodedata
+from pymongo import UpdateOne
+from flask import current_app
+from .cache import TTLCache
+from .extensions import mongo
+
+# đ se ne rastavlja kroz NFKD pa ga mapiramo ručno, ostala slova (č, ć, š, ž) pokriva NFKD
+_FOLD = str.maketrans({'đ': 'd', 'Đ': 'd'})
+_TOKEN_SPLIT = re.compile(r'[^a-z0-9]+')
+
+MIN_PREFIX = 1
+MAX_PREFIX = 20
+# Povećati kad se promijeni search_fields - bootstrap tada ponovno izračuna polja svih korisnika
+SEARCH_VERSION = 2
+RESULT_LIMIT = 10
+# Koliko kandidata dohvatiti iz baze za rangiranje
+CANDIDATE_LIMIT = 50
+
+SEARCH_PROJECTION = {'name': 1, 'email': 1, 'faculty': 1, 'department': 1}
+
+_cache = TTLCache(maxsize=2048)
+
+
+def normalize(text):
+    """Mala slova, bez dijakritika (č/ć/š/ž/đ -> c/c/s/z/d)"""
+    text = (text or '').translate(_FOLD)
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    return [token for token in _TOKEN_SPLIT.split(normalize(text)) if token]
+
+
+def search_fields(name, email):
+    """Polja za pretragu koja se spremaju uz korisnika (cijele riječi i prefiksi riječi iz imena i
+    cijelog emaila, uključujući domenu)"""
+    tokens = set(tokenize(name) + tokenize(email))
+    prefixes = set()
+    for token in tokens:
+        for length in range(MIN_PREFIX, min(len(token), MAX_PREFIX) + 1):
+            prefixes.add(token[:length])
+    return {
+        'search_tokens': sorted(token[:MAX_PREFIX] for token in tokens),
+        'search_prefixes': sorted(prefixes),
+        'search_version': SEARCH_VERSION
+    }
+
+
+def prefix_filter(query):
+    """Mongo filter za korisnike čije riječi počinju upisanim riječima, ili None"""
+    terms = [term[:MAX_PREFIX] for term in tokenize(query) if len(term) >= MIN_PREFIX]
+    if not terms:
+        return None
+    return {'search_prefixes': {'$all': terms}}
+
+
+def candidate_filters(query):
+    """Upiti za kandidate redom prednosti: točan email, sve riječi točno, sve riječi kao prefiksi.
+
+    Kandidati se dohvaćaju do CANDIDATE_LIMIT pa točni pogoci ne ispadnu prije rangiranja.
+    """
+    query_filter = prefix_filter(query)
+    if not query_filter:
+        return []
+    terms = query_filter['search_prefixes']['$all']
+    filters = []
+    if '@' in query:
+        filters.append({'email': query.strip()})
+    filters.append({'search_tokens': {'$all': terms}})
+    filters.append(query_filter)
+    return filters
+
+
+def _rank(user, terms):
+    name_tokens = tokenize(user.get('name'))
+    email_tokens = tokenize(user.get('email', ''))
+    if [token[:MAX_PREFIX] for token in email_tokens] == terms:
+        # Upisan cijeli email
+        return -100, len(user.get('name', '')), normalize(user.get('name'))
+    score = 0
+    for term in terms:
+        if term in name_tokens:
+            score += 3
+        elif any(token.startswith(term) for token in name_tokens):
+            score += 2
+        elif any(token.startswith(term) for token in email_tokens):
+            score += 1
+    # Veći rezultat prvi, zatim kraće ime i abecedno
+    return -score, len(user.get('name', '')), normalize(user.get('name'))
+
+
+def rank_candidates(candidates, terms, limit):
+    """Rangiraj kandidate i vrati JSON-serijalizabilne rezultate"""
+    candidates.sort(key=lambda user: _rank(user, terms))
+    return [{
+        'id': str(user['_id']),
+        'name': user['name'],
+        'email': user['email'],
+        'faculty': user.get('faculty', ''),
+        'department': user.get('department', '')
+    } for user in candidates[:limit]]
+
+
+def search_users(query, limit=RESULT_LIMIT, db=None):
+    """Autocomplete pretraga korisnika po imenu i emailu, rezultati keširani nakratko"""
+    filters = candidate_filters(query)
+    if not filters:
+        return []
+
+    terms = filters[-1]['search_prefixes']['$all']
+    ttl = current_app.config.get('SEARCH_CACHE_TTL', 30)
+    db = mongo.db if db is None else db
+
+    def run_search():
+        candidates = {}
+        for query_filter in filters:
+            if len(candidates) >= CANDIDATE_LIMIT:
+                break
+            for user in db.users.find(query_filter, SEARCH_PROJECTION).limit(CANDIDATE_LIMIT):
+                candidates.setdefault(user['_id'], user)
+        return rank_candidates(list(candidates.values()), terms, limit)
+
+    return _cache.get_or_set((query.strip(), limit), run_search, ttl)
+
+
+def reindex_users(batch_size=1000, outdated_only=False):
+    """Izračunaj polja za pretragu za sve korisnike (ili samo one sa starom SEARCH_VERSION), vrati broj ažuriranih"""
+    operations = []
+    updated = 0
+    query = {'search_version': {'$ne': SEARCH_VERSION}} if outdated_only else {}
+    for user in mongo.db.users.find(query, {'name': 1, 'email': 1}).batch_size(batch_size):
+        operations.append(UpdateOne({'_id': user['_id']}, {'$set': search_fields(user.get('name'), user.get('email'))}))
+        if len(operations) >= batch_size:
+            updated += mongo.db.users.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += mongo.db.users.bulk_write(operations, ordered=False).modified_count
+    return updated
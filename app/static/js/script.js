@@ -1,65 +1,10 @@
 // Glavni JavaScript za Recenzijsku platformu
 
 document.addEventListener('DOMContentLoaded', function () {
-    initializeFilters();
     initializeRatingInputs();
     initializeUserSearch();
 });
 
-// Funkcije za filtriranje recenzija
-function initializeFilters() {
-    const filterRating = document.getElementById('filter_rating');
-    const filterProject = document.getElementById('filter_project');
-    const searchUser = document.getElementById('search_user');
-
-    if (filterRating) {
-        filterRating.addEventListener('change', filterReviews);
-    }
-    if (filterProject) {
-        filterProject.addEventListener('change', filterReviews);
-    }
-    if (searchUser) {
-        searchUser.addEventListener('input', filterReviews);
-    }
-}
-
-function filterReviews() {
-    const ratingFilter = document.getElementById('filter_rating').value;
-    const projectFilter = document.getElementById('filter_project').value;
-    const userSearch = document.getElementById('search_user').value.toLowerCase();
-
-    const reviews = document.querySelectorAll('.review-card');
-
-    reviews.forEach(review => {
-        const rating = review.getAttribute('data-rating');
-        const project = review.getAttribute('data-project');
-        const userName = review.getAttribute('data-user');
-
-        let show = true;
-
-        // Filtriraj po ocjeni
-        if (ratingFilter && rating < ratingFilter) {
-            show = false;
-        }
-
-        // Filtriraj po vrsti projekta
-        if (projectFilter && project !== projectFilter) {
-            show = false;
-        }
-
-        // Filtriraj po korisniku
-        if (userSearch && !userName.includes(userSearch)) {
-            show = false;
-        }
-
-        if (show) {
-            review.style.display = 'block';
-        } else {
-            review.style.display = 'none';
-        }
-    });
-}
-
 // Funkcije za ocjenjivanje
 function initializeRatingInputs() {
     const ratingInputs = document.querySelectorAll('input[name="rating"]');
@@ -92,6 +37,14 @@ function updateRatingDisplay(rating) {
 }
 
 // Funkcije za pretragu korisnika
+const SEARCH_DEBOUNCE_MS = 250;
+const SEARCH_CACHE_TTL_MS = 30000;
+const SEARCH_CACHE_MAX = 100;
+
+// Cache rezultata po upitu, da se isti upit ne šalje ponovno
+const searchCache = new Map();
+let searchController = null;
+
 function initializeUserSearch() {
     const userSearchInput = document.getElementById('user-search');
 
@@ -102,24 +55,47 @@ function initializeUserSearch() {
             clearTimeout(debounceTimer);
             debounceTimer = setTimeout(() => {
                 searchUsers(this.value);
-            }, 300);
+            }, SEARCH_DEBOUNCE_MS);
         });
     }
 }
 
+function normalizeSearchQuery(query) {
+    return query.trim().toLowerCase().replace(/\s+/g, ' ');
+}
+
 function searchUsers(query) {
+    query = normalizeSearchQuery(query);
     if (query.length < 2) {
         clearSearchResults();
         return;
     }
 
-    fetch(`/api/users/search?q=${encodeURIComponent(query)}`)
+    const cached = searchCache.get(query);
+    if (cached && cached.expires > Date.now()) {
+        displaySearchResults(cached.users);
+        return;
+    }
+
+    // Prekini prethodni zahtjev da stari odgovor ne pregazi noviji
+    if (searchController) {
+        searchController.abort();
+    }
+    searchController = new AbortController();
+
+    fetch(`/api/users/search?q=${encodeURIComponent(query)}`, { signal: searchController.signal })
         .then(response => response.json())
         .then(users => {
+            if (searchCache.size >= SEARCH_CACHE_MAX) {
+                searchCache.delete(searchCache.keys().next().value);
+            }
+            searchCache.set(query, { users, expires: Date.now() + SEARCH_CACHE_TTL_MS });
             displaySearchResults(users);
         })
         .catch(error => {
-            console.error('Error searching users:', error);
+            if (error.name !== 'AbortError') {
+                console.error('Error searching users:', error);
+            }
         });
 }
 
@@ -220,7 +196,6 @@ function showAlert(message, type) {
 
 // Export funkcija za globalni pristup (ako je potrebno)
 window.RecenzijeApp = {
-    filterReviews,
     searchUsers,
     validateReviewForm,
     showAlert
@@ -0,0 +1,315 @@
+from collections import defaultdict
+from datetime import datetime
+from bson import ObjectId
+from flask import current_app
+from pymongo import UpdateOne, ReplaceOne, DeleteOne
+from .cache import TTLCache
+from .extensions import mongo
+from . import versions
+
+RATINGS = (1, 2, 3, 4, 5)
+
+# Brojevi recenzija po (ocjena, vrsta projekta) - brojevi u filterima popisa recenzija bez čitanja kolekcije
+FACET_FIELDS = ('rating', 'project_type')
+_facet_cache = TTLCache(maxsize=1)
+_FACET_CACHE_KEY = 'review_facets'
+
+
+def _empty_stats():
+    return {
+        'received_count': 0,
+        'rating_sum': 0,
+        'rating_distribution': {str(rating): 0 for rating in RATINGS},
+        'written_count': 0
+    }
+
+
+def _facet_id(rating, project_type):
+    return f'{rating}|{project_type or ""}'
+
+
+def _record_facets(changes):
+    """Primijeni {(ocjena, vrsta projekta): promjena} na kolekciju review_facets"""
+    operations = [
+        UpdateOne({'_id': _facet_id(rating, project_type)},
+                  {'$inc': {'count': delta}, '$setOnInsert': {'rating': rating, 'project_type': project_type or ''}},
+                  upsert=True)
+        for (rating, project_type), delta in changes.items() if delta
+    ]
+    if operations:
+        mongo.db.review_facets.bulk_write(operations, ordered=False)
+    _facet_cache.delete(_FACET_CACHE_KEY)
+
+
+def record_review_added(reviewer_id, reviewed_user_id, rating, project_type=''):
+    """Ažuriraj statistiku nakon dodavanja recenzije"""
+    mongo.db.user_stats.update_one(
+        {'_id': ObjectId(reviewed_user_id)},
+        {'$inc': {
+            'received_count': 1,
+            'rating_sum': rating,
+            f'rating_distribution.{rating}': 1
+        }},
+        upsert=True
+    )
+    mongo.db.user_stats.update_one(
+        {'_id': ObjectId(reviewer_id)},
+        {'$inc': {'written_count': 1}},
+        upsert=True
+    )
+    _record_facets({(rating, project_type or ''): 1})
+
+
+def record_reviews_added(reviews):
+    """Ažuriraj statistiku nakon uvoza više recenzija (jedan bulk_write)"""
+    increments = defaultdict(lambda: defaultdict(int))
+    facets = defaultdict(int)
+    for review in reviews:
+        facets[(review['rating'], review.get('project_type') or '')] += 1
+        reviewed = increments[review['reviewed_user_id']]
+        reviewed['received_count'] += 1
+        reviewed['rating_sum'] += review['rating']
+        reviewed[f"rating_distribution.{review['rating']}"] += 1
+        increments[review['reviewer_user_id']]['written_count'] += 1
+
+    operations = [
+        UpdateOne({'_id': user_id}, {'$inc': dict(inc)}, upsert=True)
+        for user_id, inc in increments.items()
+    ]
+    if operations:
+        mongo.db.user_stats.bulk_write(operations, ordered=False)
+    _record_facets(facets)
+
+
+def record_rating_changed(reviewed_user_id, old_rating, new_rating, old_project_type='', new_project_type=''):
+    """Ažuriraj statistiku nakon promjene ocjene i/ili vrste projekta"""
+    old_facet, new_facet = (old_rating, old_project_type or ''), (new_rating, new_project_type or '')
+    if old_facet != new_facet:
+        _record_facets({old_facet: -1, new_facet: 1})
+    if old_rating == new_rating:
+        return
+    mongo.db.user_stats.update_one(
+        {'_id': ObjectId(reviewed_user_id)},
+        {'$inc': {
+            'rating_sum': new_rating - old_rating,
+            f'rating_distribution.{old_rating}': -1,
+            f'rating_distribution.{new_rating}': 1
+        }},
+        upsert=True
+    )
+
+
+def record_reviews_removed(reviews, skip_user_id=None):
+    """Ažuriraj statistiku nakon brisanja recenzija (jedan bulk_write)"""
+    increments = defaultdict(lambda: defaultdict(int))
+    facets = defaultdict(int)
+    for review in reviews:
+        facets[(review['rating'], review.get('project_type') or '')] -= 1
+        reviewed = increments[review['reviewed_user_id']]
+        reviewed['received_count'] -= 1
+        reviewed['rating_sum'] -= review['rating']
+        reviewed[f"rating_distribution.{review['rating']}"] -= 1
+        increments[review['reviewer_user_id']]['written_count'] -= 1
+
+    # Statistiku korisnika koji se briše ne treba ažurirati
+    if skip_user_id is not None:
+        increments.pop(ObjectId(skip_user_id), None)
+
+    operations = [
+        UpdateOne({'_id': user_id}, {'$inc': dict(inc)})
+        for user_id, inc in increments.items()
+    ]
+    if operations:
+        mongo.db.user_stats.bulk_write(operations, ordered=False)
+    _record_facets(facets)
+
+
+def delete_user_stats(user_id):
+    """Obriši statistiku korisnika"""
+    mongo.db.user_stats.delete_one({'_id': ObjectId(user_id)})
+
+
+def get_stats(user_id):
+    """Dohvati statistiku jednog korisnika (O(1) čitanje)"""
+    stats = mongo.db.user_stats.find_one({'_id': ObjectId(user_id)})
+    return format_stats(stats)
+
+
+def get_stats_for_users(user_ids):
+    """Dohvati statistiku za više korisnika jednim upitom"""
+    documents = mongo.db.user_stats.find({'_id': {'$in': list(user_ids)}})
+    stats = {document['_id']: document for document in documents}
+    return {user_id: format_stats(stats.get(user_id)) for user_id in user_ids}
+
+
+def format_stats(stats):
+    """Pretvori dokument iz user_stats u oblik koji koriste rute i templateovi"""
+    stats = stats or _empty_stats()
+    received = stats.get('received_count', 0)
+    distribution = stats.get('rating_distribution', {})
+    avg_rating = stats.get('rating_sum', 0) / received if received else 0
+
+    return {
+        'reviews_received': received,
+        'reviews_written': stats.get('written_count', 0),
+        'avg_rating': round(avg_rating, 1),
+        'rating_distribution': {rating: distribution.get(str(rating), 0) for rating in RATINGS}
+    }
+
+
+def get_review_facets():
+    """[({rating, project_type}, broj)] za cijelu kolekciju reviews, kroz kratki in-process cache"""
+    ttl = current_app.config.get('COUNTERS_CACHE_TTL', 30)
+    return _facet_cache.get_or_set(_FACET_CACHE_KEY, _load_review_facets, ttl)
+
+
+def _load_review_facets():
+    # Bez agregacije na zahtjevu: praznu kolekciju (baza od prije brojača) gradi bootstrap
+    # ili `flask stats rebuild`, do tada su brojevi prazni
+    documents = list(mongo.db.review_facets.find())
+    return [({'rating': document['rating'], 'project_type': document['project_type']}, document['count'])
+            for document in documents if document['count'] > 0]
+
+
+def ensure_review_facets():
+    """Izgradi review_facets ako je kolekcija prazna, a recenzija ima (bootstrap); True ako je izgrađena"""
+    if mongo.db.review_facets.find_one({}, {'_id': 1}) or not mongo.db.reviews.find_one({}, {'_id': 1}):
+        return False
+    rebuild_review_facets()
+    return True
+
+
+def snapshot(collection, fields, ids=None):
+    """{_id: vrijednosti polja} prije ponovne izgradnje, za replace_unchanged() i delete_unchanged()"""
+    projection = {field: 1 for field in fields}
+    query = {} if ids is None else {'_id': {'$in': list(ids)}}
+    return {document['_id']: {field: document.get(field) for field in fields}
+            for document in collection.find(query, projection)}
+
+
+def replace_unchanged(collection, before, documents, rebuilt_at):
+    """Zamijeni dokumente novim vrijednostima, ali samo ako se od snimke nisu promijenili.
+
+    Istodobni $inc (nova ili promijenjena recenzija) između snimke i zapisa bi se
+    zamjenom izgubio, pa se takvi dokumenti preskaču. Vraća _id-eve koji nisu
+    zapisani - njih treba ponovno izračunati.
+    """
+    operations = [
+        ReplaceOne(dict({'_id': document_id}, **before[document_id]), dict(document, rebuilt_at=rebuilt_at))
+        if document_id in before else
+        # Dokument koji nije postojao u snimci upisuje se samo ako ga u međuvremenu nitko nije stvorio
+        UpdateOne({'_id': document_id}, {'$setOnInsert': dict(document, rebuilt_at=rebuilt_at)}, upsert=True)
+        for document_id, document in documents.items()
+    ]
+    if not operations:
+        return set()
+    collection.bulk_write(operations, ordered=False)
+    written = collection.find({'_id': {'$in': list(documents)}, 'rebuilt_at': rebuilt_at}, {'_id': 1})
+    return set(documents) - {document['_id'] for document in written}
+
+
+def delete_unchanged(collection, before, rebuilt_ids):
+    """Obriši dokumente koji nisu dio izgradnje, ali samo ako se od snimke nisu promijenili.
+
+    Dokumente koje istodobni $inc/upsert stvori ili izmijeni dok izgradnja traje
+    (nova recenzija) filter ne pogađa pa ostaju.
+    """
+    rebuilt_ids = set(rebuilt_ids)
+    operations = [
+        DeleteOne(dict({'_id': document_id}, **values))
+        for document_id, values in before.items() if document_id not in rebuilt_ids
+    ]
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+def rebuild_review_facets():
+    """Ponovno izračunaj review_facets iz kolekcije reviews, vrati broj kombinacija"""
+    before = snapshot(mongo.db.review_facets, ['count'])
+    rows = mongo.db.reviews.aggregate([
+        {'$group': {'_id': {field: f'${field}' for field in FACET_FIELDS}, 'count': {'$sum': 1}}}
+    ])
+    counts = defaultdict(int)
+    for row in rows:
+        counts[(row['_id'].get('rating'), row['_id'].get('project_type') or '')] += row['count']
+
+    operations = [
+        ReplaceOne({'_id': _facet_id(rating, project_type)},
+                   {'rating': rating, 'project_type': project_type, 'count': count}, upsert=True)
+        for (rating, project_type), count in counts.items()
+    ]
+    if operations:
+        mongo.db.review_facets.bulk_write(operations, ordered=False)
+    delete_unchanged(mongo.db.review_facets, before, [_facet_id(*key) for key in counts])
+    _facet_cache.delete(_FACET_CACHE_KEY)
+    # Izvedeni podaci su se promijenili bez izmjene recenzija - novi ETag za /reviews
+    versions.bump('stats')
+    return len(counts)
+
+
+# Polja koja mijenjaju record_* funkcije - snimka za zaštitu od istodobnih $inc
+_USER_STATS_FIELDS = ['received_count', 'rating_sum', 'written_count']
+_REBUILD_RETRIES = 3
+
+
+def _count_user_stats(user_ids=None):
+    """Izračunaj statistiku iz kolekcije reviews (za sve korisnike ili samo zadane)"""
+    stats = defaultdict(_empty_stats)
+    received_match, written_match = [], []
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        received_match = [{'$match': {'reviewed_user_id': {'$in': user_ids}}}]
+        written_match = [{'$match': {'reviewer_user_id': {'$in': user_ids}}}]
+        # Korisnik bez recenzija dobiva praznu statistiku
+        for user_id in user_ids:
+            stats[user_id]
+
+    received = mongo.db.reviews.aggregate(received_match + [
+        {'$group': {
+            '_id': {'user': '$reviewed_user_id', 'rating': '$rating'},
+            'count': {'$sum': 1}
+        }}
+    ])
+    for row in received:
+        user_stats = stats[row['_id']['user']]
+        rating = row['_id']['rating']
+        user_stats['received_count'] += row['count']
+        user_stats['rating_sum'] += rating * row['count']
+        user_stats['rating_distribution'][str(rating)] = row['count']
+
+    written = mongo.db.reviews.aggregate(written_match + [
+        {'$group': {'_id': '$reviewer_user_id', 'count': {'$sum': 1}}}
+    ])
+    for row in written:
+        stats[row['_id']]['written_count'] = row['count']
+    return stats
+
+
+def rebuild_user_stats():
+    """Ponovno izračunaj user_stats iz kolekcije reviews, vrati broj korisnika"""
+    # Snimka prije agregacije: dokument koji se od nje promijeni možda nije u rezultatu agregacije
+    before = snapshot(mongo.db.user_stats, _USER_STATS_FIELDS)
+    stats = _count_user_stats()
+
+    # Zamijeni dokumente na mjestu pa obriši one koji nisu dio ove izgradnje,
+    # tako da čitatelji nikad ne vide praznu kolekciju (a istodobno dodani ostaju)
+    rebuilt_at = datetime.utcnow()
+    rebuilt_at = rebuilt_at.replace(microsecond=rebuilt_at.microsecond // 1000 * 1000)  # BSON datum ima milisekunde
+    changed = replace_unchanged(mongo.db.user_stats, before, stats, rebuilt_at)
+    stale = [user_id for user_id in before if user_id not in stats]
+    delete_unchanged(mongo.db.user_stats, before, stats)
+    changed.update(document['_id'] for document in mongo.db.user_stats.find({'_id': {'$in': stale}}, {'_id': 1}))
+
+    # Dokumente koje je istodobni $inc promijenio izračunaj ponovno, s novom snimkom
+    for _ in range(_REBUILD_RETRIES):
+        if not changed:
+            break
+        # Obrisane u međuvremenu (korisnik obrisan) se ne vraćaju
+        before = snapshot(mongo.db.user_stats, _USER_STATS_FIELDS, changed)
+        changed = replace_unchanged(mongo.db.user_stats, before, _count_user_stats(before), rebuilt_at)
+    if changed:
+        print(f"⚠️ user_stats for {len(changed)} users changed during rebuild, left as is")
+
+    versions.bump('stats')
+    return len(stats)
@@ -0,0 +1,30 @@
+from bson import ObjectId
+from .cache import TTLCache
+from .extensions import mongo
+from .models import User
+
+_cache = TTLCache()
+
+
+def configure(app):
+    _cache.maxsize = app.config.get('USER_CACHE_SIZE', 1024)
+    _cache.ttl = app.config.get('USER_CACHE_TTL', 60)
+
+
+def get_user_data(user_id):
+    """Dohvati podatke korisnika za Flask-Login, iz cachea ili iz baze"""
+    user_data = _cache.get(user_id)
+    if user_data is None:
+        user_data = mongo.db.users.find_one({'_id': ObjectId(user_id)}, User.PROJECTION)
+        if user_data:
+            _cache.set(user_id, user_data)
+    return user_data
+
+
+def invalidate(user_id):
+    """Ukloni korisnika iz cachea nakon izmjene"""
+    _cache.delete(str(user_id))
+
+
+def cache_stats():
+    return _cache.stats()
@@ -0,0 +1,111 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, request, session, make_response
+from pymongo import UpdateOne
+from .cache import TTLCache
+from .extensions import mongo
+
+_cache = TTLCache(maxsize=4096)
+_template_digest = None
+
+
+def bump(*keys):
+    """Povećaj verziju kolekcije/dokumenta nakon izmjene (npr. 'reviews', 'review:<id>').
+
+    Verzije dokumenata ('<vrsta>:<id>') istječu (TTL indeks na expires_at) nakon
+    VERSION_DOCUMENT_TTL sekundi bez izmjene, pa kolekcija ne raste bez granice.
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=current_app.config.get('VERSION_DOCUMENT_TTL', 2592000))
+    operations = []
+    for key in keys:
+        fields = {'updated_at': now}
+        if ':' in key:
+            fields['expires_at'] = expires_at
+        operations.append(UpdateOne({'_id': key}, {'$inc': {'version': 1}, '$set': fields}, upsert=True))
+    if operations:
+        mongo.db.versions.bulk_write(operations, ordered=False)
+    for key in keys:
+        _cache.delete(key)
+
+
+def get_versions(keys):
+    """Vrati {ključ: (verzija, updated_at)}, čitano kroz kratki in-process cache"""
+    ttl = current_app.config.get('VERSION_CACHE_TTL', 5)
+    result = {}
+    missing = []
+    for key in keys:
+        value = _cache.get(key)
+        if value is None:
+            missing.append(key)
+        else:
+            result[key] = value
+
+    if missing:
+        found = {document['_id']: document for document in mongo.db.versions.find({'_id': {'$in': missing}})}
+        for key in missing:
+            document = found.get(key, {})
+            value = (document.get('version', 0), document.get('updated_at'))
+            _cache.set(key, value, ttl)
+            result[key] = value
+    return result
+
+
+def _templates_digest():
+    """Hash svih templateova i statičkih datoteka - ETag se mijenja s deployem"""
+    global _template_digest
+    if _template_digest is None:
+        digest = hashlib.sha1()
+        for folder in (current_app.template_folder, current_app.static_folder):
+            root_folder = os.path.join(current_app.root_path, folder)
+            for root, _, files in sorted(os.walk(root_folder)):
+                for name in sorted(files):
+                    with open(os.path.join(root, name), 'rb') as f:
+                        digest.update(f.read())
+        _template_digest = digest.hexdigest()
+    return _template_digest
+
+
+def conditional_get(keys_for):
+    """Dekorator: ETag/Last-Modified iz verzija, 304 prije upita i renderiranja.
+
+    Vrijedi samo za anonimne posjetitelje bez flash poruka; prijavljeni
+    korisnici (i oni s remember-me kolačićem, koje Flask-Login tek prijavljuje)
+    vide personaliziranu navigaciju pa im se stranica uvijek renderira.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            remember_cookie = current_app.config.get('REMEMBER_COOKIE_NAME', 'remember_token')
+            if '_user_id' in session or '_flashes' in session or remember_cookie in request.cookies:
+                return view(*args, **kwargs)
+
+            keys = keys_for(**kwargs)
+            versions = get_versions(keys)
+            fingerprint = '|'.join(
+                [request.endpoint, request.full_path, _templates_digest()] +
+                [f'{key}={versions[key][0]}' for key in keys]
+            )
+            etag = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+            updated = [value[1] for value in versions.values() if value[1]]
+            last_modified = max(updated) if updated else None
+
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.public = True
+            response.cache_control.max_age = current_app.config.get('PUBLIC_PAGE_MAX_AGE', 0)
+            response.cache_control.s_maxage = current_app.config.get('PUBLIC_PAGE_SHARED_MAX_AGE', 10)
+            response.vary.add('Cookie')
+            return response
+        return wrapper
+    return decorator
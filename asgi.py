@@ -0,0 +1,9 @@
+import os
+from dotenv import load_dotenv
+from app.async_api import create_asgi_app
+
+load_dotenv()
+
+# Asinkroni JSON API za čitanje (recenzije, detalj recenzije, pretraga korisnika):
+#   uvicorn asgi:app --workers 2
+app = create_asgi_app(os.getenv('FLASK_ENV', 'production'))
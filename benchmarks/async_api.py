@@ -0,0 +1,137 @@
+"""Usporedba asinkronog API-ja (asgi.py) i postojećih WSGI ruta pod istovremenim opterećenjem.
+
+Oba servera moraju raditi nad istom bazom, npr.:
+    gunicorn -w 4 run:app -b 127.0.0.1:8000
+    uvicorn asgi:app --workers 4 --port 8001
+    python -m benchmarks.async_api --wsgi http://127.0.0.1:8000 --asgi http://127.0.0.1:8001 --concurrency 500
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+from .run import percentile
+
+
+class Connection:
+    """Minimalni HTTP/1.1 keep-alive klijent (bez dodatnih paketa)"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\nAccept-Encoding: identity\r\n\r\n'.encode())
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Server je zatvorio vezu')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def load(base_url, path, concurrency, requests):
+    """requests zahtjeva preko concurrency istovremenih veza, vrati statistiku"""
+    url = urlsplit(base_url)
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        connection = Connection(url.hostname, url.port or 80)
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                status, _ = await connection.get(path)
+                if status != 200:
+                    errors += 1
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+                errors += 1
+                await connection.close()
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+        await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'p50_ms': round(percentile(latencies, 0.50), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'errors': errors
+    }
+
+
+async def main(args):
+    first = Connection(urlsplit(args.asgi).hostname, urlsplit(args.asgi).port or 80)
+    _, body = await first.get('/api/reviews?per_page=1')
+    await first.close()
+    items = json.loads(body)['items']
+    if not items:
+        raise SystemExit('Baza nema recenzija - pokrenite python -m benchmarks.run --seed')
+    review_id = items[0]['id']
+
+    # (naziv, WSGI ruta, ASGI ruta)
+    pairs = [
+        ('popis recenzija', '/reviews', '/api/reviews'),
+        ('detalj recenzije', f'/review/{review_id}', f'/api/reviews/{review_id}'),
+        ('pretraga korisnika', f'/api/users/search?q={args.query}', f'/api/users/search?q={args.query}'),
+    ]
+    report = {}
+    print(f"{'Scenarij':22} {'server':6} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'greške':>7}")
+    for name, wsgi_path, asgi_path in pairs:
+        for server, base_url, path in (('wsgi', args.wsgi, wsgi_path), ('asgi', args.asgi, asgi_path)):
+            result = await load(base_url, path, args.concurrency, args.requests)
+            report[f'{name} ({server})'] = result
+            print(f"{name:22} {server:6} {result['p50_ms'] or 0:9.2f} {result['p95_ms'] or 0:9.2f} "
+                  f"{result['p99_ms'] or 0:9.2f} {result['throughput_rps']:9.1f} {result['errors']:7}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'concurrency': args.concurrency, 'requests': args.requests, 'results': report},
+                      f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='WSGI vs ASGI API za čitanje')
+    parser.add_argument('--wsgi', default='http://127.0.0.1:8000')
+    parser.add_argument('--asgi', default='http://127.0.0.1:8001')
+    parser.add_argument('--concurrency', type=int, default=200, help='Broj istovremenih veza')
+    parser.add_argument('--requests', type=int, default=5000, help='Broj zahtjeva po scenariju i serveru')
+    parser.add_argument('--query', default='hor', help='Upit za pretragu korisnika')
+    parser.add_argument('--output', help='Spremi rezultate u JSON datoteku')
+    asyncio.run(main(parser.parse_args()))
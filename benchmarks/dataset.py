@@ -0,0 +1,91 @@
+"""Generator sintetičkog skupa podataka (korisnici i recenzije) za benchmarke."""
+import random
+from bson import ObjectId
+from datetime import datetime, timedelta
+from app.auth.forms import RegistrationForm
+from app.reviews.forms import ReviewForm
+from app.search import search_fields
+
+FIRST_NAMES = ['Ana', 'Ivan', 'Marko', 'Petra', 'Luka', 'Maja', 'Josip', 'Ivana', 'Tomislav', 'Katarina',
+               'Matej', 'Lucija', 'Filip', 'Marija', 'Domagoj', 'Nikolina', 'Đuro', 'Željka', 'Šime', 'Čedomir']
+LAST_NAMES = ['Horvat', 'Kovačević', 'Babić', 'Marić', 'Jurić', 'Novak', 'Kovačić', 'Knežević', 'Vuković',
+              'Marković', 'Petrović', 'Matić', 'Tomić', 'Pavlović', 'Božić', 'Đurić', 'Šarić', 'Žužić']
+FACULTIES = [value for value, _ in RegistrationForm.faculty.kwargs['choices'] if value]
+PROJECT_TYPES = [value for value, _ in ReviewForm.project_type.kwargs['choices'] if value]
+
+# Realistična raspodjela: većina recenzija je pozitivna
+RATING_WEIGHTS = [0.05, 0.08, 0.17, 0.35, 0.35]
+PROJECT_TYPE_WEIGHTS = [0.3, 0.25, 0.15, 0.15, 0.1, 0.05]
+COMMENTS = [
+    'Odličan suradnik, uvijek na vrijeme i spreman pomoći.',
+    'Dobra komunikacija, ali ponekad kasni s rokovima.',
+    'Vrlo temeljit i precizan u radu na projektu.',
+    'Solidan doprinos timu, preporučujem suradnju.',
+    'Trebalo bi više inicijative, ali rezultat je bio dobar.'
+]
+
+
+def _batched(documents, collection, batch_size):
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+
+def generate(db, password_hash, users=100_000, reviews=1_000_000, seed=42, batch_size=5000, span_days=730):
+    """Upiši users korisnika i reviews recenzija u db, vrati popis _id korisnika"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    max_reviews = users * (users - 1)
+    reviews = min(reviews, max_reviews)
+
+    user_ids = []
+
+    def user_documents():
+        for i in range(users):
+            name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+            email = f'korisnik{i}@bench.kolegarecenzije.hr'
+            document = {
+                '_id': ObjectId(),
+                'email': email,
+                'name': name,
+                'password': password_hash,
+                'faculty': rng.choice(FACULTIES),
+                'department': f'Smjer {rng.randint(1, 20)}',
+                'role': 'admin' if i == 0 else 'user',
+                'email_verified': True,
+                'date_created': start + timedelta(seconds=rng.randint(0, span_days * 86400))
+            }
+            document.update(search_fields(name, email))
+            user_ids.append(document['_id'])
+            yield document
+
+    _batched(user_documents(), db.users, batch_size)
+
+    def review_documents():
+        # Parovi (recenzent, recenzirani) moraju biti jedinstveni
+        seen = set()
+        while len(seen) < reviews:
+            reviewer = rng.randrange(len(user_ids))
+            reviewed = rng.randrange(len(user_ids))
+            pair = reviewer * len(user_ids) + reviewed
+            if reviewer == reviewed or pair in seen:
+                continue
+            seen.add(pair)
+            created = start + timedelta(seconds=rng.randint(0, span_days * 86400))
+            yield {
+                'reviewer_user_id': user_ids[reviewer],
+                'reviewed_user_id': user_ids[reviewed],
+                'rating': rng.choices(range(1, 6), RATING_WEIGHTS)[0],
+                'comment': rng.choice(COMMENTS),
+                'project_type': rng.choices(PROJECT_TYPES, PROJECT_TYPE_WEIGHTS)[0],
+                'date_created': created,
+                'last_updated': created
+            }
+
+    _batched(review_documents(), db.reviews, batch_size)
+    return user_ids
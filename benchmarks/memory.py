@@ -0,0 +1,130 @@
+"""Memorija po stranici admin popisa: cijeli dokumenti kao dictovi vs. __slots__ modeli s projekcijom.
+
+Primjeri:
+    python -m benchmarks.memory --mongo-uri mongodb://localhost:27017/kolegarecenzije_bench
+    python -m benchmarks.memory --in-memory --users 2000 --reviews 20000 --page-sizes 15 100 1000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from .run import create_benchmark_app, seed
+
+DATE_FORMAT = '%d.%m.%Y.'
+SORT = [('date_created', -1), ('_id', -1)]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Memorija po stranici popisa korisnika i recenzija')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--mongo-uri', help='URI lokalnog mongod-a (s nazivom baze)')
+    source.add_argument('--in-memory', action='store_true', help='mongomock umjesto pravog mongod-a')
+    parser.add_argument('--seed', action='store_true', help='Obriši bazu i generiraj sintetičke podatke')
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--reviews', type=int, default=1_000_000)
+    parser.add_argument('--random-seed', type=int, default=42)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[15, 100, 1000])
+    parser.add_argument('--output', help='Spremi rezultate u JSON datoteku')
+    return parser.parse_args(argv)
+
+
+def measure(load):
+    """Bajtovi koje drži rezultat load() (alokacije koje prežive učitavanje)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items = load()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return retained, len(items)
+
+
+def users_as_dicts(db, per_page):
+    # Prijašnji način: cijeli dokument (hash lozinke, search_prefixes) + statistika upisana u dict
+    from app import stats
+    users = list(db.users.find().sort(SORT).limit(per_page))
+    users_stats = stats.get_stats_for_users([user['_id'] for user in users])
+    for user in users:
+        user['reviews_received'] = users_stats[user['_id']]['reviews_received']
+        user['reviews_written'] = users_stats[user['_id']]['reviews_written']
+    return users
+
+
+def users_as_models(db, per_page):
+    from app import stats
+    from app.models import UserListItem
+    users = UserListItem.find(db.users, {}, sort=SORT, limit=per_page)
+    users_stats = stats.get_stats_for_users([user._id for user in users])
+    for user in users:
+        user.set_stats(users_stats[user._id])
+    return users
+
+
+def reviews_as_dicts(db, per_page):
+    # Prijašnji način: imena, fakulteti i datum upisani kao stringovi u svaki dokument
+    reviews = list(db.reviews.find().sort(SORT).limit(per_page))
+    user_ids = list({review[field] for review in reviews for field in ('reviewer_user_id', 'reviewed_user_id')})
+    users = {user['_id']: user for user in db.users.find({'_id': {'$in': user_ids}}, {'name': 1, 'faculty': 1})}
+    for review in reviews:
+        reviewer = users.get(review['reviewer_user_id'], {})
+        reviewed_user = users.get(review['reviewed_user_id'], {})
+        review['reviewer_name'] = reviewer.get('name', 'Nepoznat')
+        review['reviewer_faculty'] = reviewer.get('faculty', '')
+        review['reviewed_user_name'] = reviewed_user.get('name', 'Nepoznat')
+        review['reviewed_user_faculty'] = reviewed_user.get('faculty', '')
+        review['formatted_date'] = review['date_created'].strftime(DATE_FORMAT)
+    return reviews
+
+
+def reviews_as_models(db, per_page):
+    from app.models import Review
+    from app.reviews.utils import hydrate_reviews
+    reviews = Review.find(db.reviews, {}, sort=SORT, limit=per_page)
+    return hydrate_reviews(reviews, unknown_name='Nepoznat', date_format=DATE_FORMAT)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app, _ = create_benchmark_app(args)
+    if args.seed or args.in_memory:
+        seed(app, args)
+
+    from app.extensions import mongo
+    cases = [
+        ('korisnici', users_as_dicts, users_as_models),
+        ('recenzije', reviews_as_dicts, reviews_as_models),
+    ]
+    results = {}
+    print(f"{'Popis':10} {'stranica':>8} {'dict B/stavka':>14} {'model B/stavka':>15} {'dict KiB':>9} {'model KiB':>10} {'ušteda':>7}")
+    with app.app_context():
+        db = mongo.db
+        for name, as_dicts, as_models in cases:
+            for per_page in args.page_sizes:
+                # Prvi poziv zagrije cacheove (user_stats, import modula) da ne ulaze u mjerenje
+                as_models(db, per_page)
+                dict_bytes, count = measure(lambda: as_dicts(db, per_page))
+                model_bytes, _ = measure(lambda: as_models(db, per_page))
+                if not count:
+                    continue
+                saving = 1 - model_bytes / dict_bytes if dict_bytes else 0
+                results[f'{name} ({per_page})'] = {
+                    'items': count,
+                    'dict_bytes': dict_bytes,
+                    'model_bytes': model_bytes,
+                    'dict_bytes_per_item': round(dict_bytes / count),
+                    'model_bytes_per_item': round(model_bytes / count),
+                    'saving': round(saving, 3)
+                }
+                print(f"{name:10} {count:8} {dict_bytes / count:14.0f} {model_bytes / count:15.0f} "
+                      f"{dict_bytes / 1024:9.1f} {model_bytes / 1024:10.1f} {saving:7.0%}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'dataset': {'users': args.users, 'reviews': args.reviews, 'seed': args.random_seed},
+                       'results': results}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
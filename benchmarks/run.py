@@ -0,0 +1,278 @@
+"""Benchmark svih ruta kroz Flask test client.
+
+Primjeri:
+    python -m benchmarks.run --mongo-uri mongodb://localhost:27017/kolegarecenzije_bench --seed
+    python -m benchmarks.run --in-memory --users 2000 --reviews 20000 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --mongo-uri ... --baseline benchmarks/baseline.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pymongo import monitoring
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Broji Mongo naredbe koje pošalje aplikacija"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark ruta aplikacije KolegaRecenzije')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--mongo-uri', help='URI lokalnog mongod-a (s nazivom baze)')
+    source.add_argument('--in-memory', action='store_true', help='mongomock umjesto pravog mongod-a')
+    parser.add_argument('--seed', action='store_true', help='Obriši bazu i generiraj sintetičke podatke')
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--reviews', type=int, default=1_000_000)
+    parser.add_argument('--random-seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=50, help='Broj zahtjeva po scenariju')
+    parser.add_argument('--output', help='Spremi rezultate u JSON datoteku')
+    parser.add_argument('--save-baseline', help='Spremi rezultate kao baseline JSON')
+    parser.add_argument('--baseline', help='Usporedi s baseline JSON-om')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Dopušteno pogoršanje p95 latencije (0.2 = 20%%)')
+    return parser.parse_args(argv)
+
+
+def create_benchmark_app(args):
+    # Listener se mora registrirati prije kreiranja MongoClienta
+    counter = CommandCounter()
+    monitoring.register(counter)
+
+    if args.in_memory:
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit('--in-memory treba paket "mongomock" (pip install mongomock)')
+        import flask_pymongo
+        flask_pymongo.MongoClient = mongomock.MongoClient
+
+    from config import config, TestingConfig
+
+    class BenchmarkConfig(TestingConfig):
+        MONGO_URI = args.mongo_uri or 'mongodb://localhost:27017/kolegarecenzije_bench'
+        RATELIMIT_ENABLED = False
+        MONGO_AUTO_CREATE_INDEXES = True
+
+    config['benchmark'] = BenchmarkConfig
+
+    from app import create_app
+    return create_app('benchmark'), counter
+
+
+def seed(app, args):
+    from app.extensions import mongo
+    from app.indexes import ensure_indexes
+    from app.passwords import hash_password
+    from app.stats import rebuild_user_stats
+    from app.counters import reconcile
+    from .dataset import generate
+
+    with app.app_context():
+        for name in ('users', 'reviews', 'user_stats', 'counters', 'versions'):
+            mongo.db[name].delete_many({})
+        ensure_indexes()
+        started = time.perf_counter()
+        generate(mongo.db, hash_password('benchmark'), users=args.users, reviews=args.reviews,
+                 seed=args.random_seed)
+        rebuild_user_stats()
+        reconcile()
+        print(f"Podaci generirani za {time.perf_counter() - started:.1f}s")
+
+
+def build_scenarios(app):
+    """Scenariji (naziv, klijent, metoda, url ili funkcija koja vraća url, podaci)"""
+    from app.extensions import mongo
+
+    with app.app_context():
+        admin = mongo.db.users.find_one({'role': 'admin'})
+        user = mongo.db.users.find_one({'role': 'user', 'email': {'$ne': admin['email']}})
+        other = mongo.db.users.find_one({'role': 'user', '_id': {'$ne': user['_id']}})
+        review = mongo.db.reviews.find_one()
+
+    anonymous = app.test_client()
+    user_client = app.test_client()
+    admin_client = app.test_client()
+    user_client.post('/login', data={'email': user['email'], 'password': 'benchmark'})
+    admin_client.post('/login', data={'email': admin['email'], 'password': 'benchmark'})
+
+    def deep_reviews_page():
+        # Deset stranica dubine preko kursora
+        url = '/reviews'
+        for _ in range(10):
+            body = anonymous.get(url).get_data(as_text=True)
+            match = re.search(r'href="([^"]*after=[^"]*)"', body)
+            if not match:
+                break
+            url = match.group(1).replace('&amp;', '&')
+        return url
+
+    def review_cycle(client):
+        # Dodaj, uredi i obriši recenziju da skup podataka ostane isti
+        client.post('/add_review', data={'reviewed_user_email': other['email'], 'rating': 4,
+                                         'comment': 'Benchmark recenzija suradnje.', 'project_type': 'Drugo'})
+        with app.app_context():
+            created = mongo.db.reviews.find_one({'reviewer_user_id': user['_id'],
+                                                 'reviewed_user_id': other['_id']})
+        if created:
+            client.post(f"/edit_review/{created['_id']}", data={'rating': 5, 'comment': 'Uređena benchmark recenzija.',
+                                                               'project_type': 'Drugo'})
+            client.post(f"/delete_review/{created['_id']}")
+
+    def user_cycle(client):
+        email = 'benchmark-novi@bench.kolegarecenzije.hr'
+        client.post('/admin/users/create', data={'name': 'Benchmark Korisnik', 'email': email, 'password': 'benchmark',
+                                                 'confirm_password': 'benchmark', 'faculty': 'Pravo',
+                                                 'department': ''})
+        with app.app_context():
+            created = mongo.db.users.find_one({'email': email})
+        if created:
+            client.post(f"/admin/users/{created['_id']}/edit", data={'name': 'Benchmark Korisnik', 'email': email,
+                                                                     'faculty': 'Pravo', 'department': '',
+                                                                     'role': 'user', 'email_verified': 'on'})
+            client.post(f"/admin/users/{created['_id']}/delete")
+
+    deep_url = deep_reviews_page()
+    review_id = str(review['_id'])
+    return [
+        ('auth.login GET', anonymous, 'GET', '/login', None),
+        ('auth.register GET', anonymous, 'GET', '/register', None),
+        ('auth.login POST', app.test_client(), 'POST', '/login', {'email': user['email'], 'password': 'benchmark'}),
+        ('main.index', anonymous, 'GET', '/', None),
+        ('main.about_page', anonymous, 'GET', '/about', None),
+        ('main.contact_page', anonymous, 'GET', '/contact', None),
+        ('reviews.reviews', anonymous, 'GET', '/reviews', None),
+        ('reviews.reviews filtri', anonymous, 'GET', '/reviews?rating=4&project_type=Timski+rad', None),
+        ('reviews.reviews duboka stranica', anonymous, 'GET', deep_url, None),
+        ('reviews.review_detail', anonymous, 'GET', f'/review/{review_id}', None),
+        ('reviews.search_users', anonymous, 'GET', '/api/users/search?q=hor', None),
+        ('reviews.my_reviews', user_client, 'GET', '/my_reviews', None),
+        ('reviews.add_review GET', user_client, 'GET', '/add_review', None),
+        ('reviews.add/edit/delete', user_client, 'CALL', review_cycle, None),
+        ('profile.profile', user_client, 'GET', '/profile', None),
+        ('profile.edit_profile GET', user_client, 'GET', '/profile/edit', None),
+        ('admin.dashboard', admin_client, 'GET', '/admin/', None),
+        ('admin.users', admin_client, 'GET', '/admin/users', None),
+        ('admin.users pretraga', admin_client, 'GET', '/admin/users?search=kova', None),
+        ('admin.manage_reviews', admin_client, 'GET', '/admin/reviews', None),
+        ('admin.create/edit/delete user', admin_client, 'CALL', user_cycle, None),
+    ]
+
+
+def run_scenarios(scenarios, counter, requests, count_commands=True):
+    results = {}
+    for name, client, method, target, data in scenarios:
+        latencies = []
+        commands_before = counter.count
+        started = time.perf_counter()
+        for _ in range(requests):
+            request_started = time.perf_counter()
+            if method == 'CALL':
+                target(client)
+            elif method == 'POST':
+                client.post(target, data=data)
+            else:
+                response = client.get(target)
+                if response.status_code != 200:
+                    raise RuntimeError(f'{name}: {target} vratio {response.status_code}')
+            latencies.append((time.perf_counter() - request_started) * 1000)
+        elapsed = time.perf_counter() - started
+
+        results[name] = {
+            'p50_ms': round(percentile(latencies, 0.50), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'throughput_rps': round(requests / elapsed, 1),
+            'mongo_commands_per_request': (round((counter.count - commands_before) / requests, 2)
+                                           if count_commands else None)
+        }
+    return results
+
+
+def print_results(results):
+    print(f"{'Scenarij':36} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'cmd/req':>8}")
+    for name, result in results.items():
+        print(f"{name:36} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['p99_ms']:9.2f} "
+              f"{result['throughput_rps']:9.1f} {_format_commands(result['mongo_commands_per_request']):>8}")
+
+
+def _format_commands(value):
+    return '-' if value is None else f'{value:.2f}'
+
+
+def compare(results, baseline, threshold):
+    """Vrati popis regresija u odnosu na baseline"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        if result['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms")
+        # Broj upita je deterministički, svako povećanje je regresija (npr. N+1)
+        commands, previous_commands = result['mongo_commands_per_request'], previous['mongo_commands_per_request']
+        if commands is not None and previous_commands is not None and commands > previous_commands:
+            regressions.append(f"{name}: upita po zahtjevu {previous_commands} -> {commands}")
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app, counter = create_benchmark_app(args)
+    if args.seed or args.in_memory:
+        seed(app, args)
+
+    scenarios = build_scenarios(app)
+    # mongomock ne šalje command monitoring događaje pa se upiti broje samo na pravom mongod-u
+    results = run_scenarios(scenarios, counter, args.requests, count_commands=not args.in_memory)
+    print_results(results)
+
+    report = {
+        'dataset': {'users': args.users, 'reviews': args.reviews, 'seed': args.random_seed,
+                    'backend': 'mongomock' if args.in_memory else 'mongod'},
+        'requests_per_scenario': args.requests,
+        'results': results
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            sys.exit(f'Baseline {args.baseline} ne postoji')
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print('\n❌ Regresije:')
+            for regression in regressions:
+                print(f'  {regression}')
+            sys.exit(1)
+        print('\n✅ Nema regresija u odnosu na baseline')
+
+
+if __name__ == '__main__':
+    main()
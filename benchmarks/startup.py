@@ -0,0 +1,101 @@
+"""Profil pokretanja: vrijeme uvoza po modulu (-X importtime), create_app i prvi zahtjev.
+
+Svako mjerenje je u novom procesu (hladni start workera). Zadani MONGO_URI je
+nedostupna adresa - pokretanje ne smije čekati bazu.
+
+Primjeri:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --top 30 --output startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Izvodi se u zasebnom procesu; ispisuje JSON s vremenima u milisekundama
+PROBE = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app({config!r})
+created = time.perf_counter()
+response = app.test_client().get('/healthz')
+served = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (served - created) * 1000,
+    'first_request_status': response.status_code
+}}))
+"""
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Profil pokretanja aplikacije')
+    parser.add_argument('--config', default='production')
+    parser.add_argument('--mongo-uri', default='mongodb://10.255.255.1:27017/kolegarecenzije',
+                        help='Zadano nedostupna adresa, da se vidi čeka li pokretanje bazu')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=20, help='Broj najsporijih modula u izvještaju')
+    parser.add_argument('--output', help='Spremi rezultate u JSON datoteku')
+    return parser.parse_args(argv)
+
+
+def _env(args):
+    return dict(os.environ, MONGO_URI=args.mongo_uri, FLASK_ENV=args.config)
+
+
+def import_profile(args):
+    """(modul, vlastito ms, kumulativno ms, dubina) iz python -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=ROOT, env=_env(args), capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+    return modules
+
+
+def startup_run(args):
+    result = subprocess.run([sys.executable, '-c', PROBE.format(config=args.config)],
+                            cwd=ROOT, env=_env(args), capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    modules = import_profile(args)
+    total_ms = sum(module[2] for module in modules if module[3] == 0)
+    print(f"Uvoz `app`: {total_ms:.1f} ms, modula: {len(modules)}")
+    print(f"\n{'kumulativno ms':>15} {'vlastito ms':>12}  modul")
+    for name, self_ms, cumulative_ms, _ in sorted(modules, key=lambda module: -module[2])[:args.top]:
+        print(f"{cumulative_ms:15.1f} {self_ms:12.1f}  {name}")
+
+    runs = [startup_run(args) for _ in range(args.runs)]
+    summary = {key: round(median(run[key] for run in runs), 1)
+               for key in ('import_ms', 'create_app_ms', 'first_request_ms')}
+    print(f"\nMedijan od {args.runs} hladnih pokretanja ({args.config}, {args.mongo_uri}):")
+    print(f"  uvoz {summary['import_ms']} ms, create_app {summary['create_app_ms']} ms, "
+          f"prvi zahtjev (/healthz) {summary['first_request_ms']} ms, status {runs[-1]['first_request_status']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'config': args.config, 'runs': runs, 'median': summary,
+                       'imports': [{'module': name, 'self_ms': self_ms, 'cumulative_ms': cumulative_ms}
+                                   for name, self_ms, cumulative_ms, _ in modules]},
+                      f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
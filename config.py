@@ -8,23 +8,146 @@ class Config:
     # Flask-Mail
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
-    MAIL_USE_TLS = True
+    MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'true').lower() == 'true'
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@kolegarecenzije.hr')
     
+    # Outbox - emailovi se šalju iz pozadinskih dretvi (ili: flask outbox work)
+    MAIL_OUTBOX_IN_PROCESS = os.environ.get('MAIL_OUTBOX_IN_PROCESS', 'true').lower() == 'true'
+    MAIL_OUTBOX_WORKERS = int(os.environ.get('MAIL_OUTBOX_WORKERS', 2))
+    MAIL_OUTBOX_POLL_INTERVAL = int(os.environ.get('MAIL_OUTBOX_POLL_INTERVAL', 2))
+    MAIL_OUTBOX_IDLE_TIMEOUT = int(os.environ.get('MAIL_OUTBOX_IDLE_TIMEOUT', 30))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('MAIL_OUTBOX_MAX_ATTEMPTS', 5))
+    MAIL_OUTBOX_BACKOFF = int(os.environ.get('MAIL_OUTBOX_BACKOFF', 30))
+    MAIL_OUTBOX_STALE_AFTER = int(os.environ.get('MAIL_OUTBOX_STALE_AFTER', 300))
+    
+    # Pozadinski poslovi (brisanje korisnika); false = zaseban proces `flask jobs work`
+    JOBS_IN_PROCESS = os.environ.get('JOBS_IN_PROCESS', 'true').lower() == 'true'
+    JOBS_BATCH_SIZE = int(os.environ.get('JOBS_BATCH_SIZE', 500))
+    JOBS_POLL_INTERVAL = int(os.environ.get('JOBS_POLL_INTERVAL', 5))
+    JOBS_STALE_AFTER = int(os.environ.get('JOBS_STALE_AFTER', 300))
+    JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 5))
+    JOBS_BACKOFF = int(os.environ.get('JOBS_BACKOFF', 30))
+    
     # Postavke sesije
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
     
+    # Hashiranje lozinki - postojeći hashevi se nadograđuju pri prijavi
+    PASSWORD_HASH_ALGORITHM = os.environ.get('PASSWORD_HASH_ALGORITHM', 'bcrypt')  # bcrypt ili pbkdf2
+    PASSWORD_BCRYPT_ROUNDS = int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', 12))
+    PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 600000))
+    # Broj procesa za hashiranje po workeru, 0 = hashiraj u dretvi zahtjeva. Svaki gunicorn worker
+    # ima svoj pool pa se jezgre dijele na WEB_CONCURRENCY workera (gunicorn čita istu varijablu)
+    PASSWORD_HASH_WORKERS = int(os.environ.get(
+        'PASSWORD_HASH_WORKERS',
+        max((os.cpu_count() or 1) // max(int(os.environ.get('WEB_CONCURRENCY', 1)), 1), 1)
+    ))
+    
+    # Uvjetni GET (ETag) za javne stranice - koliko dugo se kešira verzija kolekcije (sekunde)
+    VERSION_CACHE_TTL = int(os.environ.get('VERSION_CACHE_TTL', 5))
+    # Verzije pojedinih recenzija (i obrisanih) brišu se nakon ovoliko sekundi bez izmjene
+    VERSION_DOCUMENT_TTL = int(os.environ.get('VERSION_DOCUMENT_TTL', 30 * 24 * 3600))
+    PUBLIC_PAGE_MAX_AGE = int(os.environ.get('PUBLIC_PAGE_MAX_AGE', 0))
+    PUBLIC_PAGE_SHARED_MAX_AGE = int(os.environ.get('PUBLIC_PAGE_SHARED_MAX_AGE', 10))
+    
+    # Cache renderiranih fragmenata (kartice recenzija); REDIS_URL za dijeljeni cache između workera
+    FRAGMENT_CACHE_ENABLED = os.environ.get('FRAGMENT_CACHE_ENABLED', 'true').lower() == 'true'
+    FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 2048))
+    FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL', 3600))
+    FRAGMENT_CACHE_REDIS_URL = os.environ.get('FRAGMENT_CACHE_REDIS_URL')
+    
     # Rate limiting
     RATELIMIT_STORAGE_URI = "memory://"
+    
+    # Jednokratni posao pri deployu (admin korisnik, indeksi): background = prvi worker koji preuzme
+    # zapis u kolekciji bootstrap, u pozadinskoj dretvi; cli = samo `flask bootstrap run`; sync = blokirajuće
+    BOOTSTRAP_MODE = os.environ.get('BOOTSTRAP_MODE', 'background')
+    BOOTSTRAP_DEPLOYMENT_ID = os.environ.get('BOOTSTRAP_DEPLOYMENT_ID')
+    BOOTSTRAP_STALE_AFTER = int(os.environ.get('BOOTSTRAP_STALE_AFTER', 120))
+    
+    # Indeksi - kreiraj registrirane indekse pri bootstrapu (ili: flask indexes create)
+    MONGO_AUTO_CREATE_INDEXES = os.environ.get('MONGO_AUTO_CREATE_INDEXES', 'true').lower() == 'true'
+
+    # Mongo connection pool po procesu (zadane vrijednosti su PyMongo zadane); prazno = bez ograničenja
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_CONNECTING = int(os.environ.get('MONGO_MAX_CONNECTING', 2))
+    MONGO_MAX_IDLE_TIME_MS = int(os.environ['MONGO_MAX_IDLE_TIME_MS']) if os.environ.get('MONGO_MAX_IDLE_TIME_MS') else None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ['MONGO_WAIT_QUEUE_TIMEOUT_MS']) if os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS') else None
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 30000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 20000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.environ['MONGO_SOCKET_TIMEOUT_MS']) if os.environ.get('MONGO_SOCKET_TIMEOUT_MS') else None
+    # Kompresija prometa prema bazi, redom prednosti (npr. zstd,snappy,zlib); zstd treba paket
+    # zstandard, snappy paket python-snappy - nedostupni se preskaču
+    MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')
+    MONGO_ZLIB_COMPRESSION_LEVEL = int(os.environ['MONGO_ZLIB_COMPRESSION_LEVEL']) if os.environ.get('MONGO_ZLIB_COMPRESSION_LEVEL') else None
+
+    # Popisi i statistika (recenzije, detalj recenzije, pretraga korisnika, početna) sa sekundara
+    # replica seta (secondaryPreferred, najviše MAX_STALENESS sekundi zastarjelo, min. 90, 0 = bez ograničenja);
+    # nakon spremanja korisnik READ_YOUR_WRITES sekundi čita s primaryja
+    MONGO_SECONDARY_READS = os.environ.get('MONGO_SECONDARY_READS', 'true').lower() == 'true'
+    MONGO_MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', 90))
+    MONGO_READ_YOUR_WRITES_SECONDS = int(os.environ.get('MONGO_READ_YOUR_WRITES_SECONDS', 90))
+
+    # Paginacija - koliko dugo (sekunde) se kešira ukupan broj rezultata, 0 = točan broj svaki put
+    PAGINATION_COUNT_CACHE_TTL = int(os.environ.get('PAGINATION_COUNT_CACHE_TTL', 60))
+    
+    # Brojači za početnu stranicu i admin dashboard
+    COUNTERS_CACHE_TTL = int(os.environ.get('COUNTERS_CACHE_TTL', 30))
+    COUNTERS_RECONCILE_INTERVAL = int(os.environ.get('COUNTERS_RECONCILE_INTERVAL', 3600))
+    
+    # Ljestvica kolega - Bayesov prosjek (PRIOR_WEIGHT "zamišljenih" ocjena PRIOR_MEAN), prikazuje se top N
+    LEADERBOARD_PRIOR_MEAN = float(os.environ.get('LEADERBOARD_PRIOR_MEAN', 3.0))
+    LEADERBOARD_PRIOR_WEIGHT = int(os.environ.get('LEADERBOARD_PRIOR_WEIGHT', 5))
+    LEADERBOARD_SIZE = int(os.environ.get('LEADERBOARD_SIZE', 20))
+    
+    # Health monitor (pozadinski ping baze) i circuit breaker (503 dok je baza nedostupna)
+    HEALTH_MONITOR_ENABLED = os.environ.get('HEALTH_MONITOR_ENABLED', 'true').lower() == 'true'
+    HEALTH_CHECK_INTERVAL = int(os.environ.get('HEALTH_CHECK_INTERVAL', 10))
+    DB_CIRCUIT_BREAKER = os.environ.get('DB_CIRCUIT_BREAKER', 'true').lower() == 'true'
+    
+    # Cache korisnika za Flask-Login (po procesu); TTL ograničava zastarjelost u drugim workerima
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    
+    # Autocomplete pretraga korisnika - trajanje cachea odgovora (sekunde)
+    SEARCH_CACHE_TTL = int(os.environ.get('SEARCH_CACHE_TTL', 30))
+    
+    # Mjerenje Mongo naredbi po zahtjevu (Server-Timing header, log sporih zahtjeva)
+    MONGO_INSTRUMENTATION_ENABLED = os.environ.get('MONGO_INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', 'true').lower() == 'true'
+    SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+    SLOW_REQUEST_QUERIES = int(os.environ.get('SLOW_REQUEST_QUERIES', 20))
+    
+    # Prometheus metrike; uz više gunicorn workera postaviti dijeljeni direktorij
+    # (isprazniti ga pri svakom deployu) da /metrics zbraja sve procese
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+    METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+    # /metrics uz Authorization: Bearer <METRICS_TOKEN>; bez tokena samo s localhosta i samo ako je
+    # METRICS_ALLOW_LOCALHOST uključen (iza nginxa na istom hostu svi zahtjevi dolaze s 127.0.0.1)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_ALLOW_LOCALHOST = os.environ.get('METRICS_ALLOW_LOCALHOST', 'false').lower() == 'true'
+    
+    # Statičke datoteke: hashirana imena i .gz/.br inačice u static/dist (pri pokretanju ili `flask assets build`)
+    ASSETS_FINGERPRINT = os.environ.get('ASSETS_FINGERPRINT', 'true').lower() == 'true'
+    ASSETS_BUILD_ON_STARTUP = os.environ.get('ASSETS_BUILD_ON_STARTUP', 'true').lower() == 'true'
+    ASSETS_MAX_AGE = int(os.environ.get('ASSETS_MAX_AGE', 31536000))
+    
+    # Admin izvoz (CSV/JSONL) - veličina batcha kursora i broj istovremenih izvoza po procesu
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    EXPORT_MAX_CONCURRENT = int(os.environ.get('EXPORT_MAX_CONCURRENT', 2))
 
 class DevelopmentConfig(Config):
     DEBUG = True
     TESTING = False
+    # Izmjene CSS/JS-a vidljive odmah, bez ponovnog pokretanja
+    ASSETS_FINGERPRINT = os.environ.get('ASSETS_FINGERPRINT', 'false').lower() == 'true'
     MAIL_SUPPRESS_SEND = False
+    METRICS_ALLOW_LOCALHOST = os.environ.get('METRICS_ALLOW_LOCALHOST', 'true').lower() == 'true'
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -37,6 +160,12 @@ class TestingConfig(Config):
     DEBUG = True
     MONGO_URI = os.environ.get('TEST_MONGO_URI', 'mongodb://localhost:27017/kolegarecenzije_test')
     WTF_CSRF_ENABLED = False
+    HEALTH_MONITOR_ENABLED = False
+    MAIL_OUTBOX_IN_PROCESS = False
+    JOBS_IN_PROCESS = False
+    BOOTSTRAP_MODE = 'sync'
+    PASSWORD_HASH_WORKERS = 0
+    PASSWORD_BCRYPT_ROUNDS = 4
 
 config = {
     'development': DevelopmentConfig,
@@ -6,15 +6,7 @@ load_dotenv()
 
 app = create_app(os.getenv('FLASK_ENV', 'production'))
 
-# Test MongoDB veze prije svakog zahtjeva, dodano zbog debugiranja
-@app.before_request
-def test_mongo_connection():
-    try:
-        from app.extensions import mongo
-        mongo.db.command('ping')
-        print("✅ MongoDB Atlas connection successful!")
-    except Exception as e:
-        print(f"❌ MongoDB connection failed: {e}")
+# Stanje MongoDB veze prati pozadinski health monitor (app/health), vidi /healthz i /readyz
 
 if __name__ == '__main__':
     app.run()
\ No newline at end of file
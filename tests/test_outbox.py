@@ -0,0 +1,222 @@
+"""Outbox worker protiv lokalnog SMTP stuba: ponovni pokušaji s odmakom i konačno stanje.
+
+Baza je mongomock (kao `benchmarks.run --in-memory`), pa testovi ne trebaju mongod.
+Pokretanje: `python -m pytest tests`
+"""
+import socketserver
+import threading
+import time
+from datetime import datetime
+
+import flask_pymongo
+import mongomock
+import pytest
+from pymongo.errors import AutoReconnect
+
+from app import create_app, outbox as outbox_module
+from app.extensions import mongo
+from app.outbox import OutboxWorkerPool, enqueue_email, PENDING, SENT, FAILED
+from config import config, TestingConfig
+
+BACKOFF = 30
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    """Minimalni SMTP server: prvih `failures` MAIL naredbi odbije s 451, ostale poruke sprema"""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.failures = 0
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def refuse_next(self, count):
+        with self.lock:
+            self.failures = count
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.reply('220 stub ESMTP')
+        envelope = {}
+        while True:
+            line = self.rfile.readline().decode().rstrip('\r\n')
+            if not line:
+                return
+            command = line.split(' ', 1)[0].upper()
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 stub')
+            elif command == 'MAIL':
+                with self.server.lock:
+                    refuse = self.server.failures > 0
+                    if refuse:
+                        self.server.failures -= 1
+                if refuse:
+                    self.reply('451 Privremena greška')
+                else:
+                    envelope = {'from': line, 'to': []}
+                    self.reply('250 OK')
+            elif command == 'RCPT':
+                envelope.setdefault('to', []).append(line)
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 Kraj s <CRLF>.<CRLF>')
+                data = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if data_line in (b'.\r\n', b''):
+                        break
+                    data.append(data_line)
+                envelope['data'] = b''.join(data).decode('utf-8', 'replace')
+                with self.server.lock:
+                    self.server.messages.append(envelope)
+                self.reply('250 OK')
+            elif command in ('RSET', 'NOOP'):
+                envelope = {}
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Nepodržano')
+
+
+@pytest.fixture(scope='module')
+def smtp_stub():
+    server = SMTPStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='module')
+def app(smtp_stub):
+    class OutboxTestConfig(TestingConfig):
+        MAIL_SERVER = '127.0.0.1'
+        MAIL_PORT = smtp_stub.server_address[1]
+        MAIL_USE_TLS = False
+        MAIL_USERNAME = None
+        MAIL_PASSWORD = None
+        MAIL_SUPPRESS_SEND = False
+        MAIL_OUTBOX_POLL_INTERVAL = 0.05
+        MAIL_OUTBOX_BACKOFF = BACKOFF
+        BOOTSTRAP_MODE = 'cli'
+
+    config['outbox_test'] = OutboxTestConfig
+    mongo_client = flask_pymongo.MongoClient
+    flask_pymongo.MongoClient = mongomock.MongoClient
+    try:
+        app = create_app('outbox_test')
+    finally:
+        flask_pymongo.MongoClient = mongo_client
+        del config['outbox_test']
+
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def outbox(app, smtp_stub):
+    mongo.db.outbox.delete_many({})
+    smtp_stub.refuse_next(0)
+    smtp_stub.messages.clear()
+    pool = OutboxWorkerPool()
+    yield pool
+    pool.stop(timeout=5)
+    mongo.db.outbox.delete_many({})
+
+
+def wait_for(message_id, **expected):
+    """Pričekaj da poruka u outboxu ima zadana polja, vrati dokument"""
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        document = mongo.db.outbox.find_one({'_id': message_id})
+        if all(document.get(key) == value for key, value in expected.items()):
+            return document
+        time.sleep(0.02)
+    pytest.fail(f'Poruka nije došla u stanje {expected}: {document}')
+
+
+def assert_backoff(document, attempt):
+    # Odmak se udvostručuje: BACKOFF, 2 * BACKOFF, 4 * BACKOFF...
+    delay = (document['next_attempt_at'] - datetime.utcnow()).total_seconds()
+    expected = BACKOFF * 2 ** (attempt - 1)
+    assert expected - 5 < delay <= expected
+
+
+def retry_now(pool, message_id):
+    """Preskoči čekanje odmaka (kao da je vrijeme prošlo) i probudi workera"""
+    mongo.db.outbox.update_one({'_id': message_id}, {'$set': {'next_attempt_at': datetime.utcnow()}})
+    pool.wake()
+
+
+def test_retries_with_backoff_then_sends(app, smtp_stub, outbox):
+    smtp_stub.refuse_next(2)
+    message_id = enqueue_email('Potvrda emaila', ['ivan.horvat@fer.hr'], 'Kliknite na poveznicu.')
+    outbox.start(app, workers=1)
+
+    document = wait_for(message_id, status=PENDING, attempts=1)
+    assert '451' in document['last_error']
+    assert_backoff(document, 1)
+
+    retry_now(outbox, message_id)
+    document = wait_for(message_id, status=PENDING, attempts=2)
+    assert_backoff(document, 2)
+
+    retry_now(outbox, message_id)
+    document = wait_for(message_id, status=SENT)
+    assert document['attempts'] == 3
+    assert 'last_error' not in document and 'locked_at' not in document
+
+    assert len(smtp_stub.messages) == 1
+    assert 'ivan.horvat@fer.hr' in smtp_stub.messages[0]['to'][0]
+    assert 'Subject: Potvrda emaila' in smtp_stub.messages[0]['data']
+
+
+def test_gives_up_after_max_attempts(app, smtp_stub, outbox):
+    app.config['MAIL_OUTBOX_MAX_ATTEMPTS'] = 2
+    try:
+        smtp_stub.refuse_next(10)
+        message_id = enqueue_email('Potvrda emaila', ['ana.anic@fer.hr'], 'Kliknite na poveznicu.')
+        outbox.start(app, workers=1)
+
+        document = wait_for(message_id, status=PENDING, attempts=1)
+        assert_backoff(document, 1)
+
+        retry_now(outbox, message_id)
+        document = wait_for(message_id, status=FAILED)
+        assert document['attempts'] == 2
+        assert '451' in document['last_error']
+        assert smtp_stub.messages == []
+    finally:
+        app.config['MAIL_OUTBOX_MAX_ATTEMPTS'] = TestingConfig.MAIL_OUTBOX_MAX_ATTEMPTS
+
+
+def test_delivered_message_is_not_requeued_when_marking_fails(app, smtp_stub, outbox, monkeypatch):
+    mark_sent = outbox_module.mark_sent
+    failures = []
+
+    def flaky_mark_sent(message_id):
+        # Prvi zapis statusa nakon isporuke ne uspije (npr. promjena primaryja)
+        if not failures:
+            failures.append(message_id)
+            raise AutoReconnect('primary stepped down')
+        mark_sent(message_id)
+
+    monkeypatch.setattr(outbox_module, 'mark_sent', flaky_mark_sent)
+    message_id = enqueue_email('Potvrda emaila', ['marko.maric@fer.hr'], 'Kliknite na poveznicu.')
+    outbox.start(app, workers=1)
+
+    # Status se zapisuje u sljedećem krugu workera, bez ponovnog slanja i bez brojanja greške
+    document = wait_for(message_id, status=SENT)
+    assert failures == [message_id]
+    assert document['attempts'] == 1
+    assert 'last_error' not in document
+    assert len(smtp_stub.messages) == 1